@@ -0,0 +1,509 @@
+"""
+基准测试用的本地服务替身
+- FakeArxiv: 兼容arXiv API的Atom查询接口
+- FakeOpenAI: 兼容OpenAI的 chat completions 接口（含 stream=True 的SSE输出），可配置延迟和429注入
+- FakePdfHost: 提供PDF下载，支持Range请求
+- FakeBatch: 兼容OpenAI的 Files / Batches 接口，批处理在后台线程中执行，可配置失败比例
+三者共用一个线程化HTTP服务器，按路径分发。
+"""
+import json
+import random
+import uuid
+from email.parser import BytesParser
+from email.policy import default as default_policy
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+from xml.sax.saxutils import escape
+
+CATEGORIES = ['cs.AI', 'cs.CL', 'cs.LG', 'cs.CV', 'stat.ML']
+WORDS = ('transformer diffusion retrieval agent reasoning alignment benchmark graph '
+         'optimization federated multimodal sparse attention distillation robustness').split()
+
+
+class ServiceSettings:
+    """替身服务的可调参数"""
+
+    def __init__(self, papers: int = 50, llm_latency: float = 0.5, llm_jitter: float = 0.1,
+                 rate_limit_ratio: float = 0.0, pdf_size: int = 512 * 1024, pdf_latency: float = 0.05,
+                 arxiv_latency: float = 0.2, batch_latency: float = 1.0, batch_failure_ratio: float = 0.0,
+                 seed: int = 42):
+        self.papers = papers
+        self.llm_latency = llm_latency
+        self.llm_jitter = llm_jitter
+        self.rate_limit_ratio = rate_limit_ratio
+        self.pdf_size = pdf_size
+        self.pdf_latency = pdf_latency
+        self.arxiv_latency = arxiv_latency
+        self.batch_latency = batch_latency
+        self.batch_failure_ratio = batch_failure_ratio
+        self.seed = seed
+
+
+class ServiceStats:
+    """替身服务收到的请求计数"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts: Dict[str, int] = {}
+
+    def hit(self, name: str):
+        with self._lock:
+            self.counts[name] = self.counts.get(name, 0) + 1
+
+
+def _paper_id(index: int) -> str:
+    return f"2401.{index + 1:05d}v1"
+
+
+def _pdf_bytes(paper_id: str, size: int) -> bytes:
+    header = f"%PDF-1.4\n% fake paper {paper_id}\n".encode('ascii')
+    body = (paper_id.encode('ascii') + b' ') * (size // (len(paper_id) + 1) + 1)
+    return (header + body)[:max(size, len(header))]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "ZakaFakeServices/1.0"
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    @property
+    def settings(self) -> ServiceSettings:
+        return self.server.settings
+
+    def _send(self, status: int, body: bytes, content_type: str, headers: Optional[Dict[str, str]] = None):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self) -> dict:
+        length = int(self.headers.get('Content-Length') or 0)
+        return json.loads(self.rfile.read(length) or b'{}')
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        if parsed.path == '/api/query':
+            return self._arxiv_query(parse_qs(parsed.query))
+        if parsed.path.startswith('/pdf/'):
+            return self._pdf(parsed.path[len('/pdf/'):])
+        if '/files/' in parsed.path and parsed.path.endswith('/content'):
+            return self._file_content(parsed.path.split('/')[-2])
+        if '/batches/' in parsed.path:
+            return self._retrieve_batch(parsed.path.split('/')[-1])
+        self._send(404, b'not found', 'text/plain')
+
+    def do_POST(self):
+        parsed = urlparse(self.path)
+        if parsed.path.endswith('/chat/completions'):
+            return self._chat_completion(self._read_json())
+        if parsed.path.endswith('/files'):
+            return self._upload_file()
+        if parsed.path.endswith('/batches'):
+            return self._create_batch(self._read_json())
+        if parsed.path.endswith('/cancel') and '/batches/' in parsed.path:
+            return self._cancel_batch(parsed.path.split('/')[-2])
+        self._send(404, b'{"error": {"message": "not found"}}', 'application/json')
+
+    # --- arXiv ---
+
+    def _entry(self, index: int) -> str:
+        rng = random.Random(self.settings.seed + index)
+        paper_id = _paper_id(index)
+        published = (datetime.now(timezone.utc) - timedelta(hours=index)).strftime('%Y-%m-%dT%H:%M:%SZ')
+        title = ' '.join(rng.choice(WORDS) for _ in range(8)).capitalize()
+        abstract = ' '.join(rng.choice(WORDS) for _ in range(150))
+        primary = rng.choice(CATEGORIES)
+        host = f"http://{self.headers.get('Host')}"
+        authors = ''.join(f"<author><name>Author {index}-{i}</name></author>" for i in range(rng.randint(1, 6)))
+        return (
+            "<entry>"
+            f"<id>http://arxiv.org/abs/{paper_id}</id>"
+            f"<updated>{published}</updated><published>{published}</published>"
+            f"<title>{escape(title)}</title><summary>{escape(abstract)}</summary>{authors}"
+            f"<link href=\"http://arxiv.org/abs/{paper_id}\" rel=\"alternate\" type=\"text/html\"/>"
+            f"<link title=\"pdf\" href=\"{host}/pdf/{paper_id}\" rel=\"related\" type=\"application/pdf\"/>"
+            f"<arxiv:primary_category term=\"{primary}\" scheme=\"http://arxiv.org/schemas/atom\"/>"
+            f"<category term=\"{primary}\" scheme=\"http://arxiv.org/schemas/atom\"/>"
+            "</entry>"
+        )
+
+    def _arxiv_query(self, params: Dict[str, List[str]]):
+        self.server.stats.hit('arxiv')
+        time.sleep(self.settings.arxiv_latency)
+        start = int(params.get('start', ['0'])[0])
+        max_results = int(params.get('max_results', ['10'])[0])
+        id_list = [i for i in params.get('id_list', [''])[0].split(',') if i]
+        if id_list:
+            indices = [int(i.split('.')[1].split('v')[0]) - 1 for i in id_list]
+            indices = [i for i in indices if 0 <= i < self.settings.papers][start:start + max_results]
+            total = len(id_list)
+        else:
+            indices = list(range(start, min(start + max_results, self.settings.papers)))
+            total = self.settings.papers
+        feed = (
+            '<?xml version="1.0" encoding="UTF-8"?>'
+            '<feed xmlns="http://www.w3.org/2005/Atom" '
+            'xmlns:opensearch="http://a9.com/-/spec/opensearch/1.1/" '
+            'xmlns:arxiv="http://arxiv.org/schemas/atom">'
+            '<title>ArXiv Query</title><id>http://arxiv.org/api/fake</id>'
+            f"<updated>{datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')}</updated>"
+            f"<opensearch:totalResults>{total}</opensearch:totalResults>"
+            f"<opensearch:startIndex>{start}</opensearch:startIndex>"
+            f"<opensearch:itemsPerPage>{max_results}</opensearch:itemsPerPage>"
+            + ''.join(self._entry(i) for i in indices) +
+            '</feed>'
+        )
+        self._send(200, feed.encode('utf-8'), 'application/atom+xml; charset=utf-8')
+
+    # --- PDF ---
+
+    def _pdf(self, paper_id: str):
+        self.server.stats.hit('pdf')
+        time.sleep(self.settings.pdf_latency)
+        data = _pdf_bytes(paper_id, self.settings.pdf_size)
+        range_header = self.headers.get('Range')
+        if range_header and range_header.startswith('bytes='):
+            start = int(range_header[len('bytes='):].split('-')[0])
+            if start >= len(data):
+                return self._send(416, b'', 'application/pdf', {'Content-Range': f"bytes */{len(data)}"})
+            return self._send(206, data[start:], 'application/pdf',
+                              {'Content-Range': f"bytes {start}-{len(data) - 1}/{len(data)}"})
+        self._send(200, data, 'application/pdf')
+
+    # --- OpenAI ---
+
+    def _rate_limit_headers(self) -> Dict[str, str]:
+        return {
+            'x-ratelimit-limit-requests': '5000',
+            'x-ratelimit-remaining-requests': '4999',
+            'x-ratelimit-reset-requests': '12ms',
+            'x-ratelimit-limit-tokens': '2000000',
+            'x-ratelimit-remaining-tokens': '1999000',
+            'x-ratelimit-reset-tokens': '30ms'
+        }
+
+    @staticmethod
+    def completion_content(request: dict) -> Tuple[str, int, int]:
+        prompt = ''.join(m.get('content') or '' for m in request.get('messages', []))
+        if (request.get('response_format') or {}).get('type') == 'json_object':
+            content = json.dumps({
+                'summary': '1. 研究背景：……\n2. 主要方法：……\n3. 创新点：……\n4. 实验结果：……\n5. 研究意义：……',
+                'highlights': ['亮点一', '亮点二', '亮点三'],
+                'implications': '学术意义与应用价值……',
+                'technical_details': '关键技术细节……'
+            }, ensure_ascii=False)
+        else:
+            content = '模拟生成内容。' * 40
+        return content, max(1, len(prompt) // 2), max(1, len(content) // 2)
+
+    def _chat_completion(self, request: dict):
+        self.server.stats.hit('openai')
+        settings = self.settings
+        if settings.rate_limit_ratio and random.random() < settings.rate_limit_ratio:
+            self.server.stats.hit('openai_429')
+            body = json.dumps({'error': {'message': 'Rate limit reached', 'type': 'requests',
+                                         'code': 'rate_limit_exceeded'}}).encode('utf-8')
+            headers = dict(self._rate_limit_headers(), **{'retry-after': '1',
+                                                         'x-ratelimit-remaining-requests': '0'})
+            return self._send(429, body, 'application/json', headers)
+
+        latency = max(0.0, settings.llm_latency + random.uniform(-settings.llm_jitter, settings.llm_jitter))
+        content, prompt_tokens, completion_tokens = self.completion_content(request)
+        if request.get('stream'):
+            return self._stream_completion(request, content, latency, prompt_tokens, completion_tokens)
+        time.sleep(latency)
+        body = json.dumps({
+            'id': f"chatcmpl-fake-{random.getrandbits(48):x}",
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': request.get('model', 'fake'),
+            'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': content},
+                         'finish_reason': 'stop'}],
+            'usage': {'prompt_tokens': prompt_tokens, 'completion_tokens': completion_tokens,
+                      'total_tokens': prompt_tokens + completion_tokens}
+        }, ensure_ascii=False).encode('utf-8')
+        self._send(200, body, 'application/json', self._rate_limit_headers())
+
+    def _stream_completion(self, request: dict, content: str, latency: float,
+                           prompt_tokens: int, completion_tokens: int):
+        """
+        以SSE逐段返回内容：首段在延迟的20%后到达，其余均匀分布在剩余的延迟中；
+        客户端提前断开时停止发送
+        """
+        pieces = [content[i:i + 8] for i in range(0, len(content), 8)] or ['']
+        base = {
+            'id': f"chatcmpl-fake-{random.getrandbits(48):x}",
+            'object': 'chat.completion.chunk',
+            'created': int(time.time()),
+            'model': request.get('model', 'fake')
+        }
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Connection', 'close')
+        for key, value in self._rate_limit_headers().items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.close_connection = True
+
+        def event(data) -> bytes:
+            return f"data: {json.dumps(data, ensure_ascii=False) if data != '[DONE]' else data}\n\n".encode('utf-8')
+
+        try:
+            time.sleep(latency * 0.2)
+            for index, piece in enumerate(pieces):
+                if index:
+                    time.sleep(latency * 0.8 / len(pieces))
+                finish = 'stop' if index == len(pieces) - 1 else None
+                self.wfile.write(event(dict(base, choices=[
+                    {'index': 0, 'delta': {'content': piece}, 'finish_reason': finish}
+                ])))
+                self.wfile.flush()
+            if (request.get('stream_options') or {}).get('include_usage'):
+                self.wfile.write(event(dict(base, choices=[], usage={
+                    'prompt_tokens': prompt_tokens, 'completion_tokens': completion_tokens,
+                    'total_tokens': prompt_tokens + completion_tokens
+                })))
+            self.wfile.write(event('[DONE]'))
+            self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            self.server.stats.hit('openai_stream_aborted')
+
+    # --- OpenAI Files / Batches ---
+
+    def _send_json(self, status: int, data: dict):
+        self._send(status, json.dumps(data, ensure_ascii=False).encode('utf-8'), 'application/json')
+
+    def _upload_file(self):
+        self.server.stats.hit('files')
+        length = int(self.headers.get('Content-Length') or 0)
+        raw = self.rfile.read(length)
+        message = BytesParser(policy=default_policy).parsebytes(
+            f"Content-Type: {self.headers.get('Content-Type')}\r\n\r\n".encode('latin-1') + raw
+        )
+        fields, content, filename = {}, b'', 'upload.jsonl'
+        for part in message.iter_parts():
+            name = part.get_param('name', header='content-disposition')
+            if name == 'file':
+                content = part.get_payload(decode=True) or b''
+                filename = part.get_filename() or filename
+            else:
+                fields[name] = part.get_content().strip()
+        file_object = self.server.store.add_file(content, filename, fields.get('purpose', 'batch'))
+        self._send_json(200, file_object)
+
+    def _file_content(self, file_id: str):
+        content = self.server.store.file_content(file_id)
+        if content is None:
+            return self._send_json(404, {'error': {'message': f"No such file: {file_id}"}})
+        self._send(200, content, 'application/octet-stream')
+
+    def _create_batch(self, request: dict):
+        self.server.stats.hit('batches')
+        batch = self.server.store.create_batch(request)
+        if batch is None:
+            return self._send_json(404, {'error': {'message': 'input file not found'}})
+        self._send_json(200, batch)
+
+    def _retrieve_batch(self, batch_id: str):
+        batch = self.server.store.get_batch(batch_id)
+        if batch is None:
+            return self._send_json(404, {'error': {'message': f"No such batch: {batch_id}"}})
+        self._send_json(200, batch)
+
+    def _cancel_batch(self, batch_id: str):
+        batch = self.server.store.update_batch(batch_id, status='cancelled', cancelled_at=int(time.time()))
+        if batch is None:
+            return self._send_json(404, {'error': {'message': f"No such batch: {batch_id}"}})
+        self._send_json(200, batch)
+
+
+class BatchStore:
+    """替身 Files / Batches 接口的内存存储，批处理在后台线程中执行"""
+
+    def __init__(self, settings: ServiceSettings):
+        self.settings = settings
+        self._lock = threading.Lock()
+        self.files: Dict[str, dict] = {}
+        self.contents: Dict[str, bytes] = {}
+        self.batches: Dict[str, dict] = {}
+
+    def add_file(self, content: bytes, filename: str, purpose: str) -> dict:
+        file_object = {
+            'id': f"file-{uuid.uuid4().hex[:24]}",
+            'object': 'file',
+            'bytes': len(content),
+            'created_at': int(time.time()),
+            'filename': filename,
+            'purpose': purpose,
+            'status': 'processed'
+        }
+        with self._lock:
+            self.files[file_object['id']] = file_object
+            self.contents[file_object['id']] = content
+        return file_object
+
+    def file_content(self, file_id: str) -> Optional[bytes]:
+        with self._lock:
+            return self.contents.get(file_id)
+
+    def get_batch(self, batch_id: str) -> Optional[dict]:
+        with self._lock:
+            batch = self.batches.get(batch_id)
+            return dict(batch) if batch else None
+
+    def update_batch(self, batch_id: str, **fields) -> Optional[dict]:
+        with self._lock:
+            batch = self.batches.get(batch_id)
+            if batch is None:
+                return None
+            if batch['status'] not in ('completed', 'failed', 'expired', 'cancelled'):
+                batch.update(fields)
+            return dict(batch)
+
+    def create_batch(self, request: dict) -> Optional[dict]:
+        input_file_id = request.get('input_file_id')
+        content = self.file_content(input_file_id)
+        if content is None:
+            return None
+        lines = [json.loads(line) for line in content.decode('utf-8').splitlines() if line.strip()]
+        batch = {
+            'id': f"batch_{uuid.uuid4().hex[:24]}",
+            'object': 'batch',
+            'endpoint': request.get('endpoint'),
+            'input_file_id': input_file_id,
+            'completion_window': request.get('completion_window', '24h'),
+            'status': 'validating',
+            'created_at': int(time.time()),
+            'output_file_id': None,
+            'error_file_id': None,
+            'metadata': request.get('metadata'),
+            'request_counts': {'total': len(lines), 'completed': 0, 'failed': 0}
+        }
+        with self._lock:
+            self.batches[batch['id']] = batch
+        threading.Thread(target=self._process, args=(batch['id'], lines), daemon=True).start()
+        return dict(batch)
+
+    def _process(self, batch_id: str, lines: List[dict]):
+        self.update_batch(batch_id, status='in_progress', in_progress_at=int(time.time()))
+        time.sleep(self.settings.batch_latency)
+        outputs, errors = [], []
+        for line in lines:
+            request_id = f"req_{uuid.uuid4().hex[:16]}"
+            if self.settings.batch_failure_ratio and random.random() < self.settings.batch_failure_ratio:
+                errors.append({'id': f"batch_req_{uuid.uuid4().hex[:16]}", 'custom_id': line['custom_id'],
+                               'response': {'status_code': 500, 'request_id': request_id,
+                                            'body': {'error': {'message': 'server error'}}},
+                               'error': None})
+                continue
+            content, prompt_tokens, completion_tokens = _Handler.completion_content(line.get('body') or {})
+            outputs.append({
+                'id': f"batch_req_{uuid.uuid4().hex[:16]}",
+                'custom_id': line['custom_id'],
+                'response': {'status_code': 200, 'request_id': request_id, 'body': {
+                    'id': f"chatcmpl-fake-{uuid.uuid4().hex[:12]}",
+                    'object': 'chat.completion',
+                    'created': int(time.time()),
+                    'model': (line.get('body') or {}).get('model', 'fake'),
+                    'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': content},
+                                 'finish_reason': 'stop'}],
+                    'usage': {'prompt_tokens': prompt_tokens, 'completion_tokens': completion_tokens,
+                              'total_tokens': prompt_tokens + completion_tokens}
+                }},
+                'error': None
+            })
+
+        def to_file(records: List[dict], name: str) -> Optional[str]:
+            if not records:
+                return None
+            data = ''.join(json.dumps(r, ensure_ascii=False) + '\n' for r in records).encode('utf-8')
+            return self.add_file(data, name, 'batch_output')['id']
+
+        self.update_batch(
+            batch_id,
+            status='completed',
+            completed_at=int(time.time()),
+            output_file_id=to_file(outputs, f"{batch_id}_output.jsonl"),
+            error_file_id=to_file(errors, f"{batch_id}_error.jsonl"),
+            request_counts={'total': len(lines), 'completed': len(outputs), 'failed': len(errors)}
+        )
+
+
+class FakeServices:
+    """
+    启动本地替身服务
+    用法:
+        with FakeServices(ServiceSettings(papers=100)) as services:
+            services.arxiv_url, services.openai_url
+    """
+
+    def __init__(self, settings: Optional[ServiceSettings] = None, host: str = '127.0.0.1', port: int = 0):
+        self.settings = settings or ServiceSettings()
+        self.server = ThreadingHTTPServer((host, port), _Handler)
+        self.server.daemon_threads = True
+        self.server.settings = self.settings
+        self.server.stats = ServiceStats()
+        self.server.store = BatchStore(self.settings)
+        self._thread = threading.Thread(target=self.server.serve_forever, name="fake-services", daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def arxiv_url(self) -> str:
+        return f"{self.base_url}/api/query"
+
+    @property
+    def openai_url(self) -> str:
+        return f"{self.base_url}/v1"
+
+    @property
+    def stats(self) -> ServiceStats:
+        return self.server.stats
+
+    def start(self) -> 'FakeServices':
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self) -> 'FakeServices':
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="启动基准测试用的本地arXiv/OpenAI/PDF替身服务")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--papers', type=int, default=50)
+    parser.add_argument('--llm-latency', type=float, default=0.5)
+    parser.add_argument('--rate-limit-ratio', type=float, default=0.0)
+    args = parser.parse_args()
+
+    services = FakeServices(ServiceSettings(papers=args.papers, llm_latency=args.llm_latency,
+                                            rate_limit_ratio=args.rate_limit_ratio), port=args.port)
+    services.start()
+    print(f"ARXIV_API_URL={services.arxiv_url}")
+    print(f"OPENAI_BASE_URL={services.openai_url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        services.stop()
@@ -0,0 +1,248 @@
+"""
+端到端基准测试
+在本地替身服务（arXiv、OpenAI、PDF）上驱动 ZakaMediaPush.daily_task、PaperCrawler、
+SummaryGenerator 和 ContentFormatter，报告吞吐（篇/分钟）、各阶段 p50/p99 耗时和峰值内存，
+并可保存为基线或与已有基线比较。
+
+用法:
+    python benchmarks/run_benchmark.py --papers 50 --llm-latency 0.5
+    python benchmarks/run_benchmark.py --papers 50 --save-baseline benchmarks/baseline.json
+    python benchmarks/run_benchmark.py --papers 50 --compare benchmarks/baseline.json
+"""
+import argparse
+import json
+import os
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from fake_services import FakeServices, ServiceSettings  # noqa: E402
+
+SCENARIOS = ('daily_task', 'crawler', 'generator', 'batch', 'formatter')
+
+# p99 差异小于该值（秒）时视为噪声，不判定为退化
+_NOISE_SECONDS = 0.005
+
+
+def configure_env(services: FakeServices, workdir: str, args: argparse.Namespace):
+    """
+    将被测程序指向替身服务和临时目录，必须在导入 src 之前调用
+    """
+    os.environ.update({
+        'OPENAI_API_KEY': 'benchmark',
+        'OPENAI_BASE_URL': services.openai_url,
+        'ARXIV_API_URL': services.arxiv_url,
+        'ARXIV_DELAY_SECONDS': '0',
+        'MAX_PAPERS_PER_DAY': str(args.papers),
+        'MAX_CANDIDATES': str(args.papers),
+        'OUTPUT_DIR': os.path.join(workdir, 'output'),
+        'OPENAI_BATCH_DIR': os.path.join(workdir, 'cache', 'batches'),
+        'LOG_DIR': os.path.join(workdir, 'logs'),
+        'LOG_LEVEL': 'INFO' if args.verbose else 'WARNING',
+        'METRICS_DIR': os.path.join(workdir, 'metrics'),
+        'TEMPLATE_CACHE_DIR': os.path.join(workdir, 'cache', 'templates'),
+        'LLM_CACHE_ENABLED': 'true' if args.llm_cache else 'false',
+        'OPENAI_STREAM_ENABLED': 'true' if args.stream else 'false',
+        'LLM_CACHE_PATH': os.path.join(workdir, 'cache', 'llm_cache.sqlite3'),
+        'METADATA_CACHE_PATH': os.path.join(workdir, 'cache', 'metadata.sqlite3'),
+        # 各场景都应真实请求arXiv替身服务，不复用上一个场景的结果页
+        'ARXIV_PAGE_CACHE_ENABLED': 'false',
+        # 运行清单、调度状态、工作队列和筛选历史同样放在临时目录，基准测试不读写真实的可恢复状态
+        'PAPER_INDEX_PATH': os.path.join(workdir, 'state', 'paper_index.sqlite3'),
+        'RUN_MANIFEST_DIR': os.path.join(workdir, 'state', 'runs'),
+        'SCHEDULE_STATE_PATH': os.path.join(workdir, 'state', 'schedule.json'),
+        'WORK_QUEUE_PATH': os.path.join(workdir, 'state', 'work_queue.sqlite3'),
+        'SELECTOR_HISTORY_PATH': os.path.join(workdir, 'state', 'selector_history'),
+        'ARXIV_PAGE_CACHE_PATH': os.path.join(workdir, 'cache', 'arxiv_pages.sqlite3')
+    })
+
+
+def peak_rss_mb() -> float:
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 单位为KB，macOS 为字节
+    return usage / (1024 * 1024) if sys.platform == 'darwin' else usage / 1024
+
+
+def _succeeded(snapshot: Dict[str, Any], name: str) -> int:
+    return snapshot['timings'].get(name, {}).get('success', 0)
+
+
+def run_daily_task(app, args) -> int:
+    app.daily_task()
+    from src.utils import metrics
+    return _succeeded(metrics.snapshot(), 'ContentFormatter.format_and_save')
+
+
+def run_crawler(app, args) -> int:
+    return sum(1 for _ in app.crawler.iter_recent_papers(days=7, max_results=args.papers))
+
+
+def run_generator(app, args) -> int:
+    papers = app.crawler.search_papers('all', max_results=args.papers)
+    workers = app.config.get('pipeline', 'workers')['summarize']
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return sum(1 for _ in executor.map(app.generator.generate_comprehensive_summary, papers))
+
+
+def run_batch(app, args) -> int:
+    from src.batch_runner import BatchRunner
+    papers = app.crawler.search_papers('all', max_results=args.papers)
+    return len(BatchRunner(app.generator, poll_interval=0.2).run(papers))
+
+
+def run_formatter(app, args) -> int:
+    papers = app.crawler.search_papers('all', max_results=args.papers)
+    summary = {
+        'summary': '摘要' * 200,
+        'highlights': '亮点' * 50,
+        'implications': '意义' * 100,
+        'technical_details': '细节' * 100
+    }
+    for paper in papers:
+        app.formatter.format_and_save(paper, summary)
+    return len(papers)
+
+
+SCENARIO_FUNCS: Dict[str, Callable] = {
+    'daily_task': run_daily_task,
+    'crawler': run_crawler,
+    'generator': run_generator,
+    'batch': run_batch,
+    'formatter': run_formatter
+}
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    settings = ServiceSettings(
+        papers=args.papers,
+        llm_latency=args.llm_latency,
+        rate_limit_ratio=args.rate_limit_ratio,
+        pdf_size=args.pdf_size,
+        arxiv_latency=args.arxiv_latency,
+        batch_latency=args.batch_latency,
+        batch_failure_ratio=args.batch_failure_ratio
+    )
+    with FakeServices(settings) as services, tempfile.TemporaryDirectory(prefix='zaka-bench-') as workdir:
+        configure_env(services, workdir, args)
+        from src.main import ZakaMediaPush
+        from src.utils import metrics
+
+        app = ZakaMediaPush()
+        results: Dict[str, Any] = {'settings': vars(settings), 'scenarios': {}}
+        for scenario in args.scenarios:
+            metrics.reset()
+            started = time.perf_counter()
+            papers = SCENARIO_FUNCS[scenario](app, args)
+            elapsed = time.perf_counter() - started
+            snapshot = metrics.snapshot()
+            results['scenarios'][scenario] = {
+                'papers': papers,
+                'seconds': round(elapsed, 3),
+                'papers_per_minute': round(papers / elapsed * 60, 2) if elapsed > 0 else 0.0,
+                'stages': {
+                    name: {
+                        'count': stat['count'],
+                        'failure': stat['failure'],
+                        'p50_seconds': round(stat['p50_seconds'], 4),
+                        'p99_seconds': round(stat['p99_seconds'], 4)
+                    }
+                    for name, stat in snapshot['timings'].items()
+                },
+                'tokens': {
+                    counter['name']: counter['value'] for counter in snapshot['counters']
+                    if counter['name'].startswith('llm_')
+                }
+            }
+        results['peak_rss_mb'] = round(peak_rss_mb(), 1)
+        results['requests'] = dict(services.stats.counts)
+        return results
+
+
+def print_report(results: Dict[str, Any]):
+    for scenario, data in results['scenarios'].items():
+        print(f"\n== {scenario}: {data['papers']} 篇, {data['seconds']}s, {data['papers_per_minute']} 篇/分钟")
+        print(f"   {'阶段':<52}{'次数':>6}{'失败':>6}{'p50(s)':>10}{'p99(s)':>10}")
+        for name, stage in data['stages'].items():
+            print(f"   {name:<54}{stage['count']:>6}{stage['failure']:>6}"
+                  f"{stage['p50_seconds']:>10.4f}{stage['p99_seconds']:>10.4f}")
+        if data['tokens']:
+            print(f"   令牌: {data['tokens']}")
+    print(f"\n峰值内存: {results['peak_rss_mb']} MB, 替身服务请求数: {results['requests']}")
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """
+    与基线比较
+    :return: 退化项描述，为空表示没有退化
+    """
+    regressions = []
+    for scenario, data in results['scenarios'].items():
+        base = baseline.get('scenarios', {}).get(scenario)
+        if not base:
+            continue
+        before, after = base['papers_per_minute'], data['papers_per_minute']
+        change = (after - before) / before if before else 0.0
+        print(f"{scenario}: 吞吐 {before} -> {after} 篇/分钟 ({change:+.1%})")
+        if change < -tolerance:
+            regressions.append(f"{scenario} 吞吐下降 {change:.1%}")
+        for name, stage in data['stages'].items():
+            base_stage = base['stages'].get(name)
+            if not base_stage:
+                continue
+            before_p99, after_p99 = base_stage['p99_seconds'], stage['p99_seconds']
+            if after_p99 - before_p99 > max(_NOISE_SECONDS, before_p99 * tolerance):
+                regressions.append(f"{scenario}/{name} p99 {before_p99:.4f}s -> {after_p99:.4f}s")
+    before_rss, after_rss = baseline.get('peak_rss_mb'), results['peak_rss_mb']
+    if before_rss and after_rss > before_rss * (1 + tolerance):
+        regressions.append(f"峰值内存 {before_rss} MB -> {after_rss} MB")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Zaka Media Push 端到端基准测试")
+    parser.add_argument('--papers', type=int, default=50, help="论文数")
+    parser.add_argument('--scenarios', nargs='+', choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument('--llm-latency', type=float, default=0.5, help="模拟LLM每次请求的延迟（秒）")
+    parser.add_argument('--rate-limit-ratio', type=float, default=0.0, help="返回429的请求比例")
+    parser.add_argument('--arxiv-latency', type=float, default=0.2, help="模拟arXiv每页的延迟（秒）")
+    parser.add_argument('--batch-latency', type=float, default=1.0, help="模拟批处理任务的完成时间（秒）")
+    parser.add_argument('--batch-failure-ratio', type=float, default=0.0, help="批处理中失败请求的比例")
+    parser.add_argument('--pdf-size', type=int, default=512 * 1024, help="模拟PDF大小（字节）")
+    parser.add_argument('--llm-cache', action='store_true', help="启用LLM响应缓存")
+    parser.add_argument('--stream', action='store_true', help="以流式方式请求LLM")
+    parser.add_argument('--save-baseline', metavar='PATH', help="将结果保存为基线")
+    parser.add_argument('--compare', metavar='PATH', help="与基线比较，出现退化时返回非零退出码")
+    parser.add_argument('--tolerance', type=float, default=0.1, help="允许的退化比例")
+    parser.add_argument('--output', metavar='PATH', help="将结果写入JSON文件")
+    parser.add_argument('--verbose', action='store_true', help="输出被测程序的INFO日志")
+    args = parser.parse_args()
+
+    results = run(args)
+    print_report(results)
+
+    for path in filter(None, (args.output, args.save_baseline)):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"结果已保存: {path}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print("\n发现性能退化:")
+            for item in regressions:
+                print(f"  - {item}")
+            return 1
+        print("\n未发现性能退化")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,82 @@
+"""
+启动耗时基准测试
+测量导入各模块的耗时（python -X importtime）和冷启动耗时（python -m src --help），
+适用于评估cron/容器中单次调用的启动开销。
+
+用法:
+    python benchmarks/startup_benchmark.py
+    python benchmarks/startup_benchmark.py --runs 20 --max-import-ms 300
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODULES = ('src.cli', 'src.main', 'src.summary_generator', 'src.paper_crawler', 'src.content_formatter')
+
+
+def import_time_ms(module: str) -> Dict[str, float]:
+    """
+    在全新的解释器中导入模块，解析 -X importtime 输出
+    :param module: 模块名
+    :return: 该模块及各顶层包的累计导入耗时（毫秒）
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    cumulative: Dict[str, float] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative_us, name = line[len('import time:'):].split('|')
+        name = name.strip()
+        # 只统计顶层包，子模块的耗时已计入顶层包的累计值
+        if name == module or '.' not in name:
+            cumulative[name] = max(cumulative.get(name, 0.0), int(cumulative_us) / 1000)
+    return cumulative
+
+
+def cold_start_ms(args: List[str], runs: int) -> List[float]:
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, '-m', 'src', *args], cwd=ROOT, capture_output=True, check=True)
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Zaka Media Push 启动耗时基准测试")
+    parser.add_argument('--runs', type=int, default=10, help="冷启动测量次数")
+    parser.add_argument('--top', type=int, default=8, help="列出耗时最多的依赖数")
+    parser.add_argument('--max-import-ms', type=float, help="src.cli 导入耗时上限，超出时返回非零退出码")
+    args = parser.parse_args()
+
+    exceeded = False
+    for module in MODULES:
+        cumulative = import_time_ms(module)
+        total = cumulative.get(module, 0.0)
+        heaviest = sorted(((ms, name) for name, ms in cumulative.items() if name != module), reverse=True)
+        print(f"{module:<28}{total:>9.1f} ms   " +
+              ', '.join(f"{name} {ms:.1f}" for ms, name in heaviest[:args.top]))
+        if module == 'src.cli' and args.max_import_ms and total > args.max_import_ms:
+            exceeded = True
+
+    samples = cold_start_ms(['--help'], args.runs)
+    print(f"\n冷启动 python -m src --help: 中位数 {statistics.median(samples):.1f} ms, "
+          f"最小 {min(samples):.1f} ms, 最大 {max(samples):.1f} ms（{args.runs} 次）")
+
+    if exceeded:
+        print(f"\nsrc.cli 导入耗时超过 {args.max_import_ms} ms")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,93 @@
+import threading
+from typing import TYPE_CHECKING, Any, Optional, Tuple
+from .utils import IntervalLimiter, Logger, PageCache, PaperCrawlError, dependency, metrics
+
+if TYPE_CHECKING:
+    import arxiv
+    import requests
+
+logger = Logger()
+
+
+class EmptyPageError(PaperCrawlError):
+    """arXiv对非首页返回了空结果，通常是临时故障，重试即可"""
+    transient = True
+
+
+class ArxivFeedFetcher:
+    """
+    arXiv Atom结果页的获取器
+    同一个进程内的所有arXiv客户端共用一个实例：请求之间遵守同一个最小间隔（无论来自哪个查询或线程），
+    结果页先查短期磁盘缓存，命中时既不请求也不占用请求间隔；
+    请求失败按 arxiv 依赖的重试策略重试，arXiv持续不可用时熔断，其余查询立即失败。
+    """
+
+    def __init__(self, delay_seconds: float, cache: Optional[PageCache] = None, timeout: float = 30):
+        """
+        :param delay_seconds: 相邻两次请求的最小间隔（秒）
+        :param cache: 结果页缓存，为 None 时不缓存
+        :param timeout: 单次请求超时（秒）
+        """
+        self.limiter = IntervalLimiter(delay_seconds)
+        self.cache = cache
+        self.timeout = timeout
+        self.dependency = dependency('arxiv')
+        self._session: Optional['requests.Session'] = None
+        self._session_lock = threading.Lock()
+
+    @property
+    def session(self) -> 'requests.Session':
+        with self._session_lock:
+            if self._session is None:
+                import requests
+                self._session = requests.Session()
+                self._session.headers['User-Agent'] = 'zaka-media-push'
+            return self._session
+
+    def bind(self, client: 'arxiv.Client') -> 'arxiv.Client':
+        """
+        让arXiv客户端通过本获取器请求结果页
+        arxiv.Client.results 逐页调用 _parse_feed，替换它即可接管请求、间隔和缓存，分页和结果解析仍由库完成
+        :param client: arXiv客户端
+        :return: 同一个客户端
+        """
+        client._parse_feed = lambda url, first_page=True: self.parse_feed(url, first_page)
+        return client
+
+    def fetch(self, url: str, first_page: bool = True) -> Tuple[bytes, Any]:
+        """
+        请求并解析一个结果页（不重试）
+        :param url: 请求URL
+        :param first_page: 是否为首页，首页为空表示没有结果，不视为错误
+        :return: (响应体, feedparser 解析结果)
+        """
+        import feedparser
+
+        self.limiter.wait()
+        metrics.add('arxiv_page_requests')
+        with metrics.timer('ArxivFeedFetcher.fetch'):
+            response = self.session.get(url, timeout=self.timeout)
+        response.raise_for_status()
+        feed = feedparser.parse(response.content)
+        if not feed.entries and not first_page:
+            raise EmptyPageError(f"arXiv返回意外的空页: {url}")
+        return response.content, feed
+
+    def parse_feed(self, url: str, first_page: bool = True) -> Any:
+        """
+        获取并解析结果页，优先使用缓存
+        :param url: 请求URL
+        :param first_page: 是否为首页
+        :return: feedparser 解析结果
+        """
+        if self.cache:
+            body = self.cache.get(url)
+            if body is not None:
+                import feedparser
+                metrics.add('arxiv_page_cache_hits')
+                return feedparser.parse(body)
+
+        body, feed = self.dependency.call(self.fetch, url, first_page)
+        if self.cache:
+            self.cache.put(url, body)
+        return feed
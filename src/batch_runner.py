@@ -0,0 +1,229 @@
+import json
+import os
+import time
+from datetime import datetime
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+from .summary_generator import SummaryGenerator, SECTIONS, clip_text
+from .utils import error_handler, log_once, SummaryGenerationError, Logger, metrics
+from .utils.config import Config
+from .models import Paper
+
+logger = Logger()
+config = Config()
+
+# 批处理任务的终止状态
+TERMINAL_STATUSES = ('completed', 'failed', 'expired', 'cancelled')
+
+CHAT_COMPLETIONS_ENDPOINT = '/v1/chat/completions'
+
+
+def make_custom_id(arxiv_id: str, section: str) -> str:
+    return f"{arxiv_id}::{section}"
+
+
+class BatchRunner:
+    """
+    基于OpenAI Batch API的摘要生成
+    将所有论文的提示词写入一个JSONL批处理文件并提交，轮询直到完成，
+    再按 custom_id（"<arXiv ID>::<部分>"）将结果映射回论文；
+    批处理中失败或缺失的部分回退到同步请求。
+    """
+
+    def __init__(self, generator: SummaryGenerator, work_dir: Optional[str] = None,
+                 poll_interval: Optional[float] = None, timeout: Optional[float] = None):
+        self.generator = generator
+        self._client = None
+        self.work_dir = work_dir if work_dir is not None else config.get('openai', 'batch_dir')
+        self.poll_interval = poll_interval if poll_interval is not None else config.get('openai', 'batch_poll_seconds')
+        self.timeout = timeout if timeout is not None else config.get('openai', 'batch_timeout_hours') * 3600
+
+    @property
+    def client(self):
+        """
+        同步OpenAI客户端（Files / Batches 接口），首次使用时创建
+        """
+        if self._client is None:
+            from openai import OpenAI
+            self._client = OpenAI(
+                api_key=config.get('openai', 'api_key'),
+                base_url=config.get('openai', 'base_url'),
+                timeout=config.get('openai', 'timeout')
+            )
+        return self._client
+
+    def build_requests(self, paper: Paper) -> Dict[str, Dict[str, Any]]:
+        """
+        构建单篇论文的请求
+        :param paper: 论文信息
+        :return: custom_id 到请求参数的映射
+        """
+        content = self.generator.build_paper_content(paper)
+        if self.generator.summary_mode == 'combined':
+            return {make_custom_id(paper.arxiv_id, 'combined'): self.generator.build_combined_request(content)}
+        return {
+            make_custom_id(paper.arxiv_id, section): self.generator.build_section_request(section, content)
+            for section in SECTIONS
+        }
+
+    def write_batch_file(self, requests: Dict[str, Dict[str, Any]]) -> str:
+        """
+        写入批处理输入文件
+        :param requests: custom_id 到请求参数的映射
+        :return: 文件路径
+        """
+        os.makedirs(self.work_dir, exist_ok=True)
+        path = os.path.join(self.work_dir, f"batch-{datetime.now().strftime('%Y%m%dT%H%M%S')}.jsonl")
+        with open(path, 'w', encoding='utf-8') as f:
+            for custom_id, body in requests.items():
+                line = {'custom_id': custom_id, 'method': 'POST', 'url': CHAT_COMPLETIONS_ENDPOINT, 'body': body}
+                f.write(json.dumps(line, ensure_ascii=False) + '\n')
+        return path
+
+    def submit(self, path: str) -> str:
+        """
+        上传批处理文件并创建批处理任务
+        :param path: 输入文件路径
+        :return: 批处理任务ID
+        """
+        with open(path, 'rb') as f:
+            input_file = self.client.files.create(file=f, purpose='batch')
+        batch = self.client.batches.create(
+            input_file_id=input_file.id,
+            endpoint=CHAT_COMPLETIONS_ENDPOINT,
+            completion_window='24h',
+            metadata={'source': 'zaka_media_push', 'file': os.path.basename(path)}
+        )
+        logger.info(f"已提交批处理任务: {batch.id}")
+        return batch.id
+
+    def wait(self, batch_id: str):
+        """
+        轮询直到批处理任务结束
+        :param batch_id: 批处理任务ID
+        :return: 批处理任务对象
+        """
+        deadline = time.monotonic() + self.timeout
+        with metrics.timer('openai.batch'):
+            while True:
+                batch = self.client.batches.retrieve(batch_id)
+                if batch.status in TERMINAL_STATUSES:
+                    counts = batch.request_counts
+                    if counts is not None:
+                        logger.info(f"批处理任务 {batch_id} 状态: {batch.status}, "
+                                    f"完成 {counts.completed}/{counts.total}, 失败 {counts.failed}")
+                    return batch
+                if time.monotonic() >= deadline:
+                    self.client.batches.cancel(batch_id)
+                    raise SummaryGenerationError(f"批处理任务超时: {batch_id}")
+                time.sleep(self.poll_interval)
+
+    def collect(self, batch, requests: Dict[str, Dict[str, Any]]) -> Dict[str, str]:
+        """
+        下载批处理结果
+        只接受正常结束（finish_reason 为 stop）的输出，因长度等原因被截断的输出既不缓存也不返回，
+        对应的部分回退到同步请求
+        :param batch: 批处理任务对象
+        :param requests: custom_id 到请求参数的映射，用于写入LLM缓存
+        :return: 成功的 custom_id 到模型输出的映射
+        """
+        outputs: Dict[str, str] = {}
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if not file_id:
+                continue
+            for line in self.client.files.content(file_id).text.splitlines():
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                response = record.get('response') or {}
+                if record.get('error') or response.get('status_code') != 200:
+                    metrics.add('llm_batch_failures', model=self.generator.model)
+                    continue
+                body = response.get('body') or {}
+                try:
+                    choice = body['choices'][0]
+                    text = choice['message']['content']
+                except (KeyError, IndexError, TypeError):
+                    continue
+                custom_id = record.get('custom_id')
+                if custom_id not in requests or text is None:
+                    continue
+                if body.get('usage'):
+                    metrics.record_usage(self.generator.model, SimpleNamespace(**body['usage']))
+                if choice.get('finish_reason') != 'stop':
+                    metrics.add('llm_batch_incomplete', model=self.generator.model,
+                                reason=str(choice.get('finish_reason')))
+                    continue
+                outputs[custom_id] = text
+                if self.generator.cache:
+                    self.generator.cache.set(self.generator.cache.make_key(requests[custom_id]), text)
+        return outputs
+
+    def _cached(self, requests: Dict[str, Dict[str, Any]]) -> Dict[str, str]:
+        cache = self.generator.cache
+        if not cache:
+            return {}
+        outputs = {}
+        for custom_id, request in requests.items():
+            text = cache.get(cache.make_key(request))
+            if text is not None:
+                outputs[custom_id] = text
+                metrics.add('llm_cache_hits', model=self.generator.model)
+        return outputs
+
+    def assemble(self, paper: Paper, outputs: Dict[str, str]) -> Dict[str, str]:
+        """
+        组装单篇论文的摘要，缺失的部分回退到同步请求，各部分与同步生成一样按 max_section_chars 截断
+        :param paper: 论文信息
+        :param outputs: custom_id 到模型输出的映射
+        :return: 包含各种摘要的字典
+        """
+        result: Dict[str, str] = {}
+        combined = outputs.get(make_custom_id(paper.arxiv_id, 'combined'))
+        if combined is not None:
+            result.update(self.generator.parse_combined_response(combined))
+        for section in SECTIONS:
+            text = outputs.get(make_custom_id(paper.arxiv_id, section))
+            if text is not None:
+                result[section] = text
+
+        if not result:
+            logger.warning(f"批处理结果缺失，改为同步生成: {paper.title}")
+            return self.generator.generate_comprehensive_summary(paper)
+        for section, text in result.items():
+            result[section] = clip_text(text, self.generator.max_section_chars)
+        content = self.generator.build_paper_content(paper)
+        for section in SECTIONS:
+            if section not in result:
+                result[section] = self.generator.generate_section(section, content)
+        return {section: result[section] for section in SECTIONS}
+
+    @error_handler
+    def run(self, papers: List[Paper]) -> Dict[str, Dict[str, str]]:
+        """
+        通过批处理生成多篇论文的摘要
+        :param papers: 论文列表
+        :return: arXiv ID 到摘要的映射，回退后仍失败的论文不在结果中
+        """
+        requests: Dict[str, Dict[str, Any]] = {}
+        for paper in papers:
+            requests.update(self.build_requests(paper))
+        outputs = self._cached(requests)
+        pending = {custom_id: request for custom_id, request in requests.items() if custom_id not in outputs}
+
+        if pending:
+            try:
+                path = self.write_batch_file(pending)
+                batch = self.wait(self.submit(path))
+                outputs.update(self.collect(batch, pending))
+            except Exception as e:
+                logger.error(f"批处理失败，全部改为同步生成: {str(e)}")
+        logger.info(f"批处理完成 {len(outputs)}/{len(requests)} 个请求")
+
+        summaries: Dict[str, Dict[str, str]] = {}
+        for paper in papers:
+            try:
+                summaries[paper.arxiv_id] = self.assemble(paper, outputs)
+            except Exception as e:
+                log_once(e, f"处理论文失败: {paper.title}, 错误: {str(e)}")
+        return summaries
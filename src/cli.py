@@ -0,0 +1,177 @@
+"""
+命令行入口
+    python -m src once                 # 执行一次每日任务后退出（适合cron/容器）
+    python -m src daemon               # 常驻运行，按计划每天执行
+    python -m src crawl-only           # 只爬取论文，写入JSONL
+    python -m src summarize-only       # 只为JSONL中的论文生成摘要
+    python -m src format-only          # 只将已生成的摘要格式化并保存
+    python -m src rebuild              # 模板修改后重新渲染受影响的输出文件
+    python -m src enqueue              # 爬取待处理的论文并写入工作队列
+    python -m src worker               # 从工作队列认领论文并处理，可在多个进程/主机上同时运行
+"""
+import argparse
+import json
+import signal
+import sys
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from .models import Paper, dump_jsonl, load_jsonl
+from .utils import Logger, atomic_open, log_once
+
+logger = Logger()
+
+DEFAULT_PAPERS_PATH = 'state/papers.jsonl'
+DEFAULT_SUMMARIES_PATH = 'state/summaries.jsonl'
+
+
+def dump_summaries(records: Iterable[Tuple[Paper, Dict[str, str]]], path: str) -> int:
+    """
+    将论文及其摘要写入JSONL文件（原子替换）
+    :param records: (论文, 摘要) 序列
+    :param path: 文件路径
+    :return: 写入的条数
+    """
+    count = 0
+    with atomic_open(path) as f:
+        for paper, summary in records:
+            f.write(json.dumps({'paper': paper.to_dict(), 'summary': summary}, ensure_ascii=False))
+            f.write('\n')
+            count += 1
+    return count
+
+
+def iter_summaries(path: str) -> Iterator[Tuple[Paper, Dict[str, str]]]:
+    """
+    逐行读取论文及其摘要
+    :param path: 文件路径
+    :return: (论文, 摘要) 迭代器
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                yield Paper.from_dict(record['paper']), record['summary']
+
+
+def cmd_once(app, args) -> int:
+    app.config.validate()
+    app.daily_task()
+    return 0
+
+
+def cmd_daemon(app, args) -> int:
+    app.run()
+    return 0
+
+
+def cmd_crawl(app, args) -> int:
+    count = dump_jsonl(app.iter_new_papers(), args.output)
+    logger.info(f"已爬取 {count} 篇论文: {args.output}")
+    return 0
+
+
+def cmd_summarize(app, args) -> int:
+    from .pipeline import PaperPipeline, PipelineStage
+
+    app.config.validate()
+    papers = load_jsonl(args.input)
+    workers = app.config.get('pipeline', 'workers')['summarize']
+    items = PaperPipeline([PipelineStage('summarize', app._stage_summarize, workers)]).run(papers)
+    succeeded = [(item.paper, item.results['summarize']) for item in items if item.ok]
+    dump_summaries(succeeded, args.output)
+    logger.info(f"已生成 {len(succeeded)}/{len(papers)} 篇论文的摘要: {args.output}")
+    return 0 if len(succeeded) == len(papers) else 1
+
+
+def cmd_format(app, args) -> int:
+    formatted: List[Paper] = []
+    total = 0
+    for paper, summary in iter_summaries(args.input):
+        total += 1
+        try:
+            app.formatter.format_and_save(paper, summary)
+            formatted.append(paper)
+        except Exception as e:
+            log_once(e, f"处理论文失败: {paper.title}, 错误: {str(e)}")
+    if app.index:
+        app.index.mark_processed(formatted)
+    logger.info(f"已格式化 {len(formatted)}/{total} 篇论文")
+    return 0 if len(formatted) == total else 1
+
+
+def cmd_rebuild(app, args) -> int:
+    count = app.formatter.rebuild_stale()
+    logger.info(f"已重新渲染 {count} 个输出文件")
+    return 0
+
+
+def cmd_enqueue(app, args) -> int:
+    run_started = datetime.now(timezone.utc)
+    job = app.default_job()
+    count = app.work_queue.enqueue(app.iter_new_papers(job))
+    # 入队即视为本次爬取完成，论文是否处理成功由队列跟踪
+    if app.index:
+        app.index.set_watermark(run_started, job.name)
+    logger.info(f"已入队 {count} 篇论文，队列状态: {app.work_queue.stats()}")
+    return 0
+
+
+def cmd_worker(app, args) -> int:
+    from .worker import QueueWorker
+
+    app.config.validate()
+    worker = QueueWorker(app, app.work_queue, worker_id=args.worker_id, threads=args.threads)
+    # 收到终止信号后不再认领新论文，处理中的论文完成后退出
+    signal.signal(signal.SIGTERM, lambda signum, frame: worker.stop())
+    signal.signal(signal.SIGINT, lambda signum, frame: worker.stop())
+    worker.run(exit_when_empty=args.exit_when_empty)
+    return 0 if worker.failed == 0 else 1
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='python -m src', description="Zaka Media Push 学术论文推送")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    subparsers.add_parser('once', help="执行一次每日任务后退出").set_defaults(func=cmd_once)
+    subparsers.add_parser('daemon', help="常驻运行，按计划每天执行").set_defaults(func=cmd_daemon)
+
+    crawl = subparsers.add_parser('crawl-only', help="只爬取待处理的论文")
+    crawl.add_argument('--output', default=DEFAULT_PAPERS_PATH, help="论文JSONL输出路径")
+    crawl.set_defaults(func=cmd_crawl)
+
+    summarize = subparsers.add_parser('summarize-only', help="只为论文生成摘要")
+    summarize.add_argument('--input', default=DEFAULT_PAPERS_PATH, help="论文JSONL路径")
+    summarize.add_argument('--output', default=DEFAULT_SUMMARIES_PATH, help="摘要JSONL输出路径")
+    summarize.set_defaults(func=cmd_summarize)
+
+    fmt = subparsers.add_parser('format-only', help="只格式化并保存已生成的摘要")
+    fmt.add_argument('--input', default=DEFAULT_SUMMARIES_PATH, help="摘要JSONL路径")
+    fmt.set_defaults(func=cmd_format)
+
+    subparsers.add_parser('rebuild', help="模板修改后重新渲染受影响的输出文件").set_defaults(func=cmd_rebuild)
+
+    subparsers.add_parser('enqueue', help="爬取待处理的论文并写入工作队列").set_defaults(func=cmd_enqueue)
+
+    worker = subparsers.add_parser('worker', help="从工作队列认领论文并处理")
+    worker.add_argument('--threads', type=int, default=None, help="处理线程数，默认读取 WORKER_THREADS")
+    worker.add_argument('--worker-id', default=None, help="工作进程标识，默认为 主机名-进程号")
+    worker.add_argument('--exit-when-empty', action='store_true', help="队列中没有待处理论文时退出")
+    worker.set_defaults(func=cmd_worker)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    from .main import ZakaMediaPush
+
+    try:
+        return args.func(ZakaMediaPush(), args)
+    except KeyboardInterrupt:
+        return 130
+    except Exception as e:
+        logger.error(f"命令执行失败: {args.command}, 错误: {str(e)}")
+        return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,65 +1,313 @@
+import hashlib
+import json
 import os
-import jinja2
-from typing import Dict, Any
-from .utils import error_handler, ContentFormatError, Logger
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Set
+from .utils import error_handler, ContentFormatError, Logger, OutputManifest, atomic_write, metrics
 from .utils.config import Config
+from .models import Paper
+from .summary_generator import SECTIONS, SECTION_PROMPTS
 
 logger = Logger()
 config = Config()
 
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def content_hash(text: str) -> str:
+    """
+    计算文本的SHA-256哈希
+    :param text: 文本
+    :return: 十六进制哈希
+    """
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class PlatformRenderer:
+    """
+    平台渲染器
+    :param name: 平台名称，同时作为输出文件名前缀
+    :param template_path: 模板路径，相对路径以项目根目录为基准，为 None 时读取配置项 output.<name>_template
+    :param variables: 模板变量到共享上下文键的映射，为 None 时直接传入整个上下文
+    :param label: 用于日志的平台中文名
+    """
+
+    def __init__(self, name: str, template_path: Optional[str] = None, variables: Optional[Dict[str, str]] = None,
+                 label: Optional[str] = None):
+        self.name = name
+        self.template_path = template_path
+        self.variables = variables
+        self.label = label or name
+
+    @property
+    def resolved_path(self) -> str:
+        template_path = self.template_path or config.get('output', f"{self.name}_template")
+        if os.path.isabs(template_path):
+            return template_path
+        return os.path.join(PROJECT_ROOT, template_path)
+
+    def template_context(self, context: Dict[str, Any]) -> Dict[str, Any]:
+        if self.variables is None:
+            return context
+        return {var: context[key] for var, key in self.variables.items()}
+
+
+_PLATFORMS: Dict[str, PlatformRenderer] = {}
+
+
+def register_platform(renderer: PlatformRenderer):
+    """
+    注册平台渲染器，同名平台会被覆盖
+    :param renderer: 平台渲染器
+    """
+    _PLATFORMS[renderer.name.lower()] = renderer
+
+
+def get_platforms() -> Dict[str, PlatformRenderer]:
+    """
+    获取已注册的平台
+    :return: 平台名称到渲染器的映射
+    """
+    return dict(_PLATFORMS)
+
+
+register_platform(PlatformRenderer(
+    'wechat',
+    variables={
+        'title': 'title',
+        'authors': 'authors',
+        'pdf_url': 'pdf_url',
+        'summary': 'abstract',
+        'detailed_summary': 'summary',
+        'significance': 'implications',
+        'categories': 'categories',
+        'publish_date': 'publish_date'
+    },
+    label='微信公众号文章'
+))
+register_platform(PlatformRenderer(
+    'xiaohongshu',
+    variables={
+        'title': 'title',
+        'authors': 'authors',
+        'summary': 'highlights',
+        'significance': 'implications',
+        'results': 'technical_details',
+        'primary_category': 'primary_category'
+    },
+    label='小红书内容'
+))
+
+
+class DraftWriter:
+    """
+    流式生成时的草稿文件
+    各部分已生成的内容随到随写：每隔 interval 秒整体重写一次（先写临时文件再替换），
+    任何时候打开文件看到的都是完整的中间结果。回调可能来自多个线程，写入时加锁。
+    :param path: 草稿文件路径
+    :param title: 论文标题
+    :param interval: 两次写入的最短间隔（秒）
+    """
+
+    def __init__(self, path: str, title: str, interval: float = 0.5):
+        self.path = path
+        self.title = title
+        self.interval = interval
+        self.sections: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._written = 0.0
+
+    def update(self, section: str, text: str):
+        """
+        更新某个部分的内容，距上次写入超过间隔时写入文件
+        :param section: 部分名称
+        :param text: 目前已生成的全部文本
+        """
+        with self._lock:
+            self.sections[section] = text
+            if time.monotonic() - self._written >= self.interval:
+                self._write()
+
+    def flush(self):
+        """
+        立即写入当前内容
+        """
+        with self._lock:
+            if self.sections:
+                self._write()
+
+    def _write(self):
+        parts = [f"# {self.title}"]
+        for section in SECTIONS:
+            if section in self.sections:
+                parts.append(f"## {SECTION_PROMPTS[section]['label']}\n\n{self.sections[section]}")
+        atomic_write(self.path, '\n\n'.join(parts) + '\n')
+        self._written = time.monotonic()
+
+
 class ContentFormatter:
-    def __init__(self):
-        self.template_loader = jinja2.FileSystemLoader(searchpath="./templates")
-        self.template_env = jinja2.Environment(loader=self.template_loader)
-    
-    @error_handler
-    def format_wechat_article(self, paper: Dict[str, Any], summary: Dict[str, str]) -> str:
+    """
+    内容格式化与输出
+    输出文件按arXiv ID存放在 <OUTPUT_DIR>/<平台>/<arXiv ID>.md，输出清单记录每个文件的内容哈希以及所用的模板和上下文：
+    模板和上下文都未变化时不再渲染，渲染结果与已有文件相同时不再写盘；
+    模板修改后 rebuild_stale 只用保存的上下文重新渲染受影响的文件；
+    按日索引 <OUTPUT_DIR>/index/<日期>.md 只在当天的论文有变化时根据清单重新生成。
+    """
+
+    def __init__(self, platforms: Optional[List[str]] = None):
+        names = platforms or config.get('output', 'platforms')
+        unknown = [name for name in names if name.lower() not in _PLATFORMS]
+        if unknown:
+            raise ContentFormatError(f"不支持的平台: {', '.join(unknown)}")
+        self.renderers = [_PLATFORMS[name.lower()] for name in names]
+
+        # 模板按平台名加载，启动时一次性编译，编译结果缓存在磁盘上
+        import jinja2
+        paths = {renderer.name: renderer.resolved_path for renderer in self.renderers}
+        cache_dir = config.get('output', 'template_cache_dir')
+        os.makedirs(cache_dir, exist_ok=True)
+        self.template_env = jinja2.Environment(
+            loader=jinja2.FunctionLoader(lambda name: self._load_template(paths, name)),
+            bytecode_cache=jinja2.FileSystemBytecodeCache(cache_dir),
+            auto_reload=False
+        )
+        self.templates = {
+            renderer.name: self.template_env.get_template(renderer.name) for renderer in self.renderers
+        }
+        self.template_hashes = {name: self._file_hash(path) for name, path in paths.items()}
+
+        self.output_dir = config.get('output', 'dir')
+        self.manifest = OutputManifest(
+            config.get('output', 'manifest_path') or os.path.join(self.output_dir, '.manifest.sqlite3')
+        )
+        self._index_lock = threading.Lock()
+
+    @staticmethod
+    def _load_template(paths: Dict[str, str], name: str):
+        path = paths.get(name)
+        if path is None:
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            source = f.read()
+        mtime = os.path.getmtime(path)
+        return source, path, lambda: os.path.getmtime(path) == mtime
+
+    @staticmethod
+    def _file_hash(path: str) -> str:
+        with open(path, 'rb') as f:
+            return hashlib.sha256(f.read()).hexdigest()
+
+    @staticmethod
+    def build_context(paper: Paper, summary: Dict[str, str]) -> Dict[str, Any]:
         """
-        格式化微信公众号文章
+        构建各平台共享的渲染上下文
         :param paper: 论文信息
         :param summary: 论文摘要
-        :return: 格式化后的文章
+        :return: 渲染上下文
         """
+        return {
+            'title': paper.title,
+            'authors': paper.authors_text,
+            'pdf_url': paper.pdf_url,
+            'abstract': paper.summary,
+            'categories': paper.categories_text,
+            'primary_category': paper.primary_category,
+            'publish_date': paper.publish_date,
+            'summary': summary['summary'],
+            'highlights': summary['highlights'],
+            'implications': summary['implications'],
+            'technical_details': summary['technical_details']
+        }
+
+    def _render(self, renderer: PlatformRenderer, context: Dict[str, Any]) -> str:
         try:
-            template = self.template_env.get_template('wechat.md')
-            content = template.render(
-                title=paper['title'],
-                authors=', '.join(paper['authors']),
-                pdf_url=paper['pdf_url'],
-                summary=paper['summary'],
-                detailed_summary=summary['summary'],
-                significance=summary['implications'],
-                categories=', '.join(paper['categories']),
-                publish_date=paper['published'].strftime('%Y-%m-%d')
-            )
-            logger.info("成功生成微信公众号文章")
+            content = self.templates[renderer.name].render(renderer.template_context(context))
+            logger.info(f"成功生成{renderer.label}")
             return content
         except Exception as e:
-            raise ContentFormatError(f"微信公众号文章格式化失败: {str(e)}")
-    
+            raise ContentFormatError(f"{renderer.label}格式化失败: {str(e)}")
+
+    def _renderer(self, platform: str) -> PlatformRenderer:
+        for renderer in self.renderers:
+            if renderer.name == platform.lower():
+                return renderer
+        raise ContentFormatError(f"不支持的平台: {platform}")
+
+    @error_handler
+    def format_wechat_article(self, paper: Paper, summary: Dict[str, str]) -> str:
+        """
+        格式化微信公众号文章
+        :param paper: 论文信息
+        :param summary: 论文摘要
+        :return: 格式化后的文章
+        """
+        return self._render(self._renderer('wechat'), self.build_context(paper, summary))
+
     @error_handler
-    def format_xiaohongshu(self, paper: Dict[str, Any], summary: Dict[str, str]) -> str:
+    def format_xiaohongshu(self, paper: Paper, summary: Dict[str, str]) -> str:
         """
         格式化小红书内容
         :param paper: 论文信息
         :param summary: 论文摘要
         :return: 格式化后的内容
         """
+        return self._render(self._renderer('xiaohongshu'), self.build_context(paper, summary))
+
+    @error_handler
+    def format_all(self, paper: Paper, summary: Dict[str, str]) -> Dict[str, str]:
+        """
+        使用同一份上下文为所有启用的平台生成内容
+        :param paper: 论文信息
+        :param summary: 论文摘要
+        :return: 平台名称到内容的映射
+        """
+        context = self.build_context(paper, summary)
+        return {renderer.name: self._render(renderer, context) for renderer in self.renderers}
+
+    @staticmethod
+    def base_filename(paper: Paper) -> str:
+        """
+        论文输出文件名（不含目录和扩展名），为不含版本的arXiv ID，旧式ID中的 / 替换为 _
+        :param paper: 论文信息
+        :return: 文件名
+        """
+        return paper.base_id.replace('/', '_')
+
+    def output_path(self, paper_id: str, platform: str) -> str:
+        """
+        论文在某个平台的输出文件路径
+        :param paper_id: 不含版本的arXiv ID
+        :param platform: 平台名称
+        :return: 文件路径
+        """
+        return os.path.join(self.output_dir, platform, f"{paper_id.replace('/', '_')}.md")
+
+    @staticmethod
+    def draft_path(paper: Paper) -> str:
+        draft_dir = config.get('output', 'draft_dir') or os.path.join(config.get('output', 'dir'), 'drafts')
+        return os.path.join(draft_dir, f"{ContentFormatter.base_filename(paper)}.md")
+
+    def open_draft(self, paper: Paper) -> DraftWriter:
+        """
+        为流式生成创建草稿文件，最终内容保存成功后草稿会被删除
+        :param paper: 论文信息
+        :return: 草稿写入器
+        """
+        path = self.draft_path(paper)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        return DraftWriter(path, paper.title)
+
+    def discard_draft(self, paper: Paper):
+        """
+        删除论文的草稿文件（如果存在）
+        :param paper: 论文信息
+        """
         try:
-            template = self.template_env.get_template('xiaohongshu.md')
-            content = template.render(
-                title=paper['title'],
-                authors=', '.join(paper['authors']),
-                summary=summary['highlights'],
-                significance=summary['implications'],
-                results=summary['technical_details'],
-                primary_category=paper['primary_category']
-            )
-            logger.info("成功生成小红书内容")
-            return content
-        except Exception as e:
-            raise ContentFormatError(f"小红书内容格式化失败: {str(e)}")
-    
+            os.remove(self.draft_path(paper))
+        except FileNotFoundError:
+            pass
+
     @error_handler
     def save_content(self, content: str, filename: str) -> str:
         """
@@ -69,49 +317,131 @@ class ContentFormatter:
         :return: 文件路径
         """
         try:
-            output_dir = config.get('output', 'dir')
-            os.makedirs(output_dir, exist_ok=True)
-            
-            filepath = os.path.join(output_dir, filename)
-            with open(filepath, 'w', encoding='utf-8') as f:
-                f.write(content)
-            
+            # 先写临时文件再替换，中途退出不会留下写了一半的文件
+            filepath = os.path.join(self.output_dir, filename)
+            atomic_write(filepath, content)
+
             logger.info(f"成功保存内容到文件: {filepath}")
             return filepath
         except Exception as e:
             raise ContentFormatError(f"内容保存失败: {str(e)}")
-    
+
+    def _write_output(self, paper_id: str, renderer: PlatformRenderer, context: Dict[str, Any],
+                      context_digest: str) -> bool:
+        """
+        渲染并保存一个平台的输出文件，模板和上下文都未变化时跳过渲染，内容未变化时跳过写盘
+        :param paper_id: 不含版本的arXiv ID
+        :param renderer: 平台渲染器
+        :param context: 渲染上下文
+        :param context_digest: 渲染上下文哈希
+        :return: 文件内容是否有变化
+        """
+        template_digest = self.template_hashes[renderer.name]
+        path = self.output_path(paper_id, renderer.name)
+        entry = self.manifest.get(paper_id, renderer.name)
+        exists = entry is not None and entry['path'] == path and os.path.exists(path)
+        if exists and entry['template_hash'] == template_digest and entry['context_hash'] == context_digest:
+            metrics.add('output_renders_skipped', platform=renderer.name)
+            return False
+
+        content = self._render(renderer, context)
+        digest = content_hash(content)
+        changed = not (exists and entry['content_hash'] == digest)
+        if changed:
+            self.save_content(content, os.path.relpath(path, self.output_dir))
+        else:
+            metrics.add('output_writes_skipped', platform=renderer.name)
+        self.manifest.put_output(paper_id, renderer.name, path, digest, template_digest, context_digest)
+        return changed
+
+    def write_day_index(self, day: str) -> str:
+        """
+        根据输出清单重新生成某一天的索引，内容未变化时不写盘
+        :param day: 日期（YYYY-MM-DD）
+        :return: 索引文件路径
+        """
+        labels = {renderer.name: renderer.label for renderer in _PLATFORMS.values()}
+        path = os.path.join(self.output_dir, 'index', f"{day}.md")
+        with self._index_lock:
+            lines = [f"# {day} 论文", ""]
+            for paper_id, title, outputs in self.manifest.day_papers(day):
+                links = ' | '.join(
+                    f"[{labels.get(platform, platform)}]({os.path.relpath(output, os.path.dirname(path))})"
+                    for platform, output in sorted(outputs.items())
+                )
+                lines.append(f"- **{title}**（arXiv:{paper_id}）：{links}")
+            content = '\n'.join(lines) + '\n'
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    if f.read() == content:
+                        return path
+            except FileNotFoundError:
+                pass
+            atomic_write(path, content)
+        return path
+
+    def write_day_indexes(self, days: Iterable[str]):
+        """
+        重新生成多天的索引
+        :param days: 日期列表
+        """
+        for day in sorted(set(days)):
+            self.write_day_index(day)
+
     @error_handler
-    def format_and_save(self, paper: Dict[str, Any], summary: Dict[str, str]) -> Dict[str, str]:
+    def format_and_save(self, paper: Paper, summary: Dict[str, str]) -> Dict[str, str]:
         """
-        格式化并保存内容
+        格式化并保存内容，只重写有变化的文件并更新论文所在日期的索引
         :param paper: 论文信息
         :param summary: 论文摘要
         :return: 保存的文件路径
         """
         try:
-            # 生成内容
-            wechat_content = self.format_wechat_article(paper, summary)
-            xiaohongshu_content = self.format_xiaohongshu(paper, summary)
-            
-            # 生成文件名
-            base_filename = f"{paper['title'][:20]}_{paper['published'].strftime('%Y%m%d')}"
-            wechat_filename = f"wechat_{base_filename}.md"
-            xiaohongshu_filename = f"xiaohongshu_{base_filename}.md"
-            
-            # 保存文件
-            wechat_path = self.save_content(wechat_content, wechat_filename)
-            xiaohongshu_path = self.save_content(xiaohongshu_content, xiaohongshu_filename)
-            
-            return {
-                'wechat': wechat_path,
-                'xiaohongshu': xiaohongshu_path
-            }
+            context = self.build_context(paper, summary)
+            serialized = json.dumps(context, ensure_ascii=False, sort_keys=True, default=str)
+            context_digest = content_hash(serialized)
+            previous_day = self.manifest.put_paper(paper.base_id, paper.publish_date, paper.title, serialized)
+
+            changed = False
+            for renderer in self.renderers:
+                changed = self._write_output(paper.base_id, renderer, context, context_digest) or changed
+            self.discard_draft(paper)
+
+            # 只有新论文、内容有变化或日期变化时才更新索引
+            days: Set[str] = set()
+            if changed or previous_day != paper.publish_date:
+                days.add(paper.publish_date)
+                if previous_day:
+                    days.add(previous_day)
+            self.write_day_indexes(days)
+            return {renderer.name: self.output_path(paper.base_id, renderer.name) for renderer in self.renderers}
         except Exception as e:
             raise ContentFormatError(f"内容格式化并保存失败: {str(e)}")
-    
+
+    @error_handler
+    def rebuild_stale(self) -> int:
+        """
+        用保存的渲染上下文重新渲染模板已修改的输出文件，并更新受影响日期的索引
+        :return: 重新渲染的文件数
+        """
+        try:
+            rebuilt = 0
+            days: Set[str] = set()
+            for renderer in self.renderers:
+                for paper_id, day, serialized in self.manifest.stale_outputs(
+                        renderer.name, self.template_hashes[renderer.name]):
+                    if self._write_output(paper_id, renderer, json.loads(serialized), content_hash(serialized)):
+                        days.add(day)
+                    rebuilt += 1
+            self.write_day_indexes(days)
+            if rebuilt:
+                logger.info(f"模板已修改，重新渲染 {rebuilt} 个输出文件")
+            return rebuilt
+        except Exception as e:
+            raise ContentFormatError(f"重新渲染输出文件失败: {str(e)}")
+
     @error_handler
-    def format_for_platform(self, platform: str, paper: Dict[str, Any], summary: Dict[str, str]) -> str:
+    def format_for_platform(self, platform: str, paper: Paper, summary: Dict[str, str]) -> str:
         """
         为指定平台格式化内容
         :param platform: 平台名称
@@ -120,11 +450,6 @@ class ContentFormatter:
         :return: 格式化后的内容
         """
         try:
-            if platform.lower() == 'wechat':
-                return self.format_wechat_article(paper, summary)
-            elif platform.lower() == 'xiaohongshu':
-                return self.format_xiaohongshu(paper, summary)
-            else:
-                raise ContentFormatError(f"不支持的平台: {platform}")
+            return self._render(self._renderer(platform), self.build_context(paper, summary))
         except Exception as e:
-            raise ContentFormatError(f"平台内容格式化失败: {str(e)}") 
\ No newline at end of file
+            raise ContentFormatError(f"平台内容格式化失败: {str(e)}")
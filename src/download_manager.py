@@ -0,0 +1,172 @@
+import hashlib
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+import requests
+from requests.adapters import HTTPAdapter
+from .utils import PaperCrawlError, Logger, atomic_write, dependency, log_once
+from .models import Paper
+
+logger = Logger()
+
+_UNSAFE_FILENAME_CHARS = re.compile(r'[\\/:*?"<>|\r\n\t]')
+
+
+class IncompleteDownloadError(PaperCrawlError):
+    """连接中途断开导致文件不完整，重试时从已接收的位置续传"""
+    transient = True
+
+
+class DownloadManager:
+    """
+    PDF下载管理器
+    使用连接池复用HTTP连接，限制全局并发下载数；
+    下载先写入 .part 临时文件，支持Range断点续传，完成后原子重命名，
+    并记录 .sha256 校验文件，已下载且校验通过的文件直接跳过。
+    失败按 pdf 依赖的重试策略重试（从 .part 文件断点续传），下载源持续不可用时熔断。
+    """
+
+    def __init__(self, output_dir: str, max_concurrency: int = 4, timeout: float = 60,
+                 chunk_size: int = 64 * 1024):
+        self.output_dir = output_dir
+        self.max_concurrency = max(1, max_concurrency)
+        self.timeout = timeout
+        self.chunk_size = chunk_size
+        self._slots = threading.BoundedSemaphore(self.max_concurrency)
+        # 同一目标文件同时只允许一个线程下载，否则会交错写入同一个 .part 文件
+        self._path_locks: Dict[str, threading.Lock] = {}
+        self._path_locks_guard = threading.Lock()
+        self.dependency = dependency('pdf')
+
+        adapter = HTTPAdapter(pool_connections=self.max_concurrency, pool_maxsize=self.max_concurrency)
+        self.session = requests.Session()
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def target_path(self, paper: Paper) -> str:
+        """
+        计算论文PDF的保存路径
+        以带版本的arXiv ID为键（旧式ID中的 / 替换为 _），标题相近的论文不会互相覆盖，
+        论文有新版本时也会重新下载；标题前缀只为便于辨认
+        :param paper: 论文信息
+        :return: 文件路径
+        """
+        paper_id = paper.arxiv_id.replace('/', '_')
+        title = _UNSAFE_FILENAME_CHARS.sub('_', paper.title[:40]).strip()
+        filename = f"{paper_id}_{title}.pdf" if title else f"{paper_id}.pdf"
+        return os.path.join(self.output_dir, filename)
+
+    @staticmethod
+    def _checksum_path(path: str) -> str:
+        return f"{path}.sha256"
+
+    @staticmethod
+    def _file_digest(path: str) -> Tuple[str, int]:
+        digest = hashlib.sha256()
+        size = 0
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(block)
+                size += len(block)
+        return digest.hexdigest(), size
+
+    def is_complete(self, path: str) -> bool:
+        """
+        检查文件是否已完整下载
+        :param path: 文件路径
+        :return: 文件存在且大小、哈希与校验文件一致时返回 True
+        """
+        checksum_path = self._checksum_path(path)
+        if not (os.path.exists(path) and os.path.exists(checksum_path)):
+            return False
+        with open(checksum_path, 'r', encoding='utf-8') as f:
+            parts = f.read().split()
+        if len(parts) != 2 or os.path.getsize(path) != int(parts[1]):
+            return False
+        return self._file_digest(path)[0] == parts[0]
+
+    def download(self, paper: Paper) -> str:
+        """
+        下载单篇论文PDF
+        :param paper: 论文信息
+        :return: 下载的文件路径
+        """
+        if not paper.pdf_url:
+            raise PaperCrawlError("论文PDF链接不存在")
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        path = self.target_path(paper)
+        with self._path_lock(path):
+            # 等锁期间其他线程可能已下载完成
+            if self.is_complete(path):
+                logger.info(f"论文已下载，跳过: {os.path.basename(path)}")
+                return path
+
+            with self._slots:
+                self.dependency.call(self._fetch, paper.pdf_url, path)
+        logger.info(f"成功下载论文: {os.path.basename(path)}")
+        return path
+
+    def _path_lock(self, path: str) -> threading.Lock:
+        with self._path_locks_guard:
+            return self._path_locks.setdefault(path, threading.Lock())
+
+    def _fetch(self, url: str, path: str, allow_resume: bool = True):
+        part_path = f"{path}.part"
+        offset = os.path.getsize(part_path) if allow_resume and os.path.exists(part_path) else 0
+        headers = {'Range': f'bytes={offset}-'} if offset else {}
+
+        with self.session.get(url, stream=True, timeout=self.timeout, headers=headers) as response:
+            if response.status_code == 416 and offset:
+                # 临时文件与服务端不一致，重新完整下载
+                os.remove(part_path)
+                return self._fetch(url, path, allow_resume=False)
+            response.raise_for_status()
+            if response.status_code not in (200, 206):
+                raise PaperCrawlError(f"下载失败，状态码: {response.status_code}")
+
+            resumed = response.status_code == 206
+            if not resumed:
+                offset = 0
+            content_length = response.headers.get('Content-Length')
+            expected = offset + int(content_length) if content_length else None
+
+            with open(part_path, 'ab' if resumed else 'wb') as f:
+                for chunk in response.iter_content(chunk_size=self.chunk_size):
+                    f.write(chunk)
+                f.flush()
+                os.fsync(f.fileno())
+
+        size = os.path.getsize(part_path)
+        if expected is not None and size != expected:
+            raise IncompleteDownloadError(f"下载不完整: 已接收 {size} 字节，预期 {expected} 字节")
+
+        digest, size = self._file_digest(part_path)
+        os.replace(part_path, path)
+        atomic_write(self._checksum_path(path), f"{digest} {size}\n")
+        if resumed:
+            logger.info(f"断点续传完成: {os.path.basename(path)}，续传起点 {offset} 字节")
+
+    def download_all(self, papers: List[Paper]) -> Dict[str, Optional[str]]:
+        """
+        并发下载一批论文，单篇失败不影响其他论文
+        :param papers: 论文列表
+        :return: arXiv ID 到文件路径的映射，下载失败的论文对应 None
+        """
+        results: Dict[str, Optional[str]] = {}
+        with ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="download") as executor:
+            futures = {executor.submit(self.download, paper): paper for paper in papers}
+            for future, paper in futures.items():
+                try:
+                    results[paper.arxiv_id] = future.result()
+                except Exception as e:
+                    log_once(e, f"论文下载失败: {paper.title}, 错误: {str(e)}")
+                    results[paper.arxiv_id] = None
+        succeeded = sum(1 for path in results.values() if path)
+        logger.info(f"批量下载完成: 成功 {succeeded}/{len(papers)} 篇")
+        return results
+
+    def close(self):
+        self.session.close()
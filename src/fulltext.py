@@ -0,0 +1,230 @@
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+from .summary_generator import SummaryGenerator, ProgressCallback
+from .utils import error_handler, SummaryGenerationError, Logger, metrics
+from .utils.config import Config
+from .utils.rate_limiter import estimate_text_tokens
+from .models import Paper
+
+logger = Logger()
+config = Config()
+
+CHUNK_SYSTEM = "你是一个专业的学术论文阅读助手。"
+
+# map：提炼单个片段的要点
+CHUNK_PROMPT = """
+            以下是论文《{title}》全文的第 {index}/{total} 部分：
+
+            {chunk}
+
+            请用中文提炼这一部分的要点，包括研究问题、方法、实验设置与结果、结论中出现的关键信息，
+            保留重要的数字和术语，不要编造原文中没有的内容。
+            """
+
+# reduce：要点总量超出预算时，将相邻片段的要点分组合并
+MERGE_PROMPT = """
+            以下是论文《{title}》若干连续部分的要点：
+
+            {notes}
+
+            请用中文将它们合并为一份连贯、不重复的要点摘要，保留关键的方法、数字和结论。
+            """
+
+_HYPHEN_BREAK = re.compile(r'(\w)-\n(\w)')
+_SPACES = re.compile(r'[ \t ]+')
+# 参考文献之后的内容对摘要没有帮助，遇到即停止读取
+_REFERENCES_HEADING = re.compile(r'^\s*(\d+\.?\s*)?(references|bibliography|参考文献)\s*$', re.IGNORECASE)
+
+
+def iter_pdf_pages(path: str) -> Iterator[str]:
+    """
+    逐页提取PDF文本，一次只解析一页
+    :param path: PDF文件路径
+    :return: 每页文本的迭代器
+    """
+    from pypdf import PdfReader
+
+    reader = PdfReader(path)
+    for number, page in enumerate(reader.pages, 1):
+        try:
+            yield page.extract_text() or ''
+        except Exception as e:
+            logger.warning(f"PDF第{number}页文本提取失败: {path}, 错误: {str(e)}")
+
+
+def clean_text(text: str) -> str:
+    """
+    合并断行连字符并压缩空白
+    :param text: 原始文本
+    :return: 清理后的文本
+    """
+    return _SPACES.sub(' ', _HYPHEN_BREAK.sub(r'\1\2', text))
+
+
+def _split_long_line(line: str, max_tokens: int) -> Iterator[str]:
+    # 单行超出预算时按字符数切分，按每字一个令牌保守估算
+    for start in range(0, len(line), max_tokens):
+        yield line[start:start + max_tokens]
+
+
+def iter_chunks(pages: Iterable[str], max_tokens: int) -> Iterator[str]:
+    """
+    将逐页文本按令牌预算切分为片段，片段边界尽量落在行尾
+    :param pages: 每页文本
+    :param max_tokens: 每个片段的令牌上限
+    :return: 片段迭代器
+    """
+    buffer: List[str] = []
+    size = 0
+    for page in pages:
+        for line in clean_text(page).split('\n'):
+            line = line.strip()
+            if not line:
+                continue
+            if _REFERENCES_HEADING.match(line):
+                if buffer:
+                    yield '\n'.join(buffer)
+                return
+            tokens = estimate_text_tokens(line)
+            parts = [line] if tokens <= max_tokens else list(_split_long_line(line, max_tokens))
+            for part in parts:
+                part_tokens = estimate_text_tokens(part)
+                if buffer and size + part_tokens > max_tokens:
+                    yield '\n'.join(buffer)
+                    buffer, size = [], 0
+                buffer.append(part)
+                size += part_tokens
+    if buffer:
+        yield '\n'.join(buffer)
+
+
+class FullTextSummarizer:
+    """
+    全文摘要生成
+    逐页流式提取已下载PDF的文本，按令牌预算切分为片段；
+    各片段并发提炼要点（map），要点总量超出预算时分组合并（reduce），
+    最后将要点作为论文内容交给 SummaryGenerator 生成四个部分。
+    片段请求与其他请求一样经过LLM缓存，重新运行或修改后续提示词时不会重复 map。
+    """
+
+    def __init__(self, generator: SummaryGenerator, chunk_tokens: Optional[int] = None,
+                 max_chunks: Optional[int] = None, note_tokens: Optional[int] = None,
+                 reduce_tokens: Optional[int] = None, workers: Optional[int] = None):
+        self.generator = generator
+        self.chunk_tokens = chunk_tokens or config.get('fulltext', 'chunk_tokens')
+        self.max_chunks = max_chunks or config.get('fulltext', 'max_chunks')
+        self.note_tokens = note_tokens or config.get('fulltext', 'note_tokens')
+        self.reduce_tokens = reduce_tokens or config.get('fulltext', 'reduce_tokens')
+        self.workers = workers or config.get('fulltext', 'workers')
+
+    def extract_chunks(self, pdf_path: str) -> List[str]:
+        """
+        提取PDF文本并切分，最多读取 max_chunks 个片段
+        :param pdf_path: PDF文件路径
+        :return: 片段列表
+        """
+        chunks = []
+        with metrics.timer('fulltext.extract'):
+            for chunk in iter_chunks(iter_pdf_pages(pdf_path), self.chunk_tokens):
+                chunks.append(chunk)
+                if len(chunks) >= self.max_chunks:
+                    logger.info(f"全文超过 {self.max_chunks} 个片段，只使用前 {self.max_chunks} 个: {pdf_path}")
+                    break
+        return chunks
+
+    def _note_request(self, prompt: str) -> Dict[str, Any]:
+        return {
+            'model': self.generator.model,
+            'messages': [
+                {"role": "system", "content": CHUNK_SYSTEM},
+                {"role": "user", "content": prompt}
+            ],
+            'temperature': self.generator.temperature,
+            'max_tokens': self.note_tokens
+        }
+
+    def _complete_all(self, requests: List[Dict[str, Any]]) -> List[str]:
+        with ThreadPoolExecutor(max_workers=max(1, min(self.workers, len(requests))),
+                                thread_name_prefix="fulltext") as executor:
+            return list(executor.map(self.generator.complete, requests))
+
+    def map_chunks(self, paper: Paper, chunks: List[str]) -> List[str]:
+        """
+        并发提炼各片段的要点
+        :param paper: 论文信息
+        :param chunks: 片段列表
+        :return: 与片段一一对应的要点
+        """
+        requests = [
+            self._note_request(CHUNK_PROMPT.format(title=paper.title, index=index, total=len(chunks), chunk=chunk))
+            for index, chunk in enumerate(chunks, 1)
+        ]
+        with metrics.timer('fulltext.map'):
+            return self._complete_all(requests)
+
+    def _group(self, notes: List[str]) -> List[List[str]]:
+        groups: List[List[str]] = []
+        size = 0
+        for note in notes:
+            tokens = estimate_text_tokens(note)
+            if groups and size + tokens <= self.reduce_tokens:
+                groups[-1].append(note)
+                size += tokens
+            else:
+                groups.append([note])
+                size = tokens
+        return groups
+
+    def reduce_notes(self, paper: Paper, notes: List[str]) -> str:
+        """
+        合并要点，直到总量不超过 reduce_tokens
+        :param paper: 论文信息
+        :param notes: 要点列表
+        :return: 合并后的要点
+        """
+        with metrics.timer('fulltext.reduce'):
+            while len(notes) > 1 and sum(estimate_text_tokens(note) for note in notes) > self.reduce_tokens:
+                groups = self._group(notes)
+                if len(groups) == len(notes):
+                    # 每组只能放下一条要点，继续合并没有意义
+                    break
+                requests = [
+                    self._note_request(MERGE_PROMPT.format(title=paper.title, notes='\n\n'.join(group)))
+                    for group in groups if len(group) > 1
+                ]
+                merged = iter(self._complete_all(requests))
+                notes = [next(merged) if len(group) > 1 else group[0] for group in groups]
+        return '\n\n'.join(notes)
+
+    def build_content(self, paper: Paper, notes: str) -> str:
+        """
+        构建包含全文要点的论文内容
+        :param paper: 论文信息
+        :param notes: 全文要点
+        :return: 论文内容
+        """
+        return f"""{self.generator.build_paper_content(paper).rstrip()}
+            全文要点:
+            {notes}
+            """
+
+    @error_handler
+    def summarize(self, paper: Paper, pdf_path: str,
+                  on_progress: Optional[ProgressCallback] = None) -> Dict[str, str]:
+        """
+        基于全文生成完整的论文摘要
+        :param paper: 论文信息
+        :param pdf_path: 已下载的PDF路径
+        :param on_progress: 流式模式下的进度回调
+        :return: 包含各种摘要的字典
+        """
+        try:
+            chunks = self.extract_chunks(pdf_path)
+            if not chunks:
+                raise SummaryGenerationError("未能从PDF中提取到文本")
+            notes = self.reduce_notes(paper, self.map_chunks(paper, chunks))
+            logger.info(f"全文要点提炼完成: {paper.title}，共 {len(chunks)} 个片段")
+            return self.generator.generate_comprehensive_summary(paper, self.build_content(paper, notes), on_progress)
+        except Exception as e:
+            raise SummaryGenerationError(f"全文摘要生成失败: {str(e)}")
@@ -1,74 +1,588 @@
-from paper_crawler import PaperCrawler
-from summary_generator import SummaryGenerator
-from content_formatter import ContentFormatter
-import schedule
-import time
+from .paper_crawler import PaperCrawler
+from .summary_generator import SummaryGenerator, AsyncSummaryGenerator
+from .content_formatter import ContentFormatter
+from .pipeline import PaperPipeline, PipelineStage, PipelineItem
+from .batch_runner import BatchRunner
+from .fulltext import FullTextSummarizer
+from .scheduler import JobScheduler, JobSpec, ScheduledJob
 import os
-from typing import Dict, Any
-from .utils import Logger, error_handler
+import signal
+import threading
+from datetime import datetime, timedelta, timezone
+from functools import cached_property, partial
+from itertools import islice
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, Iterator, List, Optional, Set
+from .utils import Logger, error_handler, log_once, PaperIndex, RunManifest, WorkQueue, CircuitOpenError, find_cause, metrics
 from .utils.config import Config
+from .models import Paper
+
+if TYPE_CHECKING:
+    from .paper_selector import PaperSelector
 
 logger = Logger()
 config = Config()
 
+class locked_cached_property(cached_property):
+    """
+    首次创建时加锁的 cached_property
+    Python 3.12 起 cached_property 不再加锁，流水线的多个工作线程同时首次访问时会各自创建一个组件，
+    例如多个摘要生成器各带一个限流器，使实际请求速率成倍超出配置；创建完成后直接读取实例属性，不再加锁
+    """
+    
+    def __init__(self, func):
+        super().__init__(func)
+        self._create_lock = threading.RLock()
+    
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        with self._create_lock:
+            return super().__get__(instance, owner)
+
 class ZakaMediaPush:
+    """
+    主程序
+    爬虫、摘要生成器、格式化器和索引均在首次使用时创建，
+    只运行单个阶段时不会初始化其他组件。
+    """
+    
     def __init__(self):
-        self.crawler = PaperCrawler()
-        self.generator = SummaryGenerator()
-        self.formatter = ContentFormatter()
         self.config = config
+        # 并发执行的任务数，第一个任务开始时才清空运行指标
+        self._active_runs = 0
+        self._runs_lock = threading.Lock()
+        # 并发执行的任务正在处理的论文（不含版本的arXiv ID），交叉分类的论文同时只由一个任务处理
+        self._in_flight: Set[str] = set()
+        self._in_flight_lock = threading.Lock()
+    
+    @locked_cached_property
+    def crawler(self) -> PaperCrawler:
+        return PaperCrawler()
+    
+    @locked_cached_property
+    def generator(self) -> SummaryGenerator:
+        if self.config.get('openai', 'async_enabled'):
+            return AsyncSummaryGenerator()
+        return SummaryGenerator()
+    
+    @locked_cached_property
+    def formatter(self) -> ContentFormatter:
+        return ContentFormatter()
+    
+    @locked_cached_property
+    def index(self) -> Optional[PaperIndex]:
+        if not self.config.get('index', 'enabled'):
+            return None
+        return PaperIndex(self.config.get('index', 'path'))
+    
+    @locked_cached_property
+    def selector(self) -> Optional['PaperSelector']:
+        if not self.config.get('selector', 'enabled'):
+            return None
+        from .paper_selector import PaperSelector
+        return PaperSelector()
+    
+    @locked_cached_property
+    def fulltext(self) -> Optional[FullTextSummarizer]:
+        if not self.config.get('fulltext', 'enabled'):
+            return None
+        return FullTextSummarizer(self.generator)
+    
+    @locked_cached_property
+    def work_queue(self) -> WorkQueue:
+        return WorkQueue(
+            self.config.get('queue', 'path'),
+            max_attempts=self.config.get('queue', 'max_attempts'),
+            journal_mode=self.config.get('queue', 'journal_mode')
+        )
+    
+    def summarize_paper(self, paper: Paper, pdf_path: Optional[str] = None) -> Dict[str, str]:
+        """
+        生成论文摘要，启用全文模式且PDF已下载时基于全文生成，失败时退回只用摘要；
+        流式模式下各部分边生成边写入草稿文件
+        :param paper: 论文信息
+        :param pdf_path: 已下载的PDF路径
+        :return: 包含各种摘要的字典
+        """
+        draft = self.formatter.open_draft(paper) if self.generator.stream else None
+        on_progress = draft.update if draft else None
+        try:
+            if self.fulltext and pdf_path:
+                try:
+                    return self.fulltext.summarize(paper, pdf_path, on_progress)
+                except Exception as e:
+                    logger.warning(f"全文摘要生成失败，改为基于摘要生成: {paper.title}, 错误: {str(e)}")
+            return self.generator.generate_comprehensive_summary(paper, on_progress=on_progress)
+        finally:
+            if draft:
+                draft.flush()
     
     @error_handler
-    def process_paper(self, paper: Dict[str, Any]) -> Dict[str, str]:
+    def process_paper(self, paper: Paper, download: bool = True) -> Dict[str, str]:
         """
         处理单篇论文
         :param paper: 论文信息
+        :param download: 是否下载论文PDF
         :return: 生成的文件路径
         """
-        try:
-            # 生成摘要
-            summary = self.generator.generate_comprehensive_summary(paper)
-            
-            # 格式化并保存内容
-            file_paths = self.formatter.format_and_save(paper, summary)
-            
-            # 下载论文PDF
+        # 全文模式需要先下载PDF
+        pdf_path = self.crawler.download_paper(paper) if self.fulltext else None
+        
+        # 生成摘要
+        summary = self.summarize_paper(paper, pdf_path)
+        
+        # 格式化并保存内容
+        file_paths = self.formatter.format_and_save(paper, summary)
+        
+        # 下载论文PDF
+        if download and pdf_path is None:
             pdf_path = self.crawler.download_paper(paper)
-            
-            logger.info(f"成功处理论文: {paper['title']}")
-            return {
-                **file_paths,
-                'pdf': pdf_path
-            }
+        
+        logger.info(f"成功处理论文: {paper.title}")
+        return {
+            **file_paths,
+            'pdf': pdf_path
+        }
+    
+    def _stage_summarize(self, item: PipelineItem) -> Dict[str, str]:
+        return self.summarize_paper(item.paper, item.results.get('download'))
+    
+    def _stage_format(self, item: PipelineItem) -> Dict[str, str]:
+        return self.formatter.format_and_save(item.paper, item.results['summarize'])
+    
+    def _stage_download(self, item: PipelineItem) -> str:
+        return self.crawler.download_paper(item.paper)
+    
+    def stage_funcs(self, manifest: Optional[RunManifest] = None) -> Dict[str, Callable[[PipelineItem], Any]]:
+        """
+        获取各阶段的处理函数
+        :param manifest: 运行清单，提供时已完成的阶段直接返回记录的结果，新完成的阶段写入清单
+        :return: 阶段名称到处理函数的映射
+        """
+        funcs = {
+            'summarize': self._stage_summarize,
+            'format': self._stage_format,
+            'download': self._stage_download
+        }
+        if manifest is None:
+            return funcs
+        return {name: partial(self._run_checkpointed, manifest, name, func) for name, func in funcs.items()}
+    
+    @staticmethod
+    def completed_result(manifest: Optional[RunManifest], paper: Paper, stage: str) -> Any:
+        """
+        获取清单中记录的阶段结果，结果引用的文件已不存在时视为未完成
+        :param manifest: 运行清单
+        :param paper: 论文信息
+        :param stage: 阶段名称
+        :return: 阶段结果，未完成时返回 None
+        """
+        if manifest is None:
+            return None
+        result = manifest.result(paper.arxiv_id, stage)
+        if stage == 'format' and result and not all(os.path.exists(path) for path in result.values()):
+            return None
+        if stage == 'download' and result and not os.path.exists(result):
+            return None
+        return result
+    
+    def _run_checkpointed(self, manifest: RunManifest, stage: str, func: Callable[[PipelineItem], Any],
+                          item: PipelineItem) -> Any:
+        result = self.completed_result(manifest, item.paper, stage)
+        if result is not None:
+            metrics.add('manifest_stage_skips', stage=stage)
+            return result
+        result = func(item)
+        if result is not None:
+            manifest.record(item.paper, stage, result)
+        return result
+    
+    def build_pipeline(self, manifest: Optional[RunManifest] = None) -> PaperPipeline:
+        """
+        按配置构建论文处理流水线
+        :param manifest: 运行清单，提供时跳过已完成的阶段
+        :return: 流水线
+        """
+        stage_funcs = self.stage_funcs(manifest)
+        names: List[str] = self.config.get('pipeline', 'stages')
+        unknown = [name for name in names if name not in stage_funcs]
+        if unknown:
+            raise ValueError(f"未知的流水线阶段: {', '.join(unknown)}")
+        if 'format' in names and ('summarize' not in names or names.index('format') < names.index('summarize')):
+            raise ValueError("format 阶段必须位于 summarize 阶段之后")
+        if self.config.get('fulltext', 'enabled') and 'summarize' in names:
+            if 'download' not in names:
+                logger.warning("已启用全文摘要但流水线中没有 download 阶段，将只基于摘要生成")
+            elif names.index('download') > names.index('summarize'):
+                # 全文摘要依赖已下载的PDF
+                names = [name for name in names if name != 'download']
+                names.insert(names.index('summarize'), 'download')
+                logger.info(f"已启用全文摘要，download 阶段移到 summarize 之前: {', '.join(names)}")
+        
+        workers = self.config.get('pipeline', 'workers')
+        return PaperPipeline([
+            PipelineStage(name, stage_funcs[name], workers.get(name, 1))
+            for name in names
+        ])
+    
+    def default_job(self) -> JobSpec:
+        """
+        未配置 SCHEDULE_JOBS 时使用的默认任务
+        :return: 任务定义
+        """
+        return JobSpec('daily', self.config.get('schedule', 'time'))
+    
+    def job_specs(self) -> List[JobSpec]:
+        """
+        获取配置的定时任务
+        :return: 任务定义列表
+        """
+        jobs = [JobSpec.from_dict(data) for data in self.config.get('schedule', 'jobs')]
+        return jobs or [self.default_job()]
+    
+    def iter_new_papers(self, job: Optional[JobSpec] = None) -> Iterator[Paper]:
+        """
+        流式获取本次需要处理的论文
+        启用论文筛选时先取足候选论文，按兴趣相关度排序并去除近似重复后再产出
+        :param job: 任务定义，为 None 时使用默认任务
+        :return: 论文迭代器
+        """
+        job = job or self.default_job()
+        max_papers = job.max_papers or self.config.get('crawler', 'max_papers_per_day')
+        if not self.selector:
+            yield from self._iter_unprocessed(job, max_papers)
+            return
+        
+        candidates = list(self._iter_unprocessed(job, self.config.get('crawler', 'max_candidates')))
+        try:
+            selected = self.selector.select(candidates, max_papers)
         except Exception as e:
-            logger.error(f"处理论文失败: {paper['title']}, 错误: {str(e)}")
-            raise
+            logger.warning(f"论文筛选失败，按爬取顺序取前 {max_papers} 篇: {str(e)}")
+            selected = candidates[:max_papers]
+        yield from selected
+    
+    def _iter_unprocessed(self, job: JobSpec, limit: int) -> Iterator[Paper]:
+        """
+        流式获取尚未处理的论文
+        :param job: 任务定义
+        :param limit: 最多产出的篇数
+        :return: 论文迭代器
+        """
+        if not self.index:
+            yield from islice(self._iter_candidates(job, limit), limit)
+            return
+        
+        # 水位线回退一段重叠时间，避免遗漏arXiv延迟公布的论文，重复部分由索引过滤
+        since = self.index.get_watermark(job.name)
+        if since is not None:
+            since -= timedelta(hours=self.config.get('index', 'overlap_hours'))
+        
+        seen = selected = 0
+        for paper in self._iter_candidates(job, self.config.get('crawler', 'max_candidates'), since):
+            seen += 1
+            if self.index.filter_new([paper]):
+                selected += 1
+                yield paper
+                if selected >= limit:
+                    break
+        logger.info(f"检查 {seen} 篇候选论文，其中 {selected} 篇待处理")
+    
+    def _iter_candidates(self, job: JobSpec, max_results: int, since: Optional[datetime] = None) -> Iterator[Paper]:
+        """
+        流式获取候选论文
+        任务没有指定查询条件且配置了多个订阅时，并发爬取全部订阅并按arXiv ID合并去重，否则按任务的查询条件流式爬取
+        :param job: 任务定义
+        :param max_results: 最大结果数（多订阅时为每个订阅的最大结果数）
+        :param since: 起始时间
+        :return: 论文迭代器
+        """
+        days = job.days or self.config.get('crawler', 'days_to_crawl')
+        feeds = self.config.get('crawler', 'feeds')
+        if feeds and not job.query:
+            yield from self.crawler.crawl_feeds(feeds, days=days, max_results=max_results, since=since)
+            return
+        yield from self.crawler.iter_recent_papers(days=days, max_results=max_results, since=since, query=job.query)
+    
+    def open_manifest(self, job: JobSpec) -> Optional[RunManifest]:
+        """
+        打开任务的运行清单，上次运行中途退出时返回未完成的清单
+        :param job: 任务定义
+        :return: 运行清单，未启用时返回 None
+        """
+        if not self.config.get('manifest', 'enabled'):
+            return None
+        return RunManifest.open(self.config.get('manifest', 'dir'), job.name)
+    
+    def claim(self, paper: Paper, claimed: Set[str]) -> bool:
+        """
+        为本次运行占用论文，其他并发任务正在处理的论文不能占用
+        :param paper: 论文
+        :param claimed: 本次运行已占用的论文ID，占用成功时加入
+        :return: 是否占用成功
+        """
+        with self._in_flight_lock:
+            if paper.base_id in claimed:
+                return True
+            if paper.base_id in self._in_flight:
+                logger.info(f"论文正由其他任务处理，跳过: {paper.arxiv_id}")
+                return False
+            self._in_flight.add(paper.base_id)
+            claimed.add(paper.base_id)
+            return True
+    
+    def release(self, claimed: Set[str]):
+        """
+        释放本次运行占用的论文
+        :param claimed: 本次运行已占用的论文ID
+        """
+        with self._in_flight_lock:
+            self._in_flight -= claimed
+        claimed.clear()
+    
+    def iter_run_papers(self, job: JobSpec, manifest: Optional[RunManifest],
+                        claimed: Optional[Set[str]] = None) -> Iterator[Paper]:
+        """
+        获取本次运行要处理的论文：先产出清单中上次未完成的论文，再产出新爬取的论文
+        :param job: 任务定义
+        :param manifest: 运行清单
+        :param claimed: 本次运行占用的论文ID，提供时跳过其他并发任务正在处理的论文
+        :return: 论文迭代器
+        """
+        def available(paper: Paper) -> bool:
+            return claimed is None or self.claim(paper, claimed)
+        
+        max_papers = job.max_papers or self.config.get('crawler', 'max_papers_per_day')
+        if manifest is None:
+            count = 0
+            for paper in self.iter_new_papers(job):
+                if count >= max_papers:
+                    break
+                if available(paper):
+                    count += 1
+                    yield paper
+            return
+        
+        pending = manifest.pending_papers()
+        if pending:
+            logger.info(f"从上次中断的运行恢复 {len(pending)} 篇论文: {job.name}")
+        count = 0
+        busy = []
+        for paper in pending:
+            if available(paper):
+                count += 1
+                yield paper
+            else:
+                busy.append(paper)
+        if busy:
+            # 留给下次运行，不计入失败次数
+            manifest.park(busy)
+        
+        for paper in self.iter_new_papers(job):
+            if count >= max_papers:
+                break
+            if not available(paper):
+                continue
+            if manifest.add_paper(paper):
+                count += 1
+                yield paper
+    
+    def mark_done(self, papers: Iterable[Paper], manifest: Optional[RunManifest] = None):
+        """
+        标记论文已处理完成
+        :param papers: 论文列表
+        :param manifest: 运行清单
+        """
+        papers = list(papers)
+        if self.index:
+            self.index.mark_processed(papers)
+        if manifest:
+            manifest.mark_done(papers)
+    
+    def run_sequential(self, papers: Iterable[Paper], manifest: Optional[RunManifest] = None):
+        """
+        逐篇生成内容，再批量并发下载PDF
+        :param papers: 论文列表
+        :param manifest: 运行清单，提供时跳过已完成的阶段
+        """
+        funcs = self.stage_funcs(manifest)
+        # 全文模式需要先下载PDF
+        names = ('download', 'summarize', 'format') if self.fulltext else ('summarize', 'format')
+        formatted = []
+        for paper in papers:
+            item = PipelineItem(paper)
+            try:
+                for name in names:
+                    item.results[name] = funcs[name](item)
+                formatted.append(paper)
+            except Exception as e:
+                if not self.park_if_circuit_open(paper, e, manifest):
+                    log_once(e, f"处理论文失败: {paper.title}, 错误: {str(e)}")
+                continue
+        self._download_and_mark(formatted, manifest)
+    
+    @staticmethod
+    def park_if_circuit_open(paper: Paper, error: Exception, manifest: Optional[RunManifest]) -> bool:
+        """
+        论文因外部依赖熔断而失败时，在运行清单中暂存，留到下次运行
+        :param paper: 论文信息
+        :param error: 处理论文时的异常
+        :param manifest: 运行清单
+        :return: 是否因熔断失败
+        """
+        circuit = find_cause(error, CircuitOpenError)
+        if circuit is None:
+            return False
+        if manifest:
+            manifest.park([paper])
+        logger.warning(f"{circuit.dependency} 熔断中，论文暂存至下次运行: {paper.title}")
+        return True
+    
+    def _download_and_mark(self, papers: List[Paper], manifest: Optional[RunManifest]):
+        pdf_paths = {paper.arxiv_id: self.completed_result(manifest, paper, 'download') for paper in papers}
+        missing = [paper for paper in papers if not pdf_paths[paper.arxiv_id]]
+        if missing:
+            for paper_id, path in self.crawler.download_papers(missing).items():
+                pdf_paths[paper_id] = path
+        if manifest:
+            for paper in missing:
+                if pdf_paths.get(paper.arxiv_id):
+                    manifest.record(paper, 'download', pdf_paths[paper.arxiv_id])
+        self.mark_done((paper for paper in papers if pdf_paths.get(paper.arxiv_id)), manifest)
     
     @error_handler
-    def daily_task(self):
+    def daily_task(self, job: Optional[JobSpec] = None):
         """
         每日任务
+        :param job: 任务定义，为 None 时使用默认任务
         """
+        job = job or self.default_job()
+        run_started = datetime.now(timezone.utc)
+        claimed: Set[str] = set()
+        with self._runs_lock:
+            if self._active_runs == 0:
+                metrics.reset()
+            self._active_runs += 1
         try:
-            logger.info("开始执行每日任务")
+            logger.info(f"开始执行每日任务: {job.name}")
             
-            # 获取最近论文
-            days = self.config.get('crawler', 'days_to_crawl')
-            max_papers = self.config.get('crawler', 'max_papers_per_day')
-            papers = self.crawler.get_recent_papers(days=days, max_results=max_papers)
+            # 上次运行中途退出时，已完成的阶段直接复用清单中的结果
+            manifest = self.open_manifest(job)
             
-            # 处理每篇论文
-            for paper in papers:
-                try:
-                    self.process_paper(paper)
-                except Exception as e:
-                    logger.error(f"处理论文失败: {paper['title']}, 错误: {str(e)}")
-                    continue
+            # 模板修改过时，只重新渲染受影响的已有输出
+            try:
+                self.formatter.rebuild_stale()
+            except Exception as e:
+                logger.warning(f"重新渲染已有输出失败，继续执行: {str(e)}")
+            
+            # 流式获取最近论文，流水线模式下第一篇到达即开始处理
+            papers = self.iter_run_papers(job, manifest, claimed)
+            
+            if self.config.get('openai', 'batch_enabled'):
+                # 通过Batch API一次性生成全部摘要
+                self.run_batch(list(papers), manifest)
+            elif self.config.get('pipeline', 'enabled'):
+                # 流水线并发处理
+                def on_complete(item: PipelineItem):
+                    if item.ok:
+                        self.mark_done([item.paper], manifest)
+                    else:
+                        self.park_if_circuit_open(item.paper, item.error, manifest)
+                
+                self.build_pipeline(manifest).run(papers, on_complete=on_complete)
+            else:
+                self.run_sequential(papers, manifest)
             
-            logger.info("每日任务执行完成")
+            if self.index:
+                self.index.set_watermark(run_started, job.name)
+            if manifest:
+                manifest.finish()
+            
+            if self.generator.cache:
+                stats = self.generator.cache.stats()
+                logger.info(f"LLM缓存统计: 命中 {stats['hits']}, 未命中 {stats['misses']}, "
+                            f"命中率 {stats['hit_rate']:.1%}, 条目 {stats['entries']}")
+            
+            logger.info(f"每日任务执行完成: {job.name}")
         except Exception as e:
-            logger.error(f"每日任务执行失败: {str(e)}")
+            log_once(e, f"每日任务执行失败: {job.name}, 错误: {str(e)}")
             raise
+        finally:
+            self.release(claimed)
+            with self._runs_lock:
+                self._active_runs -= 1
+            self.write_metrics(run_started, job.name)
+    
+    def run_batch(self, papers: List[Paper], manifest: Optional[RunManifest] = None):
+        """
+        通过Batch API生成摘要，再格式化并批量下载PDF
+        批处理失败的论文会回退到同步生成
+        :param papers: 论文列表
+        :param manifest: 运行清单，提供时已有摘要的论文不再提交
+        """
+        if not papers:
+            logger.info("没有需要处理的论文")
+            return
+        summaries = {}
+        for paper in papers:
+            summary = self.completed_result(manifest, paper, 'summarize')
+            if summary is not None:
+                summaries[paper.arxiv_id] = summary
+        remaining = [paper for paper in papers if paper.arxiv_id not in summaries]
+        if remaining:
+            generated = BatchRunner(self.generator).run(remaining)
+            summaries.update(generated)
+            if manifest:
+                for paper in remaining:
+                    if paper.arxiv_id in generated:
+                        manifest.record(paper, 'summarize', generated[paper.arxiv_id])
+        
+        format_stage = self.stage_funcs(manifest)['format']
+        formatted = []
+        for paper in papers:
+            summary = summaries.get(paper.arxiv_id)
+            if summary is None:
+                continue
+            item = PipelineItem(paper)
+            item.results['summarize'] = summary
+            try:
+                format_stage(item)
+                formatted.append(paper)
+            except Exception as e:
+                log_once(e, f"处理论文失败: {paper.title}, 错误: {str(e)}")
+        self._download_and_mark(formatted, manifest)
+    
+    def build_scheduler(self) -> JobScheduler:
+        """
+        按配置构建任务调度器
+        :return: 调度器
+        """
+        return JobScheduler(
+            [ScheduledJob(spec.name, spec.time, partial(self.daily_task, spec)) for spec in self.job_specs()],
+            state_path=self.config.get('schedule', 'state_path'),
+            catch_up=self.config.get('schedule', 'catch_up'),
+            max_workers=self.config.get('schedule', 'max_concurrent_jobs'),
+            run_on_start=self.config.get('schedule', 'run_on_start')
+        )
+    
+    def write_metrics(self, run_started: datetime, job_name: str = 'daily'):
+        """
+        导出本次运行的指标报告
+        并发执行的任务共享同一组指标，报告中包含重叠期间其他任务的数据
+        :param run_started: 运行开始时间
+        :param job_name: 任务名称
+        """
+        if not self.config.get('metrics', 'enabled'):
+            return
+        try:
+            metrics_dir = self.config.get('metrics', 'dir')
+            prefix = 'run' if job_name == 'daily' else f"run-{job_name}"
+            report = metrics.write_json(
+                os.path.join(metrics_dir, f"{prefix}-{run_started.strftime('%Y%m%dT%H%M%SZ')}.json")
+            )
+            metrics.write_prometheus(os.path.join(metrics_dir, 'zaka_media_push.prom'))
+            logger.info(f"运行指标已导出: {report}")
+        except Exception as e:
+            logger.error(f"运行指标导出失败: {str(e)}")
     
     @error_handler
     def run(self):
@@ -81,21 +595,22 @@ class ZakaMediaPush:
             
             # 创建必要的目录
             os.makedirs(self.config.get('output', 'dir'), exist_ok=True)
-            os.makedirs('logs', exist_ok=True)
-            
-            # 设置定时任务
-            schedule_time = self.config.get('schedule', 'time')
-            schedule.every().day.at(schedule_time).do(self.daily_task)
+            os.makedirs(self.config.get('logging', 'dir'), exist_ok=True)
             
-            logger.info(f"程序已启动，将在每天 {schedule_time} 执行任务")
+            scheduler = self.build_scheduler()
+            if threading.current_thread() is threading.main_thread():
+                signal.signal(signal.SIGTERM, lambda signum, frame: scheduler.stop())
             
-            # 立即执行一次
-            self.daily_task()
+            for job in scheduler.jobs.values():
+                logger.info(f"任务 {job.name} 将在每天 {job.at} 执行")
+            logger.info("程序已启动")
             
-            # 保持程序运行
-            while True:
-                schedule.run_pending()
-                time.sleep(60)
+            # 休眠到最近一个任务到期，首次启动或停机期间错过的任务会立即补跑，开启 run_on_start 时每次启动都立即执行
+            try:
+                scheduler.run_forever()
+            except KeyboardInterrupt:
+                scheduler.stop()
+            logger.info("程序已停止")
         except Exception as e:
             logger.error(f"程序运行失败: {str(e)}")
             raise
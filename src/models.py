@@ -0,0 +1,161 @@
+import json
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+from .utils import atomic_open, split_arxiv_id
+
+
+class Paper:
+    """
+    论文记录
+    使用 __slots__ 减少内存占用，创建后不可修改；
+    拼接后的作者、类别以及格式化日期等派生字段在构造时计算一次。
+    """
+
+    FIELDS = ('arxiv_id', 'entry_id', 'title', 'authors', 'summary', 'pdf_url', 'published', 'updated',
+              'primary_category', 'categories', 'doi', 'comment', 'journal_ref')
+
+    __slots__ = FIELDS + ('base_id', 'version', 'authors_text', 'categories_text', 'publish_date', 'date_stamp')
+
+    def __init__(self, arxiv_id: str, entry_id: str, title: str, authors: Sequence[str], summary: str,
+                 pdf_url: Optional[str], published: datetime, updated: Optional[datetime],
+                 primary_category: str, categories: Sequence[str], doi: Optional[str] = None,
+                 comment: Optional[str] = None, journal_ref: Optional[str] = None):
+        init = object.__setattr__
+        init(self, 'arxiv_id', arxiv_id)
+        init(self, 'entry_id', entry_id)
+        init(self, 'title', title)
+        init(self, 'authors', tuple(authors))
+        init(self, 'summary', summary)
+        init(self, 'pdf_url', pdf_url)
+        init(self, 'published', published)
+        init(self, 'updated', updated)
+        init(self, 'primary_category', primary_category)
+        init(self, 'categories', tuple(categories))
+        init(self, 'doi', doi)
+        init(self, 'comment', comment)
+        init(self, 'journal_ref', journal_ref)
+
+        # 派生字段
+        base_id, version = split_arxiv_id(arxiv_id)
+        init(self, 'base_id', base_id)
+        init(self, 'version', version)
+        init(self, 'authors_text', ', '.join(self.authors))
+        init(self, 'categories_text', ', '.join(self.categories))
+        init(self, 'publish_date', published.strftime('%Y-%m-%d'))
+        init(self, 'date_stamp', published.strftime('%Y%m%d'))
+
+    def __setattr__(self, name: str, value: Any):
+        raise AttributeError(f"Paper 不可修改: {name}")
+
+    def __reduce__(self):
+        # 不可修改的对象无法按默认方式逐个恢复属性，pickle / copy 时改为用原始字段重新构造
+        return self.__class__, tuple(getattr(self, field) for field in self.FIELDS)
+
+    def __eq__(self, other: Any) -> bool:
+        return isinstance(other, Paper) and self.arxiv_id == other.arxiv_id
+
+    def __hash__(self) -> int:
+        return hash(self.arxiv_id)
+
+    def __repr__(self) -> str:
+        return f"Paper({self.arxiv_id!r}, {self.title!r})"
+
+    @classmethod
+    def from_arxiv_result(cls, result: Any) -> 'Paper':
+        """
+        由 arxiv.Result 构建论文记录
+        :param result: arXiv搜索结果
+        :return: 论文记录
+        """
+        return cls(
+            arxiv_id=result.get_short_id(),
+            entry_id=result.entry_id,
+            title=result.title,
+            authors=[author.name for author in result.authors],
+            summary=result.summary,
+            pdf_url=result.pdf_url,
+            published=result.published,
+            updated=result.updated,
+            primary_category=result.primary_category,
+            categories=result.categories,
+            doi=result.doi,
+            comment=result.comment,
+            journal_ref=result.journal_ref
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        转换为可JSON序列化的字典
+        :return: 字典，日期为ISO格式字符串
+        """
+        data = {field: getattr(self, field) for field in self.FIELDS}
+        data['authors'] = list(self.authors)
+        data['categories'] = list(self.categories)
+        data['published'] = self.published.isoformat()
+        data['updated'] = self.updated.isoformat() if self.updated else None
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Paper':
+        """
+        由 to_dict 的结果还原论文记录
+        :param data: 字典
+        :return: 论文记录
+        """
+        values = {field: data.get(field) for field in cls.FIELDS}
+        values['published'] = datetime.fromisoformat(data['published'])
+        values['updated'] = datetime.fromisoformat(data['updated']) if data.get('updated') else None
+        return cls(**values)
+
+    def to_json(self) -> str:
+        """
+        序列化为单行紧凑JSON
+        :return: JSON字符串
+        """
+        return json.dumps(self.to_dict(), ensure_ascii=False, separators=(',', ':'))
+
+    @classmethod
+    def from_json(cls, line: str) -> 'Paper':
+        """
+        由单行JSON还原论文记录
+        :param line: JSON字符串
+        :return: 论文记录
+        """
+        return cls.from_dict(json.loads(line))
+
+
+def dump_jsonl(papers: Iterable[Paper], path: str) -> int:
+    """
+    将论文批量写入JSONL文件（原子替换）
+    :param papers: 论文列表
+    :param path: 文件路径
+    :return: 写入的论文数
+    """
+    count = 0
+    with atomic_open(path) as f:
+        for paper in papers:
+            f.write(paper.to_json())
+            f.write('\n')
+            count += 1
+    return count
+
+
+def iter_jsonl(path: str) -> Iterator[Paper]:
+    """
+    逐行读取JSONL文件中的论文
+    :param path: 文件路径
+    :return: 论文迭代器
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield Paper.from_json(line)
+
+
+def load_jsonl(path: str) -> List[Paper]:
+    """
+    读取JSONL文件中的全部论文
+    :param path: 文件路径
+    :return: 论文列表
+    """
+    return list(iter_jsonl(path))
@@ -1,70 +1,230 @@
-import arxiv
-import requests
 import os
-from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional
-from .utils import error_handler, PaperCrawlError, Logger
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import TYPE_CHECKING, List, Dict, Iterator, Optional
+from .utils import error_handler, log_once, PaperCrawlError, Logger, MetadataCache, PageCache, metrics
 from .utils.config import Config
+from .models import Paper
+
+if TYPE_CHECKING:
+    import arxiv
+    from .arxiv_feed import ArxivFeedFetcher
+    from .download_manager import DownloadManager
 
 logger = Logger()
 config = Config()
 
 class PaperCrawler:
     def __init__(self):
-        self.client = arxiv.Client()
         self.config = config
+        self._client: Optional['arxiv.Client'] = None
+        self._downloader: Optional['DownloadManager'] = None
+        self._fetcher: Optional['ArxivFeedFetcher'] = None
+        self.metadata_cache = None
+        if config.get('crawler', 'metadata_cache_enabled'):
+            self.metadata_cache = MetadataCache(
+                config.get('crawler', 'metadata_cache_path'),
+                ttl_seconds=config.get('crawler', 'metadata_cache_ttl_days') * 86400
+            )
+    
+    @property
+    def client(self) -> 'arxiv.Client':
+        """
+        默认分页大小的arXiv客户端，首次查询时创建
+        """
+        if self._client is None:
+            self._client = self._new_client(self.config.get('crawler', 'page_size'))
+        return self._client
+    
+    @property
+    def fetcher(self) -> 'ArxivFeedFetcher':
+        """
+        arXiv结果页获取器，所有客户端共用同一个请求间隔和结果页缓存
+        """
+        if self._fetcher is None:
+            from .arxiv_feed import ArxivFeedFetcher
+            cache = None
+            if self.config.get('crawler', 'page_cache_enabled'):
+                cache = PageCache(
+                    self.config.get('crawler', 'page_cache_path'),
+                    ttl_seconds=self.config.get('crawler', 'page_cache_ttl_minutes') * 60
+                )
+            self._fetcher = ArxivFeedFetcher(self.config.get('crawler', 'delay_seconds'), cache)
+        return self._fetcher
+    
+    @property
+    def downloader(self) -> 'DownloadManager':
+        """
+        PDF下载管理器，首次下载时创建
+        """
+        if self._downloader is None:
+            from .download_manager import DownloadManager
+            self._downloader = DownloadManager(
+                os.path.join(self.config.get('output', 'dir'), 'papers'),
+                max_concurrency=self.config.get('download', 'max_concurrency'),
+                timeout=self.config.get('download', 'timeout')
+            )
+        return self._downloader
+    
+    def _client_for(self, page_size: Optional[int], max_results: int) -> 'arxiv.Client':
+        """
+        获取指定分页大小的arXiv客户端，分页不超过最大结果数以免多取
+        :param page_size: 每页条数，None 时使用配置
+        :param max_results: 最大结果数
+        :return: arXiv客户端
+        """
+        page_size = min(page_size or self.config.get('crawler', 'page_size'), max_results)
+        if page_size == self.client.page_size:
+            return self.client
+        return self._new_client(page_size)
+    
+    def _new_client(self, page_size: int) -> 'arxiv.Client':
+        import arxiv
+        client = arxiv.Client(page_size=page_size, delay_seconds=self.config.get('crawler', 'delay_seconds'))
+        client.query_url_format = f"{self.config.get('crawler', 'api_url')}?{{}}"
+        return self.fetcher.bind(client)
+    
+    def iter_papers(self, query: str, max_results: int = 10,
+                    page_size: Optional[int] = None) -> Iterator[Paper]:
+        """
+        流式搜索论文，每取到一条结果立即产出
+        :param query: 搜索关键词
+        :param max_results: 最大结果数
+        :param page_size: 每页条数，None 时使用配置
+        :return: 论文迭代器
+        """
+        import arxiv
+        search = arxiv.Search(
+            query=query,
+            max_results=max_results,
+            sort_by=arxiv.SortCriterion.SubmittedDate
+        )
+        
+        count = 0
+        fetch_seconds = 0.0
+        results = self._client_for(page_size, max_results).results(search)
+        try:
+            while True:
+                # 只统计等待arXiv返回的时间，不含下游处理
+                started = time.perf_counter()
+                result = next(results, None)
+                fetch_seconds += time.perf_counter() - started
+                if result is None:
+                    break
+                count += 1
+                yield Paper.from_arxiv_result(result)
+        except Exception as e:
+            metrics.record_call('PaperCrawler.iter_papers', fetch_seconds, False)
+            log_once(e, f"论文爬取错误: 论文搜索失败: {str(e)}")
+            raise PaperCrawlError(f"论文搜索失败: {str(e)}") from e
+        
+        metrics.record_call('PaperCrawler.iter_papers', fetch_seconds, True)
+        metrics.add('arxiv_papers_fetched', count)
+        logger.info(f"成功爬取 {count} 篇论文")
     
     @error_handler
-    def search_papers(self, query: str, max_results: int = 10) -> List[Dict[str, Any]]:
+    def search_papers(self, query: str, max_results: int = 10,
+                      page_size: Optional[int] = None) -> List[Paper]:
         """
         搜索论文
         :param query: 搜索关键词
         :param max_results: 最大结果数
+        :param page_size: 每页条数，None 时使用配置
         :return: 论文列表
         """
-        try:
-            search = arxiv.Search(
-                query=query,
-                max_results=max_results,
-                sort_by=arxiv.SortCriterion.SubmittedDate
-            )
-            
-            papers = []
-            for result in self.client.results(search):
-                paper = {
-                    'title': result.title,
-                    'authors': [author.name for author in result.authors],
-                    'summary': result.summary,
-                    'pdf_url': result.pdf_url,
-                    'published': result.published,
-                    'updated': result.updated,
-                    'primary_category': result.primary_category,
-                    'categories': result.categories,
-                    'doi': result.doi,
-                    'comment': result.comment,
-                    'journal_ref': result.journal_ref
-                }
-                papers.append(paper)
-            
-            logger.info(f"成功爬取 {len(papers)} 篇论文")
-            return papers
-        except Exception as e:
-            raise PaperCrawlError(f"论文搜索失败: {str(e)}")
+        return list(self.iter_papers(query, max_results, page_size))
+    
+    @staticmethod
+    def _recent_query(days: int, since: Optional[datetime] = None, query: Optional[str] = None) -> str:
+        # 取整到小时，有效期内重复运行时查询URL不变，结果页可以命中缓存
+        date = (datetime.now(timezone.utc) - timedelta(days=days)).replace(minute=0, second=0, microsecond=0)
+        if since is not None and since > date:
+            date = since
+        date_query = f"submittedDate:[{date.strftime('%Y%m%d%H%M')} TO *]"
+        return f"({query}) AND {date_query}" if query else date_query
+    
+    def iter_recent_papers(self, days: int = 7, max_results: int = 20, since: Optional[datetime] = None,
+                           page_size: Optional[int] = None, query: Optional[str] = None) -> Iterator[Paper]:
+        """
+        流式获取最近几天的论文
+        :param days: 天数
+        :param max_results: 最大结果数
+        :param since: 起始时间，晚于天数窗口时用它缩小查询范围
+        :param page_size: 每页条数，None 时使用配置
+        :param query: 额外的查询条件，如 "cat:cs.CL"
+        :return: 论文迭代器
+        """
+        return self.iter_papers(self._recent_query(days, since, query), max_results, page_size)
     
     @error_handler
-    def get_recent_papers(self, days: int = 7, max_results: int = 20) -> List[Dict[str, Any]]:
+    def get_recent_papers(self, days: int = 7, max_results: int = 20,
+                          since: Optional[datetime] = None, query: Optional[str] = None) -> List[Paper]:
         """
         获取最近几天的论文
         :param days: 天数
         :param max_results: 最大结果数
+        :param since: 起始时间，晚于天数窗口时用它缩小查询范围
+        :param query: 额外的查询条件，如 "cat:cs.CL"
         :return: 论文列表
         """
-        date = datetime.now() - timedelta(days=days)
-        query = f"submittedDate:[{date.strftime('%Y%m%d')} TO *]"
-        return self.search_papers(query, max_results)
+        return self.search_papers(self._recent_query(days, since, query), max_results)
     
     @error_handler
-    def get_paper_by_category(self, category: str, max_results: int = 10) -> List[Dict[str, Any]]:
+    def crawl_feeds(self, feeds: Dict[str, str], days: int = 7, max_results: int = 20,
+                    since: Optional[datetime] = None, workers: Optional[int] = None) -> List[Paper]:
+        """
+        并发爬取多个订阅查询的最近论文，合并后按arXiv ID去重
+        各查询共用同一个arXiv请求间隔，结果页缓存命中的查询不必排队等待；单个查询失败时跳过
+        :param feeds: 订阅名称到arXiv查询条件的映射，如 {"nlp": "cat:cs.CL"}
+        :param days: 天数
+        :param max_results: 每个查询的最大结果数
+        :param since: 起始时间，晚于天数窗口时用它缩小查询范围
+        :param workers: 并发查询数，None 时使用配置
+        :return: 去重后的论文，同一篇论文保留最新版本，按发布时间从新到旧排列
+        """
+        if not feeds:
+            return []
+        
+        def crawl(item):
+            name, query = item
+            try:
+                return name, self.search_papers(self._recent_query(days, since, query), max_results)
+            except Exception as e:
+                # 错误本身已在爬取时记录，这里只说明去向
+                logger.info(f"订阅 {name} 爬取失败，已跳过")
+                return name, None
+        
+        # 查询条件相同的订阅只爬取一次
+        queries: Dict[str, str] = {}
+        for name, query in feeds.items():
+            queries.setdefault(query, name)
+        
+        # 在线程启动前创建客户端，确保各查询共用同一个获取器
+        _ = self.client
+        workers = workers or self.config.get('crawler', 'feed_workers')
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(queries))),
+                                thread_name_prefix='arxiv-feed') as executor:
+            results = list(executor.map(crawl, ((name, query) for query, name in queries.items())))
+        
+        failed = [name for name, papers in results if papers is None]
+        if len(failed) == len(results):
+            raise PaperCrawlError(f"所有订阅均爬取失败: {', '.join(failed)}")
+        
+        merged: Dict[str, Paper] = {}
+        total = 0
+        for name, papers in results:
+            for paper in papers or ():
+                total += 1
+                current = merged.get(paper.base_id)
+                if current is None or paper.version > current.version:
+                    merged[paper.base_id] = paper
+        metrics.add('arxiv_feed_duplicates', total - len(merged))
+        logger.info(f"爬取 {len(feeds)} 个订阅，共 {total} 条结果，去重后 {len(merged)} 篇论文")
+        return sorted(merged.values(), key=lambda paper: paper.published, reverse=True)
+    
+    @error_handler
+    def get_paper_by_category(self, category: str, max_results: int = 10) -> List[Paper]:
         """
         按类别获取论文
         :param category: 论文类别
@@ -75,7 +235,7 @@ class PaperCrawler:
         return self.search_papers(query, max_results)
     
     @error_handler
-    def get_paper_by_keyword(self, keyword: str, max_results: int = 10) -> List[Dict[str, Any]]:
+    def get_paper_by_keyword(self, keyword: str, max_results: int = 10) -> List[Paper]:
         """
         按关键词获取论文
         :param keyword: 关键词
@@ -85,59 +245,85 @@ class PaperCrawler:
         return self.search_papers(keyword, max_results)
     
     @error_handler
-    def download_paper(self, paper: Dict[str, Any]) -> Optional[str]:
+    def download_paper(self, paper: Paper) -> Optional[str]:
         """
         下载论文PDF
         :param paper: 论文信息
         :return: 下载的文件路径
         """
         try:
-            if not paper.get('pdf_url'):
-                raise PaperCrawlError("论文PDF链接不存在")
-            
-            response = requests.get(paper['pdf_url'], stream=True)
-            if response.status_code != 200:
-                raise PaperCrawlError(f"下载失败，状态码: {response.status_code}")
-            
-            # 创建输出目录
-            output_dir = os.path.join(config.get('output', 'dir'), 'papers')
-            os.makedirs(output_dir, exist_ok=True)
-            
-            # 生成文件名
-            filename = f"{paper['title'][:50]}_{paper['published'].strftime('%Y%m%d')}.pdf"
-            filepath = os.path.join(output_dir, filename)
+            return self.downloader.download(paper)
+        except Exception as e:
+            raise PaperCrawlError(f"论文下载失败: {str(e)}")
+    
+    @error_handler
+    def download_papers(self, papers: List[Paper]) -> Dict[str, Optional[str]]:
+        """
+        批量并发下载论文PDF
+        :param papers: 论文列表
+        :return: arXiv ID 到文件路径的映射，下载失败的论文对应 None
+        """
+        return self.downloader.download_all(papers)
+    
+    @error_handler
+    def get_papers_metadata(self, paper_ids: List[str]) -> Dict[str, Paper]:
+        """
+        批量获取论文元数据
+        先查本地缓存，未命中的ID按批次通过 id_list 查询，批次之间遵守arXiv要求的请求间隔
+        :param paper_ids: 论文ID列表，可带版本号
+        :return: 论文ID到论文元数据的映射，查不到的ID不出现
+        """
+        try:
+            paper_ids = list(dict.fromkeys(paper_id.strip() for paper_id in paper_ids))
+            papers: Dict[str, Paper] = {}
+            if self.metadata_cache:
+                for paper_id, data in self.metadata_cache.get_many(paper_ids).items():
+                    papers[paper_id] = Paper.from_json(data)
+            missing = [paper_id for paper_id in paper_ids if paper_id not in papers]
+            if not missing:
+                return papers
             
-            # 保存文件
-            with open(filepath, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    f.write(chunk)
+            import arxiv
+            batch_size = self.config.get('crawler', 'id_batch_size')
+            # 同一个客户端会在两次请求之间等待 delay_seconds
+            client = self._client_for(batch_size, batch_size)
+            for start in range(0, len(missing), batch_size):
+                batch = missing[start:start + batch_size]
+                fetched = [
+                    Paper.from_arxiv_result(result)
+                    for result in client.results(arxiv.Search(id_list=batch, max_results=len(batch)))
+                ]
+                if self.metadata_cache:
+                    self.metadata_cache.put_many((paper.arxiv_id, paper.to_json()) for paper in fetched)
+                
+                by_id = {}
+                for paper in fetched:
+                    by_id[paper.arxiv_id] = paper
+                    by_id[paper.base_id] = paper
+                for paper_id in batch:
+                    if paper_id in by_id:
+                        papers[paper_id] = by_id[paper_id]
             
-            logger.info(f"成功下载论文: {filename}")
-            return filepath
+            not_found = [paper_id for paper_id in missing if paper_id not in papers]
+            if not_found:
+                logger.warning(f"未找到 {len(not_found)} 篇论文的元数据: {', '.join(not_found[:10])}")
+            logger.info(f"批量获取论文元数据: 共 {len(paper_ids)} 篇，缓存命中 "
+                        f"{len(paper_ids) - len(missing)} 篇，请求 {len(missing)} 篇")
+            return papers
         except Exception as e:
-            raise PaperCrawlError(f"论文下载失败: {str(e)}")
+            raise PaperCrawlError(f"批量获取论文元数据失败: {str(e)}")
     
     @error_handler
-    def get_paper_metadata(self, paper_id: str) -> Dict[str, Any]:
+    def get_paper_metadata(self, paper_id: str) -> Paper:
         """
         获取论文元数据
         :param paper_id: 论文ID
         :return: 论文元数据
         """
         try:
-            paper = next(self.client.results(arxiv.Search(id_list=[paper_id])))
-            return {
-                'title': paper.title,
-                'authors': [author.name for author in paper.authors],
-                'summary': paper.summary,
-                'pdf_url': paper.pdf_url,
-                'published': paper.published,
-                'updated': paper.updated,
-                'primary_category': paper.primary_category,
-                'categories': paper.categories,
-                'doi': paper.doi,
-                'comment': paper.comment,
-                'journal_ref': paper.journal_ref
-            }
+            paper = self.get_papers_metadata([paper_id]).get(paper_id.strip())
+            if paper is None:
+                raise PaperCrawlError(f"论文不存在: {paper_id}")
+            return paper
         except Exception as e:
-            raise PaperCrawlError(f"获取论文元数据失败: {str(e)}") 
\ No newline at end of file
+            raise PaperCrawlError(f"获取论文元数据失败: {str(e)}")
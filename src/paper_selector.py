@@ -0,0 +1,249 @@
+import json
+import os
+import re
+import threading
+import zlib
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+import numpy as np
+from .utils import error_handler, PaperSelectionError, Logger, atomic_write, metrics
+from .utils.config import Config
+from .models import Paper
+
+logger = Logger()
+config = Config()
+
+_TOKEN = re.compile(r"[a-z0-9]+(?:[-'][a-z0-9]+)*")
+
+# 常见英文虚词，不参与向量化
+STOP_WORDS = frozenset("""
+    a an and are as at be been by can for from has have in into is it its of on or our over such than that
+    the their these this those to using via was we were which while with
+""".split())
+
+# 按行分块与历史矩阵比较，控制单次计算的内存占用
+_HISTORY_BLOCK = 4096
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    小写化并切分单词，去除虚词和单字符
+    :param text: 文本
+    :return: 单词列表
+    """
+    return [token for token in _TOKEN.findall(text.lower()) if len(token) > 1 and token not in STOP_WORDS]
+
+
+def _iter_ngrams(tokens: List[str], ngram: int) -> Iterator[str]:
+    for n in range(1, ngram + 1):
+        for start in range(len(tokens) - n + 1):
+            yield ' '.join(tokens[start:start + n])
+
+
+def hash_vectors(texts: Sequence[str], dim: int, ngram: int = 2) -> np.ndarray:
+    """
+    将文本映射为L2归一化的哈希n-gram向量（次线性词频）
+    使用crc32而不是内置hash，保证不同进程中同一文本得到相同的向量
+    :param texts: 文本列表
+    :param dim: 向量维度
+    :param ngram: 最大n-gram长度
+    :return: 形状为 (len(texts), dim) 的 float32 矩阵
+    """
+    matrix = np.zeros((len(texts), dim), dtype=np.float32)
+    for row, text in enumerate(texts):
+        tokens = tokenize(text)
+        if not tokens:
+            continue
+        indices = np.fromiter(
+            (zlib.crc32(gram.encode('utf-8')) % dim for gram in _iter_ngrams(tokens, ngram)),
+            dtype=np.int64
+        )
+        matrix[row] = np.log1p(np.bincount(indices, minlength=dim))
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    np.divide(matrix, norms, out=matrix, where=norms > 0)
+    return matrix
+
+
+class VectorHistory:
+    """
+    近期已选论文的向量历史
+    向量以 float16 存放在内存映射文件中并作为环形缓冲区复用，
+    槽位对应的论文ID和写入位置记录在旁边的JSON文件里。
+    """
+
+    def __init__(self, path: str, dim: int, capacity: int):
+        """
+        :param path: 文件路径前缀，实际文件为 <path>.f16 和 <path>.json
+        :param dim: 向量维度
+        :param capacity: 最多保留的向量数
+        """
+        self.dim = dim
+        self.capacity = capacity
+        self.matrix_path = f"{path}.f16"
+        self.meta_path = f"{path}.json"
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        meta = self._load_meta()
+        reuse = (meta is not None and meta.get('dim') == dim and meta.get('capacity') == capacity
+                 and os.path.exists(self.matrix_path))
+        if meta is not None and not reuse:
+            logger.warning(f"向量历史的维度或容量与配置不一致，将重新建立: {self.matrix_path}")
+        self.ids: List[str] = meta['ids'] if reuse else []
+        self.cursor: int = meta['cursor'] if reuse else 0
+        self._slots: Dict[str, int] = {paper_id: slot for slot, paper_id in enumerate(self.ids)}
+        self._matrix = np.memmap(self.matrix_path, dtype=np.float16, mode='r+' if reuse else 'w+',
+                                 shape=(capacity, dim))
+
+    def _load_meta(self) -> Optional[Dict]:
+        if not os.path.exists(self.meta_path):
+            return None
+        try:
+            with open(self.meta_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"向量历史元数据读取失败，将重新建立: {str(e)}")
+            return None
+
+    def _save_meta(self):
+        atomic_write(self.meta_path, json.dumps(
+            {'dim': self.dim, 'capacity': self.capacity, 'cursor': self.cursor, 'ids': self.ids}
+        ))
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def max_similarity(self, vectors: np.ndarray, paper_ids: Sequence[str]) -> np.ndarray:
+        """
+        计算每个向量与历史向量的最大余弦相似度，同一论文ID的历史记录不计入
+        :param vectors: 归一化后的候选向量
+        :param paper_ids: 与候选向量对应的论文ID
+        :return: 最大相似度
+        """
+        best = np.zeros(len(vectors), dtype=np.float32)
+        size = len(self.ids)
+        own_slots = [(row, self._slots.get(paper_id)) for row, paper_id in enumerate(paper_ids)]
+        for start in range(0, size, _HISTORY_BLOCK):
+            end = min(size, start + _HISTORY_BLOCK)
+            sims = vectors @ np.asarray(self._matrix[start:end], dtype=np.float32).T
+            for row, slot in own_slots:
+                if slot is not None and start <= slot < end:
+                    sims[row, slot - start] = 0
+            np.maximum(best, sims.max(axis=1), out=best)
+        return best
+
+    def add(self, paper_ids: Sequence[str], vectors: np.ndarray):
+        """
+        写入向量，已存在的论文覆盖原槽位，缓冲区满后覆盖最旧的记录
+        :param paper_ids: 论文ID
+        :param vectors: 归一化后的向量
+        """
+        for paper_id, vector in zip(paper_ids, vectors):
+            slot = self._slots.get(paper_id)
+            if slot is None:
+                slot = self.cursor
+                if slot < len(self.ids):
+                    del self._slots[self.ids[slot]]
+                    self.ids[slot] = paper_id
+                else:
+                    self.ids.append(paper_id)
+                self._slots[paper_id] = slot
+                self.cursor = (self.cursor + 1) % self.capacity
+            self._matrix[slot] = vector
+        self._matrix.flush()
+        self._save_meta()
+
+
+class PaperSelector:
+    """
+    论文筛选
+    在摘要生成之前，按标题和摘要的哈希n-gram向量与兴趣画像的余弦相似度排序，
+    去掉同一批中的近似重复和与近期已选论文近似重复的论文，只保留前N篇。
+    同一论文（版本号不同或跨类别重复出现）按 base_id 只保留一次；
+    再次出现的已选论文（如上次处理失败）不会被自己的历史记录过滤。
+    """
+
+    def __init__(self, profiles: Optional[Dict[str, str]] = None, dim: Optional[int] = None,
+                 duplicate_threshold: Optional[float] = None, min_score: Optional[float] = None,
+                 history_path: Optional[str] = None, history_size: Optional[int] = None):
+        """
+        :param profiles: 兴趣画像，名称到描述文本（关键词或代表性摘要）的映射；为空时不按相关度排序
+        :param dim: 向量维度
+        :param duplicate_threshold: 余弦相似度不低于该值视为近似重复
+        :param min_score: 配置了兴趣画像时，相关度低于该值的论文不入选
+        :param history_path: 向量历史文件路径前缀
+        :param history_size: 向量历史容量
+        """
+        profiles = profiles if profiles is not None else config.get('selector', 'profiles')
+        self.dim = dim if dim is not None else config.get('selector', 'dim')
+        self.duplicate_threshold = (duplicate_threshold if duplicate_threshold is not None
+                                    else config.get('selector', 'duplicate_threshold'))
+        self.min_score = min_score if min_score is not None else config.get('selector', 'min_score')
+        self.profile_names = list(profiles)
+        self.profile_vectors = hash_vectors(list(profiles.values()), self.dim)
+        history_path = history_path if history_path is not None else config.get('selector', 'history_path')
+        history_size = history_size if history_size is not None else config.get('selector', 'history_size')
+        self.history = VectorHistory(history_path, self.dim, history_size)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def paper_text(paper: Paper) -> str:
+        # 标题重复一次，提高标题词的权重
+        return f"{paper.title}\n{paper.title}\n{paper.summary}"
+
+    def score(self, vectors: np.ndarray) -> np.ndarray:
+        """
+        计算与兴趣画像的相关度（与各画像余弦相似度的最大值）
+        :param vectors: 归一化后的论文向量
+        :return: 相关度
+        """
+        if not self.profile_names:
+            return np.zeros(len(vectors), dtype=np.float32)
+        return (vectors @ self.profile_vectors.T).max(axis=1)
+
+    @error_handler
+    def select(self, papers: Iterable[Paper], top_n: int) -> List[Paper]:
+        """
+        筛选论文，入选的论文写入向量历史
+        :param papers: 候选论文
+        :param top_n: 最多保留的篇数
+        :return: 按相关度从高到低排列的入选论文；未配置兴趣画像时保持原有顺序
+        """
+        try:
+            candidates: Dict[str, Paper] = {}
+            for paper in papers:
+                candidates.setdefault(paper.base_id, paper)
+            if not candidates:
+                return []
+            ids = list(candidates)
+            papers = list(candidates.values())
+
+            with metrics.timer('selector.select'), self._lock:
+                vectors = hash_vectors([self.paper_text(paper) for paper in papers], self.dim)
+                scores = self.score(vectors)
+                history_similarity = self.history.max_similarity(vectors, ids)
+                pairwise = vectors @ vectors.T
+
+                kept: List[int] = []
+                irrelevant = history_duplicates = batch_duplicates = 0
+                for row in np.argsort(-scores, kind='stable'):
+                    if len(kept) >= top_n:
+                        break
+                    if self.profile_names and scores[row] < self.min_score:
+                        irrelevant += 1
+                    elif history_similarity[row] >= self.duplicate_threshold:
+                        history_duplicates += 1
+                    elif kept and pairwise[row, kept].max() >= self.duplicate_threshold:
+                        batch_duplicates += 1
+                    else:
+                        kept.append(int(row))
+                if kept:
+                    self.history.add([ids[row] for row in kept], vectors[kept])
+
+            metrics.add('selector_candidates', len(papers))
+            metrics.add('selector_duplicates', history_duplicates + batch_duplicates)
+            logger.info(f"论文筛选: 候选 {len(papers)} 篇，入选 {len(kept)} 篇，相关度不足 {irrelevant} 篇，"
+                        f"与历史重复 {history_duplicates} 篇，同批重复 {batch_duplicates} 篇")
+            return [papers[row] for row in kept]
+        except Exception as e:
+            raise PaperSelectionError(f"论文筛选失败: {str(e)}")
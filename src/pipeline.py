@@ -0,0 +1,170 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from .utils import CircuitOpenError, Logger, find_cause, log_once, metrics
+from .models import Paper
+
+logger = Logger()
+
+
+class PipelineItem:
+    """流水线中流转的单篇论文及其各阶段结果"""
+
+    def __init__(self, paper: Paper):
+        self.paper = paper
+        self.results: Dict[str, Any] = {}
+        self.error: Optional[Exception] = None
+        self.failed_stage: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class PipelineStage:
+    """流水线阶段：名称、处理函数及并发数"""
+
+    def __init__(self, name: str, func: Callable[[PipelineItem], Any], workers: int = 1):
+        self.name = name
+        self.func = func
+        self.workers = max(1, int(workers))
+
+
+class StageStats:
+    """单个阶段的吞吐统计"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.processed = 0
+        self.failed = 0
+        self.busy_seconds = 0.0
+        self.first_start: Optional[float] = None
+        self.last_end: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def record(self, started: float, ended: float, success: bool):
+        with self._lock:
+            if success:
+                self.processed += 1
+            else:
+                self.failed += 1
+            self.busy_seconds += ended - started
+            if self.first_start is None or started < self.first_start:
+                self.first_start = started
+            if self.last_end is None or ended > self.last_end:
+                self.last_end = ended
+
+    @property
+    def wall_seconds(self) -> float:
+        if self.first_start is None or self.last_end is None:
+            return 0.0
+        return self.last_end - self.first_start
+
+    def summary(self) -> str:
+        total = self.processed + self.failed
+        wall = self.wall_seconds
+        per_minute = self.processed / wall * 60 if wall > 0 else 0.0
+        avg = self.busy_seconds / total if total else 0.0
+        return (f"阶段 {self.name}: 成功 {self.processed}, 失败 {self.failed}, "
+                f"平均耗时 {avg:.2f}s, 墙钟时间 {wall:.2f}s, 吞吐 {per_minute:.2f} 篇/分钟")
+
+
+class PaperPipeline:
+    """
+    按阶段流水线处理论文
+    每个阶段拥有独立的线程池，论文完成一个阶段后立即进入下一阶段，
+    单篇论文在任一阶段失败只会中止该论文，不影响其他论文。
+    """
+
+    def __init__(self, stages: List[PipelineStage]):
+        if not stages:
+            raise ValueError("流水线至少需要一个阶段")
+        self.stages = stages
+        self.stats: Dict[str, StageStats] = {stage.name: StageStats(stage.name) for stage in stages}
+
+    def run(self, papers: Iterable[Paper],
+            on_complete: Optional[Callable[[PipelineItem], None]] = None) -> List[PipelineItem]:
+        """
+        运行流水线
+        :param papers: 论文列表（可为迭代器，论文到达即开始处理）
+        :param on_complete: 每篇论文走完全部阶段（无论成败）后的回调
+        :return: 每篇论文的处理结果
+        """
+        executors = [
+            ThreadPoolExecutor(max_workers=stage.workers, thread_name_prefix=f"pipeline-{stage.name}")
+            for stage in self.stages
+        ]
+        items: List[PipelineItem] = []
+        outstanding = 0
+        done = threading.Condition()
+
+        def finish(item: PipelineItem):
+            nonlocal outstanding
+            # 依赖熔断导致的失败由回调决定去向（如暂存到下次运行），不记为错误
+            if item.error is not None and find_cause(item.error, CircuitOpenError) is None:
+                log_once(item.error, f"处理论文失败: {item.paper.title}, "
+                                     f"阶段: {item.failed_stage}, 错误: {str(item.error)}")
+            if on_complete is not None:
+                try:
+                    on_complete(item)
+                except Exception as e:
+                    logger.error(f"流水线回调失败: {item.paper.title}, 错误: {str(e)}")
+            with done:
+                outstanding -= 1
+                done.notify_all()
+
+        def submit(item: PipelineItem, index: int):
+            stage = self.stages[index]
+            future = executors[index].submit(self._run_stage, stage, item)
+            future.add_done_callback(lambda f: advance(f, item, index))
+
+        def advance(future: Future, item: PipelineItem, index: int):
+            if future.exception() is not None and item.error is None:
+                item.error = future.exception()
+                item.failed_stage = self.stages[index].name
+            if item.error is not None or index + 1 == len(self.stages):
+                finish(item)
+            else:
+                submit(item, index + 1)
+
+        start = time.perf_counter()
+        try:
+            for paper in papers:
+                item = PipelineItem(paper)
+                items.append(item)
+                with done:
+                    outstanding += 1
+                submit(item, 0)
+            with done:
+                while outstanding:
+                    done.wait()
+        finally:
+            for executor in executors:
+                executor.shutdown(wait=True)
+
+        self._log_summary(items, time.perf_counter() - start)
+        return items
+
+    def _run_stage(self, stage: PipelineStage, item: PipelineItem):
+        started = time.perf_counter()
+        try:
+            item.results[stage.name] = stage.func(item)
+        except Exception as e:
+            item.error = e
+            item.failed_stage = stage.name
+            ended = time.perf_counter()
+            self.stats[stage.name].record(started, ended, False)
+            metrics.record_call(f"pipeline.{stage.name}", ended - started, False)
+            return
+        ended = time.perf_counter()
+        self.stats[stage.name].record(started, ended, True)
+        metrics.record_call(f"pipeline.{stage.name}", ended - started, True)
+
+    def _log_summary(self, items: List[PipelineItem], elapsed: float):
+        succeeded = sum(1 for item in items if item.ok)
+        per_minute = succeeded / elapsed * 60 if elapsed > 0 else 0.0
+        logger.info(f"流水线完成: 共 {len(items)} 篇, 成功 {succeeded} 篇, "
+                    f"总耗时 {elapsed:.2f}s, 整体吞吐 {per_minute:.2f} 篇/分钟")
+        for stage in self.stages:
+            logger.info(self.stats[stage.name].summary())
@@ -0,0 +1,297 @@
+import heapq
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import IO, Any, Callable, Dict, List, Optional, Set, Tuple
+from .utils import Logger, atomic_write, log_once
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+logger = Logger()
+
+# 单次休眠的上限（秒），系统休眠或调整时钟后最多这么久就会重新计算到期时间
+_MAX_SLEEP = 300.0
+
+
+def _lock_file(path: str, blocking: bool = True) -> Optional[IO]:
+    """
+    获取文件锁，关闭返回的文件即释放；进程退出时由系统自动释放
+    :param path: 锁文件路径
+    :param blocking: 是否等待其他进程释放
+    :return: 锁文件，非阻塞模式下锁已被占用时返回 None
+    """
+    f = open(path, 'a+')
+    try:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK if blocking else msvcrt.LK_NBLCK, 1)
+    except OSError:
+        f.close()
+        if blocking:
+            raise
+        return None
+    return f
+
+
+def parse_time(value: str) -> Tuple[int, int]:
+    """
+    解析 HH:MM 格式的时间
+    :param value: 时间字符串
+    :return: (小时, 分钟)
+    """
+    try:
+        hour, minute = (int(part) for part in value.strip().split(':'))
+    except ValueError:
+        raise ValueError(f"无效的时间格式: {value}，应为 HH:MM")
+    if not (0 <= hour < 24 and 0 <= minute < 60):
+        raise ValueError(f"无效的时间: {value}")
+    return hour, minute
+
+
+class JobSpec:
+    """
+    定时任务定义
+    :param name: 任务名称，同时作为增量爬取水位线的名称
+    :param time: 每天执行的时间（HH:MM，本地时间）
+    :param query: arXiv查询条件，如 "cat:cs.CL"，为 None 时不限类别
+    :param max_papers: 每次最多处理的论文数，为 None 时使用 MAX_PAPERS_PER_DAY
+    :param days: 爬取最近几天的论文，为 None 时使用 DAYS_TO_CRAWL
+    """
+
+    __slots__ = ('name', 'time', 'query', 'max_papers', 'days')
+
+    def __init__(self, name: str, time: str, query: Optional[str] = None,
+                 max_papers: Optional[int] = None, days: Optional[int] = None):
+        parse_time(time)
+        self.name = name
+        self.time = time
+        self.query = query
+        self.max_papers = max_papers
+        self.days = days
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'JobSpec':
+        return cls(
+            name=data['name'],
+            time=data['time'],
+            query=data.get('query'),
+            max_papers=data.get('max_papers'),
+            days=data.get('days')
+        )
+
+    def __repr__(self) -> str:
+        return f"JobSpec({self.name!r}, {self.time!r}, query={self.query!r})"
+
+
+class ScheduledJob:
+    """
+    每天在固定时间执行的任务
+    :param name: 任务名称
+    :param at: 执行时间（HH:MM，本地时间）
+    :param func: 任务函数
+    """
+
+    def __init__(self, name: str, at: str, func: Callable[[], Any]):
+        self.name = name
+        self.at = at
+        self.hour, self.minute = parse_time(at)
+        self.func = func
+
+    def _at_date(self, now: datetime) -> datetime:
+        return now.replace(hour=self.hour, minute=self.minute, second=0, microsecond=0)
+
+    def previous_due(self, now: datetime) -> datetime:
+        """
+        最近一次应执行的时间（不晚于 now）
+        """
+        due = self._at_date(now)
+        return due if due <= now else due - timedelta(days=1)
+
+    def next_due(self, now: datetime) -> datetime:
+        """
+        下一次应执行的时间（晚于 now）
+        """
+        due = self._at_date(now)
+        return due if due > now else due + timedelta(days=1)
+
+
+class JobScheduler:
+    """
+    事件驱动的多任务调度器
+    休眠到最近一个任务到期再唤醒；不同任务在线程池中并发执行，
+    同一任务上一次尚未结束时跳过本次；每个任务成功执行的时间点记录在状态文件中，
+    重启后会补跑停机期间错过的那一次；开启 run_on_start 时每次启动都立即执行一次各任务。
+    多个调度器共享同一个状态文件时，任务执行期间持有该任务的文件锁，
+    执行前重新读取状态文件，同一次计划执行只会由一个调度器完成。
+    """
+
+    def __init__(self, jobs: List[ScheduledJob], state_path: Optional[str] = None,
+                 catch_up: bool = True, max_workers: Optional[int] = None, run_on_start: bool = False):
+        if not jobs:
+            raise ValueError("没有配置定时任务")
+        names = [job.name for job in jobs]
+        duplicated = sorted({name for name in names if names.count(name) > 1})
+        if duplicated:
+            raise ValueError(f"任务名称重复: {', '.join(duplicated)}")
+        self.jobs = {job.name: job for job in jobs}
+        self.state_path = state_path
+        self.catch_up = catch_up
+        self.run_on_start = run_on_start
+        self.max_workers = max_workers or max(1, len(jobs))
+
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = False
+        self._running: Set[str] = set()
+        self._queue: List[Tuple[datetime, str, datetime]] = []
+        self._state: Dict[str, str] = self._load_state()
+
+    def _load_state(self) -> Dict[str, str]:
+        if not self.state_path or not os.path.exists(self.state_path):
+            return {}
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"调度状态文件读取失败，将视为首次运行: {str(e)}")
+            return {}
+
+    def _lock_path(self, name: Optional[str] = None) -> str:
+        directory = os.path.dirname(self.state_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        return f"{self.state_path}.{name}.lock" if name else f"{self.state_path}.lock"
+
+    def _save_state(self, name: str, scheduled_for: datetime):
+        self._state[name] = scheduled_for.isoformat()
+        if not self.state_path:
+            return
+        lock = _lock_file(self._lock_path())
+        try:
+            # 先合并状态文件中其他调度器写入的记录，避免覆盖
+            state = self._load_state()
+            state.update(self._state)
+            self._state = state
+            atomic_write(self.state_path, json.dumps(self._state, ensure_ascii=False, indent=2))
+        finally:
+            lock.close()
+
+    def _refresh_last_run(self, name: str) -> Optional[datetime]:
+        # 其他共享状态文件的调度器可能已经执行过
+        last = self.last_run(name)
+        if self.state_path:
+            value = self._load_state().get(name)
+            if value and (last is None or datetime.fromisoformat(value) > last):
+                last = datetime.fromisoformat(value)
+                with self._lock:
+                    self._state[name] = value
+        return last
+
+    def last_run(self, name: str) -> Optional[datetime]:
+        """
+        获取任务最近一次成功执行对应的计划时间
+        :param name: 任务名称
+        :return: 计划时间，从未执行时返回 None
+        """
+        with self._lock:
+            value = self._state.get(name)
+        return datetime.fromisoformat(value) if value else None
+
+    def _plan(self, now: datetime) -> List[Tuple[datetime, str, datetime]]:
+        queue = []
+        for job in self.jobs.values():
+            previous = job.previous_due(now)
+            last = self.last_run(job.name)
+            if self.catch_up and (last is None or last < previous):
+                # 错过的多次执行合并为一次，立即补跑
+                logger.info(f"任务 {job.name} 错过了 {previous:%Y-%m-%d %H:%M} 的执行，立即补跑")
+                queue.append((now, job.name, previous))
+            elif self.run_on_start:
+                # 计划时间记为启动时间，不会因上一次计划执行已完成而被跳过
+                logger.info(f"任务 {job.name} 启动时立即执行一次")
+                queue.append((now, job.name, now))
+            else:
+                due = job.next_due(now)
+                queue.append((due, job.name, due))
+        heapq.heapify(queue)
+        return queue
+
+    def next_run_times(self) -> Dict[str, datetime]:
+        """
+        获取各任务下一次执行的时间
+        :return: 任务名称到时间的映射
+        """
+        with self._lock:
+            return {name: due for due, name, _ in sorted(self._queue)}
+
+    def _dispatch(self, executor: ThreadPoolExecutor, job: ScheduledJob, scheduled_for: datetime):
+        with self._lock:
+            if job.name in self._running:
+                logger.warning(f"任务 {job.name} 上一次执行尚未结束，跳过 {scheduled_for:%Y-%m-%d %H:%M} 的执行")
+                return
+            self._running.add(job.name)
+        executor.submit(self._execute, job, scheduled_for)
+
+    def _execute(self, job: ScheduledJob, scheduled_for: datetime):
+        lock = None
+        try:
+            if self.state_path:
+                lock = _lock_file(self._lock_path(job.name), blocking=False)
+                if lock is None:
+                    logger.warning(f"任务 {job.name} 正由其他调度器执行，跳过 {scheduled_for:%Y-%m-%d %H:%M} 的执行")
+                    return
+            last = self._refresh_last_run(job.name)
+            if last is not None and last >= scheduled_for:
+                logger.info(f"任务 {job.name} 已由其他调度器完成 {scheduled_for:%Y-%m-%d %H:%M} 的执行，跳过")
+                return
+            logger.info(f"开始执行任务: {job.name}（计划时间 {scheduled_for:%Y-%m-%d %H:%M}）")
+            job.func()
+            with self._lock:
+                self._save_state(job.name, scheduled_for)
+            logger.info(f"任务执行完成: {job.name}")
+        except Exception as e:
+            log_once(e, f"任务执行失败: {job.name}, 错误: {str(e)}")
+        finally:
+            if lock is not None:
+                lock.close()
+            with self._lock:
+                self._running.discard(job.name)
+
+    def run_forever(self):
+        """
+        在当前线程运行调度循环，直到调用 stop()
+        """
+        queue = self._plan(datetime.now())
+        with self._lock:
+            self._queue = queue
+        executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="scheduler")
+        try:
+            while not self._stopping:
+                now = datetime.now()
+                with self._lock:
+                    due, name, scheduled_for = self._queue[0]
+                    if due <= now:
+                        following = self.jobs[name].next_due(now)
+                        heapq.heapreplace(self._queue, (following, name, following))
+                if due > now:
+                    self._wakeup.wait(min((due - now).total_seconds(), _MAX_SLEEP))
+                    self._wakeup.clear()
+                    continue
+                self._dispatch(executor, self.jobs[name], scheduled_for)
+        finally:
+            # 等待正在执行的任务结束
+            executor.shutdown(wait=True)
+
+    def stop(self):
+        """
+        停止调度循环（可在信号处理函数或其他线程中调用）
+        """
+        self._stopping = True
+        self._wakeup.set()
@@ -1,172 +1,762 @@
-from openai import OpenAI
 import os
-from typing import Dict, Any, Optional
-from .utils import error_handler, SummaryGenerationError, Logger
+import json
+import time
+import asyncio
+import threading
+from functools import partial
+from typing import Callable, Dict, Any, List, Optional, Tuple, Union
+from .utils import error_handler, log_once, SummaryGenerationError, Logger, LLMCache, AdaptiveRateLimiter, metrics, dependency, shared_limiter
+from .utils.rate_limiter import estimate_request_tokens, parse_retry_after
+from .utils.resilience import error_status
 from .utils.config import Config
-from dotenv import load_dotenv
+from .models import Paper
 
 logger = Logger()
 config = Config()
 
-class SummaryGenerator:
-    def __init__(self):
-        self.client = OpenAI(api_key=config.get('openai', 'api_key'))
-        self.model = config.get('openai', 'model')
-        self.temperature = config.get('openai', 'temperature')
-        self.max_tokens = config.get('openai', 'max_tokens')
-    
-    @error_handler
-    def generate_summary(self, paper_content: str) -> str:
-        """
-        生成论文摘要
-        :param paper_content: 论文内容
-        :return: 生成的摘要
-        """
-        try:
-            prompt = f"""
+# 完整摘要包含的各部分
+SECTIONS = ('summary', 'highlights', 'implications', 'technical_details')
+
+# 各部分的提示词，max_tokens 为 None 时使用配置的 SUMMARY_LENGTH
+SECTION_PROMPTS: Dict[str, Dict[str, Any]] = {
+    'summary': {
+        'system': "你是一个专业的学术论文摘要生成助手。",
+        'prompt': """
             请为以下论文生成一个简洁的摘要，包含主要观点和创新点：
-            
+
             {paper_content}
-            
+
             请用中文回答，并按照以下格式组织：
             1. 研究背景
             2. 主要方法
             3. 创新点
             4. 实验结果
             5. 研究意义
+            """,
+        'max_tokens': None,
+        'label': '论文摘要',
+        'error': '摘要生成失败'
+    },
+    'highlights': {
+        'system': "你是一个专业的学术论文亮点提取助手。",
+        'prompt': """
+            请为以下论文生成3-5个主要亮点：
+
+            {paper_content}
+
+            请用中文回答，每个亮点用一句话概括。
+            """,
+        'max_tokens': 500,
+        'label': '论文亮点',
+        'error': '亮点生成失败'
+    },
+    'implications': {
+        'system': "你是一个专业的学术论文意义分析助手。",
+        'prompt': """
+            请分析以下论文的研究意义和潜在影响：
+
+            {paper_content}
+
+            请用中文回答，从学术和实际应用两个角度进行分析。
+            """,
+        'max_tokens': 500,
+        'label': '研究意义',
+        'error': '研究意义生成失败'
+    },
+    'technical_details': {
+        'system': "你是一个专业的技术细节提取助手。",
+        'prompt': """
+            请提取以下论文中的关键技术细节：
+
+            {paper_content}
+
+            请用中文回答，重点说明论文中使用的技术方法和创新点。
+            """,
+        'max_tokens': 500,
+        'label': '技术细节',
+        'error': '技术细节生成失败'
+    }
+}
+
+COMBINED_PROMPT = """
+            请阅读以下论文信息，一次性生成摘要、亮点、研究意义和技术细节：
+
+            {paper_content}
+
+            请用中文回答，并严格输出一个JSON对象，包含以下四个字符串字段：
+            - "summary": 简洁的摘要，按照 1. 研究背景 2. 主要方法 3. 创新点 4. 实验结果 5. 研究意义 组织
+            - "highlights": 3-5个主要亮点，每个亮点用一句话概括，每行一个
+            - "implications": 研究意义和潜在影响，从学术和实际应用两个角度进行分析
+            - "technical_details": 关键技术细节，重点说明论文中使用的技术方法和创新点
             """
-            
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "你是一个专业的学术论文摘要生成助手。"},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=self.temperature,
-                max_tokens=self.max_tokens
-            )
-            
-            summary = response.choices[0].message.content
-            logger.info("成功生成论文摘要")
-            return summary
+
+# 流式生成的进度回调：(部分名称, 目前已生成的全部文本)
+ProgressCallback = Callable[[str, str], None]
+
+# 截断时优先落在这些字符之后
+_SENTENCE_ENDS = '。！？；.!?;\n'
+
+
+def clip_text(text: str, max_chars: Optional[int]) -> str:
+    """
+    将文本截断到 max_chars 以内，尽量保留完整的句子
+    :param text: 文本
+    :param max_chars: 最大字符数，为 None 时不截断
+    :return: 截断后的文本
+    """
+    if not max_chars or len(text) <= max_chars:
+        return text
+    clipped = text[:max_chars]
+    end = max(clipped.rfind(ch) for ch in _SENTENCE_ENDS)
+    # 句末位置太靠前时直接按字符截断
+    if end >= max_chars // 2:
+        clipped = clipped[:end + 1]
+    return clipped.rstrip()
+
+
+class SummaryGenerator:
+    def __init__(self, max_concurrency: Optional[int] = None):
+        self._client = None
+        self._client_lock = threading.Lock()
+        self.model = config.get('openai', 'model')
+        self.temperature = config.get('openai', 'temperature')
+        self.max_tokens = config.get('openai', 'max_tokens')
+        self.summary_mode = config.get('openai', 'summary_mode')
+        # 重试策略与熔断器由同一进程内的所有生成器共享
+        self.dependency = dependency('openai')
+        self.stream = config.get('openai', 'stream_enabled')
+        self.max_section_chars = config.get('openai', 'max_section_chars')
+        self.cache = self.create_cache()
+        # 并发由限流器按AIMD控制，上限为 max_concurrency
+        self.limiter = self.create_limiter(max_concurrency)
+        self.max_concurrency = self.limiter.max_concurrency
+
+    @property
+    def client(self):
+        """
+        OpenAI客户端，首次发送请求时才创建
+        """
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    self._client = self.create_client()
+        return self._client
+
+    def create_client(self):
+        """
+        创建OpenAI客户端
+        openai 在这里才导入，不调用接口的命令无需加载它
+        :return: 客户端
+        """
+        from openai import OpenAI
+        # 重试由限流器统一调度，关闭SDK自带的重试
+        return OpenAI(
+            api_key=config.get('openai', 'api_key'),
+            base_url=config.get('openai', 'base_url'),
+            timeout=config.get('openai', 'timeout'),
+            max_retries=0
+        )
+
+    @staticmethod
+    def create_cache() -> Optional[LLMCache]:
+        """
+        按配置创建LLM响应缓存
+        :return: 缓存实例，未启用时返回 None
+        """
+        if not config.get('cache', 'enabled'):
+            return None
+        return LLMCache(
+            config.get('cache', 'path'),
+            ttl_seconds=config.get('cache', 'ttl_days') * 86400,
+            max_bytes=int(config.get('cache', 'max_mb') * 1024 * 1024),
+            bypass=config.get('cache', 'bypass')
+        )
+
+    @staticmethod
+    def create_limiter(max_concurrency: Optional[int] = None) -> AdaptiveRateLimiter:
+        """
+        获取请求限流器
+        默认使用进程内共享的 openai 限流器，所有生成器（含全文摘要和批处理回退）共同遵守账号的RPM/TPM额度；
+        显式指定并发上限时创建独立的限流器
+        :param max_concurrency: 在途请求上限，为 None 时使用共享限流器
+        :return: 限流器
+        """
+        if max_concurrency is None:
+            return shared_limiter('openai')
+        return AdaptiveRateLimiter(
+            rpm=config.get('openai', 'rpm_limit'),
+            tpm=config.get('openai', 'tpm_limit'),
+            max_concurrency=max_concurrency
+        )
+
+    def _on_failure(self, error: Exception, tokens: int, attempt: int, started: float) -> float:
+        """
+        请求失败时归还额度，并按重试策略计算重试前的等待时间
+        :param error: 请求异常
+        :param tokens: 预占的令牌数
+        :param attempt: 第几次重试，从0开始
+        :param started: 第一次尝试开始的时间（time.monotonic）
+        :return: 等待秒数
+        :raises: 永久错误、重试次数或总耗时预算用尽时抛出原异常
+        """
+        status = error_status(error)
+        headers = getattr(getattr(error, 'response', None), 'headers', None)
+        retry_after = parse_retry_after(headers)
+        transient = self.dependency.policy.classify(error)
+        # 被服务端拒绝的请求不消耗令牌
+        used_tokens = 0 if status is not None and status < 500 else None
+        self.limiter.release(tokens, used_tokens=used_tokens, headers=headers,
+                             throttled=transient, retry_after=retry_after, succeeded=False)
+        self.dependency.record(error)
+        delay = self.dependency.policy.next_delay(error, attempt, started, retry_after)
+        if delay is None:
+            raise error
+
+        reason = str(status) if status is not None else type(error).__name__
+        metrics.add('llm_retries', model=self.model, reason=reason)
+        logger.warning(f"OpenAI请求失败（{reason}），{delay:.1f}秒后第{attempt + 1}次重试")
+        return delay
+
+    def build_section_request(self, section: str, paper_content: str) -> Dict[str, Any]:
+        """
+        构建单个部分的请求参数
+        :param section: 部分名称
+        :param paper_content: 论文内容
+        :return: chat.completions.create 的参数
+        """
+        spec = SECTION_PROMPTS[section]
+        return {
+            'model': self.model,
+            'messages': [
+                {"role": "system", "content": spec['system']},
+                {"role": "user", "content": spec['prompt'].format(paper_content=paper_content)}
+            ],
+            'temperature': self.temperature,
+            'max_tokens': spec['max_tokens'] or self.max_tokens
+        }
+
+    def build_combined_request(self, paper_content: str) -> Dict[str, Any]:
+        """
+        构建合并请求的参数
+        :param paper_content: 论文内容
+        :return: chat.completions.create 的参数
+        """
+        return {
+            'model': self.model,
+            'messages': [
+                {"role": "system", "content": "你是一个专业的学术论文解读助手，只输出JSON。"},
+                {"role": "user", "content": COMBINED_PROMPT.format(paper_content=paper_content)}
+            ],
+            'temperature': self.temperature,
+            'max_tokens': self.max_tokens + 500 * (len(SECTIONS) - 1),
+            'response_format': {"type": "json_object"}
+        }
+
+    def _complete(self, request: Dict[str, Any], on_text: Optional[Callable[[str], None]] = None,
+                  max_chars: Optional[int] = None) -> str:
+        """
+        发送请求并返回模型输出
+        :param request: 请求参数
+        :param on_text: 流式模式下每收到一段输出时以目前的全部文本调用
+        :param max_chars: 输出的最大字符数，流式模式下达到后提前结束生成
+        :return: 模型输出文本
+        """
+        key = self.cache.make_key(request) if self.cache else None
+        if key:
+            cached = self.cache.get(key)
+            if cached is not None:
+                metrics.add('llm_cache_hits', model=self.model)
+                cached = clip_text(cached, max_chars)
+                if on_text:
+                    on_text(cached)
+                return cached
+
+        tokens = estimate_request_tokens(request)
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            # 熔断期间请求不发出、不占额度，立即失败
+            self.dependency.breaker.check()
+            self.limiter.acquire(tokens)
+            try:
+                with metrics.timer('openai.chat_completion'):
+                    if self.stream:
+                        text, usage, headers, complete = self._stream_completion(request, on_text, max_chars)
+                    else:
+                        raw = self.client.chat.completions.with_raw_response.create(**request)
+                        response = raw.parse()
+                        text, usage, headers = response.choices[0].message.content, response.usage, raw.headers
+                        complete = True
+            except Exception as e:
+                time.sleep(self._on_failure(e, tokens, attempt, started))
+                attempt += 1
+                continue
+            self.dependency.breaker.record_success()
+            break
+        text = self._finish(key, tokens, text, usage, headers, max_chars, complete)
+        if on_text:
+            # 以截断后的最终文本覆盖流式过程中的中间结果
+            on_text(text)
+        return text
+
+    def _finish(self, key: Optional[str], tokens: int, text: Optional[str], usage: Any,
+                headers: Any, max_chars: Optional[int], complete: bool = True) -> str:
+        """
+        请求成功后归还额度、记录用量并写入缓存
+        缓存保存未截断的完整输出，读取时再按 max_chars 截断，修改截断长度后缓存仍然可用；
+        提前结束的流只有部分输出，不写入缓存，否则以后的请求会一直得到不完整的结果
+        :param complete: 模型是否完整生成了输出
+        :return: 截断后的输出文本
+        """
+        # 提前结束的流没有用量信息，保留预占的令牌数
+        used_tokens = getattr(usage, 'total_tokens', None)
+        self.limiter.release(tokens, used_tokens=used_tokens, headers=headers)
+        if usage is not None:
+            metrics.record_usage(self.model, usage)
+        text = text or ''
+        if key and complete:
+            self.cache.set(key, text)
+        return clip_text(text, max_chars)
+
+    def stream_kwargs(self) -> Dict[str, Any]:
+        return {'stream': True, 'stream_options': {'include_usage': True}}
+
+    def _on_chunk(self, chunk: Any, text: str, started: float) -> Tuple[str, bool]:
+        """
+        处理一个流式片段
+        :param chunk: ChatCompletionChunk
+        :param text: 目前已收到的文本
+        :param started: 请求开始时间
+        :return: (新的文本, 是否有新内容)
+        """
+        delta = chunk.choices[0].delta.content if chunk.choices else None
+        if not delta:
+            return text, False
+        if not text:
+            metrics.record_call('openai.time_to_first_token', time.perf_counter() - started, True)
+        return text + delta, True
+
+    def _stream_completion(self, request: Dict[str, Any], on_text: Optional[Callable[[str], None]],
+                           max_chars: Optional[int]) -> Tuple[str, Any, Any, bool]:
+        """
+        以流式方式发送请求，边接收边回调，达到 max_chars 后关闭连接不再生成
+        :return: (文本, 用量, 响应头, 是否完整生成)；达到 max_chars 提前结束时第四项为 False，
+                 此时文本只是部分输出，不应写入缓存
+        """
+        client = self.client
+        started = time.perf_counter()
+        raw = client.chat.completions.with_raw_response.create(**request, **self.stream_kwargs())
+        stream = raw.parse()
+        text, usage, complete = '', None, True
+        try:
+            for chunk in stream:
+                usage = chunk.usage or usage
+                text, changed = self._on_chunk(chunk, text, started)
+                if not changed:
+                    continue
+                if on_text:
+                    on_text(text)
+                if max_chars and len(text) >= max_chars:
+                    metrics.add('llm_stream_early_stops', model=self.model)
+                    complete = False
+                    break
+        finally:
+            stream.close()
+        return text, usage, raw.headers, complete
+
+    def _generate_section(self, section: str, paper_content: str,
+                          on_text: Optional[Callable[[str], None]] = None) -> str:
+        spec = SECTION_PROMPTS[section]
+        try:
+            text = self._complete(self.build_section_request(section, paper_content), on_text, self.max_section_chars)
+            logger.info(f"成功生成{spec['label']}")
+            return text
         except Exception as e:
-            raise SummaryGenerationError(f"摘要生成失败: {str(e)}")
-    
+            raise SummaryGenerationError(f"{spec['error']}: {str(e)}")
+
+    def complete(self, request: Dict[str, Any], on_text: Optional[Callable[[str], None]] = None,
+                 max_chars: Optional[int] = None) -> str:
+        """
+        发送任意 chat completion 请求，与摘要各部分共用缓存、限流、重试和熔断
+        供全文摘要的 map/reduce 等自行构建请求的调用方使用
+        :param request: chat.completions.create 的参数
+        :param on_text: 流式模式下每收到一段输出时以目前的全部文本调用
+        :param max_chars: 输出的最大字符数
+        :return: 模型输出文本
+        """
+        return self._complete(request, on_text, max_chars)
+
+    @error_handler
+    def generate_section(self, section: str, paper_content: str,
+                         on_text: Optional[Callable[[str], None]] = None) -> str:
+        """
+        生成完整摘要中的单个部分
+        :param section: 部分名称，见 SECTIONS
+        :param paper_content: 论文内容
+        :param on_text: 流式模式下的进度回调
+        :return: 生成的文本
+        """
+        return self._generate_section(section, paper_content, on_text)
+
+    @error_handler
+    def generate_summary(self, paper_content: str, on_text: Optional[Callable[[str], None]] = None) -> str:
+        """
+        生成论文摘要
+        :param paper_content: 论文内容
+        :param on_text: 流式模式下的进度回调
+        :return: 生成的摘要
+        """
+        return self._generate_section('summary', paper_content, on_text)
+
     @error_handler
-    def generate_highlights(self, paper_content: str) -> str:
+    def generate_highlights(self, paper_content: str, on_text: Optional[Callable[[str], None]] = None) -> str:
         """
         生成论文亮点
         :param paper_content: 论文内容
+        :param on_text: 流式模式下的进度回调
         :return: 生成的亮点
         """
-        try:
-            prompt = f"""
-            请为以下论文生成3-5个主要亮点：
-            
-            {paper_content}
-            
-            请用中文回答，每个亮点用一句话概括。
-            """
-            
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "你是一个专业的学术论文亮点提取助手。"},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=self.temperature,
-                max_tokens=500
-            )
-            
-            highlights = response.choices[0].message.content
-            logger.info("成功生成论文亮点")
-            return highlights
-        except Exception as e:
-            raise SummaryGenerationError(f"亮点生成失败: {str(e)}")
-    
+        return self._generate_section('highlights', paper_content, on_text)
+
     @error_handler
-    def generate_implications(self, paper_content: str) -> str:
+    def generate_implications(self, paper_content: str, on_text: Optional[Callable[[str], None]] = None) -> str:
         """
         生成研究意义
         :param paper_content: 论文内容
+        :param on_text: 流式模式下的进度回调
         :return: 生成的研究意义
         """
-        try:
-            prompt = f"""
-            请分析以下论文的研究意义和潜在影响：
-            
-            {paper_content}
-            
-            请用中文回答，从学术和实际应用两个角度进行分析。
-            """
-            
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "你是一个专业的学术论文意义分析助手。"},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=self.temperature,
-                max_tokens=500
-            )
-            
-            implications = response.choices[0].message.content
-            logger.info("成功生成研究意义")
-            return implications
-        except Exception as e:
-            raise SummaryGenerationError(f"研究意义生成失败: {str(e)}")
-    
+        return self._generate_section('implications', paper_content, on_text)
+
     @error_handler
-    def generate_technical_details(self, paper_content: str) -> str:
+    def generate_technical_details(self, paper_content: str, on_text: Optional[Callable[[str], None]] = None) -> str:
         """
         生成技术细节
         :param paper_content: 论文内容
+        :param on_text: 流式模式下的进度回调
         :return: 生成的技术细节
         """
+        return self._generate_section('technical_details', paper_content, on_text)
+
+    @staticmethod
+    def parse_combined_response(text: Optional[str]) -> Dict[str, str]:
+        """
+        解析并校验合并请求返回的JSON，只保留有效的部分
+        :param text: 模型返回的文本
+        :return: 有效的部分，缺失或格式错误的部分不会出现在结果中
+        """
         try:
-            prompt = f"""
-            请提取以下论文中的关键技术细节：
-            
-            {paper_content}
-            
-            请用中文回答，重点说明论文中使用的技术方法和创新点。
-            """
-            
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "你是一个专业的技术细节提取助手。"},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=self.temperature,
-                max_tokens=500
-            )
-            
-            technical_details = response.choices[0].message.content
-            logger.info("成功生成技术细节")
-            return technical_details
+            data = json.loads(text or '')
+        except ValueError:
+            return {}
+        if not isinstance(data, dict):
+            return {}
+
+        sections = {}
+        for section in SECTIONS:
+            value = data.get(section)
+            if isinstance(value, list) and all(isinstance(v, str) for v in value):
+                value = '\n'.join(v.strip() for v in value if v.strip())
+            if isinstance(value, str) and value.strip():
+                sections[section] = value.strip()
+        return sections
+
+    @error_handler
+    def generate_combined(self, paper_content: str) -> Dict[str, str]:
+        """
+        通过一次结构化请求生成全部部分
+        :param paper_content: 论文内容
+        :return: 解析成功的部分
+        """
+        try:
+            text = self._complete(self.build_combined_request(paper_content))
+            sections = self.parse_combined_response(text)
+            logger.info(f"合并请求生成 {len(sections)}/{len(SECTIONS)} 个部分")
+            return sections
         except Exception as e:
-            raise SummaryGenerationError(f"技术细节生成失败: {str(e)}")
-    
+            raise SummaryGenerationError(f"合并摘要生成失败: {str(e)}")
+
+    def _report_sections(self, sections: Dict[str, str], on_progress: Optional[ProgressCallback]):
+        # 合并请求的输出是JSON，无法逐部分流式回调，解析后一次性回调并按长度截断
+        for section, text in sections.items():
+            sections[section] = clip_text(text, self.max_section_chars)
+            if on_progress:
+                on_progress(section, sections[section])
+
+    @staticmethod
+    def build_paper_content(paper: Paper) -> str:
+        """
+        构建提示词中的论文内容
+        :param paper: 论文信息
+        :return: 论文内容
+        """
+        return f"""
+            标题: {paper.title}
+            作者: {paper.authors_text}
+            摘要: {paper.summary}
+            """
+
     @error_handler
-    def generate_comprehensive_summary(self, paper: Dict[str, Any]) -> Dict[str, str]:
+    def generate_comprehensive_summary(self, paper: Paper, content: Optional[str] = None,
+                                       on_progress: Optional[ProgressCallback] = None) -> Dict[str, str]:
         """
         生成完整的论文摘要
         :param paper: 论文信息
+        :param content: 提示词中的论文内容，为 None 时使用标题、作者和摘要
+        :param on_progress: 流式模式下的进度回调，参数为部分名称和目前已生成的文本
         :return: 包含各种摘要的字典
         """
         try:
-            content = f"""
-            标题: {paper['title']}
-            作者: {', '.join(paper['authors'])}
-            摘要: {paper['summary']}
-            """
-            
-            return {
-                'summary': self.generate_summary(content),
-                'highlights': self.generate_highlights(content),
-                'implications': self.generate_implications(content),
-                'technical_details': self.generate_technical_details(content)
+            content = content or self.build_paper_content(paper)
+            section_generators = {
+                'summary': self.generate_summary,
+                'highlights': self.generate_highlights,
+                'implications': self.generate_implications,
+                'technical_details': self.generate_technical_details
             }
+
+            result: Dict[str, str] = {}
+            if self.summary_mode == 'combined':
+                try:
+                    result = self.generate_combined(content)
+                except SummaryGenerationError as e:
+                    logger.warning(f"合并请求失败，改为逐部分生成: {str(e)}")
+                self._report_sections(result, on_progress)
+
+            # 缺失或格式错误的部分逐个补齐
+            for section in SECTIONS:
+                if section not in result:
+                    on_text = partial(on_progress, section) if on_progress else None
+                    result[section] = section_generators[section](content, on_text)
+            return {section: result[section] for section in SECTIONS}
+        except Exception as e:
+            raise SummaryGenerationError(f"完整摘要生成失败: {str(e)}")
+
+
+class AsyncSummaryGenerator(SummaryGenerator):
+    """
+    基于 AsyncOpenAI 的摘要生成器
+    所有请求在一个后台事件循环中并发执行，并受全局并发上限约束；
+    同步方法作为外观保留，可在任意线程中直接调用。
+    """
+
+    def __init__(self, max_concurrency: Optional[int] = None):
+        super().__init__(max_concurrency)
+
+        # 后台事件循环在第一次请求时启动
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._loop_lock = threading.Lock()
+
+    def create_client(self):
+        # 客户端首次在后台事件循环内被访问时创建
+        from openai import AsyncOpenAI
+        return AsyncOpenAI(
+            api_key=config.get('openai', 'api_key'),
+            base_url=config.get('openai', 'base_url'),
+            timeout=config.get('openai', 'timeout'),
+            max_retries=0
+        )
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._loop.run_forever, name="summary-generator-loop",
+                                                daemon=True)
+                self._thread.start()
+            return self._loop
+
+    def _run(self, coro):
+        """
+        在后台事件循环中执行协程并等待结果
+        :param coro: 协程
+        :return: 协程结果
+        """
+        return asyncio.run_coroutine_threadsafe(coro, self._ensure_loop()).result()
+
+    def close(self):
+        """
+        关闭客户端并停止后台事件循环
+        """
+        if self._loop is None or self._loop.is_closed():
+            return
+        if self._client is not None:
+            self._run(self._client.close())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+    @staticmethod
+    async def _offload(func: Callable[..., Any], *args: Any) -> Any:
+        """
+        在线程池中执行阻塞调用（如SQLite缓存读写），避免阻塞事件循环中的其他请求
+        """
+        return await asyncio.get_running_loop().run_in_executor(None, partial(func, *args))
+
+    async def _acomplete(self, request: Dict[str, Any], on_text: Optional[Callable[[str], None]] = None,
+                         max_chars: Optional[int] = None) -> str:
+        key = self.cache.make_key(request) if self.cache else None
+        if key:
+            cached = await self._offload(self.cache.get, key)
+            if cached is not None:
+                metrics.add('llm_cache_hits', model=self.model)
+                cached = clip_text(cached, max_chars)
+                if on_text:
+                    on_text(cached)
+                return cached
+
+        tokens = estimate_request_tokens(request)
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            self.dependency.breaker.check()
+            await self.limiter.aacquire(tokens)
+            try:
+                with metrics.timer('openai.chat_completion'):
+                    if self.stream:
+                        text, usage, headers, complete = await self._astream_completion(request, on_text, max_chars)
+                    else:
+                        raw = await self.client.chat.completions.with_raw_response.create(**request)
+                        response = raw.parse()
+                        text, usage, headers = response.choices[0].message.content, response.usage, raw.headers
+                        complete = True
+            except Exception as e:
+                await asyncio.sleep(self._on_failure(e, tokens, attempt, started))
+                attempt += 1
+                continue
+            self.dependency.breaker.record_success()
+            break
+        full_text = text or ''
+        text = self._finish(None, tokens, full_text, usage, headers, max_chars, complete)
+        if key and complete:
+            await self._offload(self.cache.set, key, full_text)
+        if on_text:
+            # 以截断后的最终文本覆盖流式过程中的中间结果
+            on_text(text)
+        return text
+
+    async def _astream_completion(self, request: Dict[str, Any], on_text: Optional[Callable[[str], None]],
+                                  max_chars: Optional[int]) -> Tuple[str, Any, Any, bool]:
+        """
+        异步版本的 _stream_completion
+        :return: (文本, 用量, 响应头, 是否完整生成)，提前结束时第四项为 False
+        """
+        client = self.client
+        started = time.perf_counter()
+        raw = await client.chat.completions.with_raw_response.create(**request, **self.stream_kwargs())
+        stream = raw.parse()
+        text, usage, complete = '', None, True
+        try:
+            async for chunk in stream:
+                usage = chunk.usage or usage
+                text, changed = self._on_chunk(chunk, text, started)
+                if not changed:
+                    continue
+                if on_text:
+                    on_text(text)
+                if max_chars and len(text) >= max_chars:
+                    metrics.add('llm_stream_early_stops', model=self.model)
+                    complete = False
+                    break
+        finally:
+            await stream.close()
+        return text, usage, raw.headers, complete
+
+    def _complete(self, request: Dict[str, Any], on_text: Optional[Callable[[str], None]] = None,
+                  max_chars: Optional[int] = None) -> str:
+        return self._run(self._acomplete(request, on_text, max_chars))
+
+    async def agenerate_section(self, section: str, paper_content: str,
+                                on_text: Optional[Callable[[str], None]] = None) -> str:
+        """
+        异步生成单个部分
+        :param section: 部分名称
+        :param paper_content: 论文内容
+        :param on_text: 流式模式下的进度回调
+        :return: 生成的内容
+        """
+        spec = SECTION_PROMPTS[section]
+        try:
+            text = await self._acomplete(self.build_section_request(section, paper_content), on_text,
+                                         self.max_section_chars)
+            logger.info(f"成功生成{spec['label']}")
+            return text
+        except Exception as e:
+            raise SummaryGenerationError(f"{spec['error']}: {str(e)}")
+
+    async def agenerate_combined(self, paper_content: str) -> Dict[str, str]:
+        """
+        异步通过一次结构化请求生成全部部分
+        :param paper_content: 论文内容
+        :return: 解析成功的部分
+        """
+        try:
+            text = await self._acomplete(self.build_combined_request(paper_content))
+            sections = self.parse_combined_response(text)
+            logger.info(f"合并请求生成 {len(sections)}/{len(SECTIONS)} 个部分")
+            return sections
+        except Exception as e:
+            raise SummaryGenerationError(f"合并摘要生成失败: {str(e)}")
+
+    async def agenerate_comprehensive_summary(self, paper: Paper, content: Optional[str] = None,
+                                              on_progress: Optional[ProgressCallback] = None) -> Dict[str, str]:
+        """
+        异步生成完整的论文摘要，各部分并发请求
+        :param paper: 论文信息
+        :param content: 提示词中的论文内容，为 None 时使用标题、作者和摘要
+        :param on_progress: 流式模式下的进度回调，参数为部分名称和目前已生成的文本
+        :return: 包含各种摘要的字典
+        """
+        try:
+            content = content or self.build_paper_content(paper)
+
+            result: Dict[str, str] = {}
+            if self.summary_mode == 'combined':
+                try:
+                    result = await self.agenerate_combined(content)
+                except SummaryGenerationError as e:
+                    logger.warning(f"合并请求失败，改为逐部分生成: {str(e)}")
+                self._report_sections(result, on_progress)
+
+            missing = [section for section in SECTIONS if section not in result]
+            texts = await asyncio.gather(*(
+                self.agenerate_section(section, content, partial(on_progress, section) if on_progress else None)
+                for section in missing
+            ))
+            result.update(zip(missing, texts))
+            return {section: result[section] for section in SECTIONS}
         except Exception as e:
-            raise SummaryGenerationError(f"完整摘要生成失败: {str(e)}") 
\ No newline at end of file
+            log_once(e, f"摘要生成错误: 完整摘要生成失败: {str(e)}")
+            raise SummaryGenerationError(f"完整摘要生成失败: {str(e)}") from e
+
+    async def agenerate_batch(self, papers: List[Paper]) -> List[Union[Dict[str, str], Exception]]:
+        """
+        异步并发生成多篇论文的摘要
+        :param papers: 论文列表
+        :return: 与论文一一对应的摘要字典，失败的论文对应异常对象
+        """
+        return await asyncio.gather(
+            *(self.agenerate_comprehensive_summary(paper) for paper in papers),
+            return_exceptions=True
+        )
+
+    def generate_comprehensive_summary(self, paper: Paper, content: Optional[str] = None,
+                                       on_progress: Optional[ProgressCallback] = None) -> Dict[str, str]:
+        """
+        生成完整的论文摘要（同步外观）
+        :param paper: 论文信息
+        :param content: 提示词中的论文内容，为 None 时使用标题、作者和摘要
+        :param on_progress: 流式模式下的进度回调，在后台事件循环线程中调用
+        :return: 包含各种摘要的字典
+        """
+        with metrics.timer('AsyncSummaryGenerator.generate_comprehensive_summary'):
+            return self._run(self.agenerate_comprehensive_summary(paper, content, on_progress))
+
+    def generate_batch(self, papers: List[Paper]) -> List[Union[Dict[str, str], Exception]]:
+        """
+        并发生成多篇论文的摘要（同步外观）
+        :param papers: 论文列表
+        :return: 与论文一一对应的摘要字典，失败的论文对应异常对象
+        """
+        return self._run(self.agenerate_batch(papers))
@@ -1,13 +1,49 @@
-from .logger import Logger
-from .error_handler import error_handler, ZakaError, PaperCrawlError, SummaryGenerationError, ContentFormatError
+from .logger import Logger, setup_logging, shutdown_logging
+from .error_handler import error_handler, log_once, ZakaError, PaperCrawlError, SummaryGenerationError, ContentFormatError, PaperSelectionError, CircuitOpenError
 from .config import Config
+from .metrics import MetricsRegistry, metrics
+from .llm_cache import LLMCache
+from .paper_index import PaperIndex, split_arxiv_id
+from .metadata_cache import MetadataCache
+from .rate_limiter import AdaptiveRateLimiter, IntervalLimiter, shared_limiter
+from .page_cache import PageCache
+from .run_manifest import RunManifest, atomic_open, atomic_write
+from .work_queue import WorkQueue
+from .output_manifest import OutputManifest
+from .resilience import CircuitBreaker, Dependency, RetryPolicy, dependency, find_cause, is_transient
 
 __all__ = [
     'Logger',
+    'setup_logging',
+    'shutdown_logging',
     'error_handler',
+    'log_once',
     'ZakaError',
     'PaperCrawlError',
     'SummaryGenerationError',
     'ContentFormatError',
-    'Config'
+    'PaperSelectionError',
+    'CircuitOpenError',
+    'Config',
+    'MetricsRegistry',
+    'metrics',
+    'LLMCache',
+    'PaperIndex',
+    'split_arxiv_id',
+    'MetadataCache',
+    'AdaptiveRateLimiter',
+    'IntervalLimiter',
+    'shared_limiter',
+    'PageCache',
+    'RunManifest',
+    'atomic_open',
+    'atomic_write',
+    'WorkQueue',
+    'OutputManifest',
+    'RetryPolicy',
+    'CircuitBreaker',
+    'Dependency',
+    'dependency',
+    'find_cause',
+    'is_transient'
 ] 
\ No newline at end of file
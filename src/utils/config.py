@@ -1,28 +1,174 @@
+import json
 import os
 from dotenv import load_dotenv
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
 class Config:
     def __init__(self):
+        self._config: Optional[Dict[str, Any]] = None
+    
+    @property
+    def config(self) -> Dict[str, Any]:
+        # 首次读取时才加载 .env 和环境变量，导入模块时没有副作用
+        if self._config is None:
+            self._config = self._load()
+        return self._config
+    
+    @staticmethod
+    def _load() -> Dict[str, Any]:
         load_dotenv()
-        self.config: Dict[str, Any] = {
+        return {
             'openai': {
                 'api_key': os.getenv('OPENAI_API_KEY'),
+                'base_url': os.getenv('OPENAI_BASE_URL') or None,
                 'model': os.getenv('OPENAI_MODEL', 'gpt-3.5-turbo'),
                 'temperature': float(os.getenv('TEMPERATURE', '0.7')),
-                'max_tokens': int(os.getenv('SUMMARY_LENGTH', '1000'))
+                'max_tokens': int(os.getenv('SUMMARY_LENGTH', '1000')),
+                'summary_mode': os.getenv('SUMMARY_MODE', 'combined').lower(),
+                'async_enabled': os.getenv('OPENAI_ASYNC', 'false').lower() == 'true',
+                'max_concurrency': int(os.getenv('OPENAI_MAX_CONCURRENCY', '8')),
+                'rpm_limit': float(os.getenv('OPENAI_RPM_LIMIT', '500')),
+                'tpm_limit': float(os.getenv('OPENAI_TPM_LIMIT', '200000')),
+                'timeout': float(os.getenv('OPENAI_TIMEOUT', '60')),
+                'batch_enabled': os.getenv('OPENAI_BATCH_ENABLED', 'false').lower() == 'true',
+                'batch_dir': os.getenv('OPENAI_BATCH_DIR', 'cache/batches'),
+                'batch_poll_seconds': float(os.getenv('OPENAI_BATCH_POLL_SECONDS', '30')),
+                'batch_timeout_hours': float(os.getenv('OPENAI_BATCH_TIMEOUT_HOURS', '24')),
+                'stream_enabled': os.getenv('OPENAI_STREAM_ENABLED', 'false').lower() == 'true',
+                # 单个部分的最大字符数，流式生成达到后提前结束，0 表示不限制
+                'max_section_chars': int(os.getenv('OPENAI_MAX_SECTION_CHARS', '0')) or None
+            },
+            'cache': {
+                'enabled': os.getenv('LLM_CACHE_ENABLED', 'true').lower() == 'true',
+                'path': os.getenv('LLM_CACHE_PATH', 'cache/llm_cache.sqlite3'),
+                'ttl_days': float(os.getenv('LLM_CACHE_TTL_DAYS', '30')),
+                'max_mb': float(os.getenv('LLM_CACHE_MAX_MB', '256')),
+                'bypass': os.getenv('LLM_CACHE_BYPASS', 'false').lower() == 'true'
             },
             'crawler': {
+                'api_url': os.getenv('ARXIV_API_URL', 'http://export.arxiv.org/api/query'),
                 'max_papers_per_day': int(os.getenv('MAX_PAPERS_PER_DAY', '5')),
-                'days_to_crawl': int(os.getenv('DAYS_TO_CRAWL', '7'))
+                'days_to_crawl': int(os.getenv('DAYS_TO_CRAWL', '7')),
+                'max_candidates': int(os.getenv('MAX_CANDIDATES', '50')),
+                'page_size': int(os.getenv('ARXIV_PAGE_SIZE', '100')),
+                'id_batch_size': int(os.getenv('ARXIV_ID_BATCH_SIZE', '100')),
+                'delay_seconds': float(os.getenv('ARXIV_DELAY_SECONDS', '3')),
+                'metadata_cache_enabled': os.getenv('METADATA_CACHE_ENABLED', 'true').lower() == 'true',
+                'metadata_cache_path': os.getenv('METADATA_CACHE_PATH', 'cache/metadata.sqlite3'),
+                'metadata_cache_ttl_days': float(os.getenv('METADATA_CACHE_TTL_DAYS', '7')),
+                'page_cache_enabled': os.getenv('ARXIV_PAGE_CACHE_ENABLED', 'true').lower() == 'true',
+                'page_cache_path': os.getenv('ARXIV_PAGE_CACHE_PATH', 'cache/arxiv_pages.sqlite3'),
+                'page_cache_ttl_minutes': float(os.getenv('ARXIV_PAGE_CACHE_TTL_MINUTES', '60')),
+                # 订阅的查询（名称到arXiv查询条件），为空时只按任务的 query 爬取
+                'feeds': json.loads(os.getenv('ARXIV_FEEDS') or '{}'),
+                'feed_workers': int(os.getenv('ARXIV_FEED_WORKERS', '4'))
+            },
+            'index': {
+                'enabled': os.getenv('PAPER_INDEX_ENABLED', 'true').lower() == 'true',
+                'path': os.getenv('PAPER_INDEX_PATH', 'state/paper_index.sqlite3'),
+                'overlap_hours': float(os.getenv('PAPER_INDEX_OVERLAP_HOURS', '48'))
+            },
+            'manifest': {
+                'enabled': os.getenv('RUN_MANIFEST_ENABLED', 'true').lower() == 'true',
+                'dir': os.getenv('RUN_MANIFEST_DIR', 'state/runs')
+            },
+            'queue': {
+                'path': os.getenv('WORK_QUEUE_PATH', 'state/work_queue.sqlite3'),
+                # WAL依赖共享内存，多台主机通过共享文件系统访问队列时应设为 delete
+                'journal_mode': os.getenv('WORK_QUEUE_JOURNAL_MODE', 'wal'),
+                'lease_seconds': float(os.getenv('WORK_QUEUE_LEASE_SECONDS', '300')),
+                'heartbeat_seconds': float(os.getenv('WORK_QUEUE_HEARTBEAT_SECONDS', '60')),
+                'poll_seconds': float(os.getenv('WORK_QUEUE_POLL_SECONDS', '5')),
+                'max_attempts': int(os.getenv('WORK_QUEUE_MAX_ATTEMPTS', '3')),
+                'worker_threads': int(os.getenv('WORKER_THREADS', '1'))
+            },
+            'pipeline': {
+                'enabled': os.getenv('PIPELINE_ENABLED', 'true').lower() == 'true',
+                'stages': [s.strip() for s in os.getenv('PIPELINE_STAGES', 'summarize,format,download').split(',') if s.strip()],
+                'workers': {
+                    'summarize': int(os.getenv('SUMMARIZE_WORKERS', '4')),
+                    'format': int(os.getenv('FORMAT_WORKERS', '2')),
+                    'download': int(os.getenv('DOWNLOAD_WORKERS', '4'))
+                }
+            },
+            'download': {
+                'max_concurrency': int(os.getenv('DOWNLOAD_MAX_CONCURRENCY', '4')),
+                'timeout': float(os.getenv('DOWNLOAD_TIMEOUT', '60'))
+            },
+            # 各外部依赖的重试策略与熔断器：只重试瞬时错误，重试次数或总耗时预算用尽即放弃；
+            # 连续 breaker_failures 次瞬时错误后熔断，breaker_reset_seconds 秒内其余请求立即失败
+            'resilience': {
+                'openai': {
+                    'max_retries': int(os.getenv('OPENAI_MAX_RETRIES', '5')),
+                    'backoff_base': float(os.getenv('OPENAI_BACKOFF_BASE', '1')),
+                    'backoff_max': float(os.getenv('OPENAI_BACKOFF_MAX', '60')),
+                    'deadline_seconds': float(os.getenv('OPENAI_RETRY_DEADLINE_SECONDS', '300')),
+                    'breaker_failures': int(os.getenv('OPENAI_BREAKER_FAILURES', '5')),
+                    'breaker_reset_seconds': float(os.getenv('OPENAI_BREAKER_RESET_SECONDS', '120'))
+                },
+                'arxiv': {
+                    'max_retries': int(os.getenv('ARXIV_MAX_RETRIES', '3')),
+                    'backoff_base': float(os.getenv('ARXIV_BACKOFF_BASE', '3')),
+                    'backoff_max': float(os.getenv('ARXIV_BACKOFF_MAX', '60')),
+                    'deadline_seconds': float(os.getenv('ARXIV_RETRY_DEADLINE_SECONDS', '120')),
+                    'breaker_failures': int(os.getenv('ARXIV_BREAKER_FAILURES', '5')),
+                    'breaker_reset_seconds': float(os.getenv('ARXIV_BREAKER_RESET_SECONDS', '300'))
+                },
+                'pdf': {
+                    'max_retries': int(os.getenv('DOWNLOAD_RETRIES', '3')),
+                    'backoff_base': float(os.getenv('DOWNLOAD_BACKOFF_BASE', '1')),
+                    'backoff_max': float(os.getenv('DOWNLOAD_BACKOFF_MAX', '30')),
+                    'deadline_seconds': float(os.getenv('DOWNLOAD_RETRY_DEADLINE_SECONDS', '300')),
+                    'breaker_failures': int(os.getenv('DOWNLOAD_BREAKER_FAILURES', '5')),
+                    'breaker_reset_seconds': float(os.getenv('DOWNLOAD_BREAKER_RESET_SECONDS', '120'))
+                }
+            },
+            'selector': {
+                'enabled': os.getenv('SELECTOR_ENABLED', 'false').lower() == 'true',
+                # JSON对象，画像名称到关键词或代表性摘要的映射
+                'profiles': json.loads(os.getenv('SELECTOR_PROFILES') or '{}'),
+                'dim': int(os.getenv('SELECTOR_DIM', '2048')),
+                'duplicate_threshold': float(os.getenv('SELECTOR_DUPLICATE_THRESHOLD', '0.85')),
+                'min_score': float(os.getenv('SELECTOR_MIN_SCORE', '0')),
+                'history_path': os.getenv('SELECTOR_HISTORY_PATH', 'state/selector_history'),
+                'history_size': int(os.getenv('SELECTOR_HISTORY_SIZE', '10000'))
+            },
+            'fulltext': {
+                'enabled': os.getenv('FULLTEXT_ENABLED', 'false').lower() == 'true',
+                'chunk_tokens': int(os.getenv('FULLTEXT_CHUNK_TOKENS', '3000')),
+                'max_chunks': int(os.getenv('FULLTEXT_MAX_CHUNKS', '20')),
+                'note_tokens': int(os.getenv('FULLTEXT_NOTE_TOKENS', '400')),
+                'reduce_tokens': int(os.getenv('FULLTEXT_REDUCE_TOKENS', '6000')),
+                'workers': int(os.getenv('FULLTEXT_MAP_WORKERS', '4'))
             },
             'schedule': {
-                'time': os.getenv('SCHEDULE_TIME', '10:00')
+                'time': os.getenv('SCHEDULE_TIME', '10:00'),
+                # JSON数组，每项包含 name、time，可选 query、max_papers、days
+                'jobs': json.loads(os.getenv('SCHEDULE_JOBS') or '[]'),
+                'state_path': os.getenv('SCHEDULE_STATE_PATH', 'state/schedule.json'),
+                'catch_up': os.getenv('SCHEDULE_CATCH_UP', 'true').lower() == 'true',
+                'run_on_start': os.getenv('SCHEDULE_RUN_ON_START', 'false').lower() == 'true',
+                'max_concurrent_jobs': int(os.getenv('SCHEDULE_MAX_CONCURRENT_JOBS', '0')) or None
+            },
+            'metrics': {
+                'enabled': os.getenv('METRICS_ENABLED', 'true').lower() == 'true',
+                'dir': os.getenv('METRICS_DIR', 'metrics')
+            },
+            'logging': {
+                'dir': os.getenv('LOG_DIR', 'logs'),
+                'level': os.getenv('LOG_LEVEL', 'INFO'),
+                'json': os.getenv('LOG_JSON', 'false').lower() == 'true'
             },
             'output': {
                 'dir': os.getenv('OUTPUT_DIR', 'output'),
                 'wechat_template': os.getenv('WECHAT_TEMPLATE', 'templates/wechat.md'),
-                'xiaohongshu_template': os.getenv('XIAOHONGSHU_TEMPLATE', 'templates/xiaohongshu.md')
+                'xiaohongshu_template': os.getenv('XIAOHONGSHU_TEMPLATE', 'templates/xiaohongshu.md'),
+                'platforms': [p.strip() for p in os.getenv('OUTPUT_PLATFORMS', 'wechat,xiaohongshu').split(',') if p.strip()],
+                'template_cache_dir': os.getenv('TEMPLATE_CACHE_DIR', 'cache/templates'),
+                # 流式生成时的草稿目录，为空时使用 <OUTPUT_DIR>/drafts
+                'draft_dir': os.getenv('OUTPUT_DRAFT_DIR') or None,
+                # 输出文件清单（内容哈希、模板哈希与渲染上下文），为空时使用 <OUTPUT_DIR>/.manifest.sqlite3
+                'manifest_path': os.getenv('OUTPUT_MANIFEST_PATH') or None
             }
         }
     
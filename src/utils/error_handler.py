@@ -1,6 +1,8 @@
+import time
 from typing import Callable, Any
 from functools import wraps
 from .logger import Logger
+from .metrics import metrics
 
 logger = Logger()
 
@@ -20,26 +22,83 @@ class ContentFormatError(ZakaError):
     """内容格式化错误"""
     pass
 
+class PaperSelectionError(ZakaError):
+    """论文筛选错误"""
+    pass
+
+class CircuitOpenError(ZakaError):
+    """外部依赖熔断中，请求未发出即失败"""
+
+    def __init__(self, dependency: str, retry_in: float):
+        super().__init__(f"{dependency} 熔断中，{retry_in:.0f}秒后重试")
+        self.dependency = dependency
+        self.retry_in = retry_in
+
+def _already_logged(error: BaseException) -> bool:
+    """
+    异常本身或其包装链中的任一异常已被记录过；
+    熔断导致的失败同样视为已记录：熔断器断开时已记录一次，暂存论文的调用方会再说明去向
+    """
+    seen = set()
+    while error is not None and id(error) not in seen:
+        if getattr(error, '_zaka_logged', False) or isinstance(error, CircuitOpenError):
+            return True
+        seen.add(id(error))
+        error = error.__cause__ or error.__context__
+    return False
+
+def log_once(error: BaseException, message: str) -> bool:
+    """
+    记录异常，同一个失败被逐层包装、经过多层装饰器时只记录最内层的一次；
+    包装后重新抛出时应使用 raise ... from error，外层才能沿异常链识别出已记录
+    :param error: 异常
+    :param message: 日志内容
+    :return: 本次是否记录了日志
+    """
+    if _already_logged(error):
+        return False
+    logger.error(message)
+    try:
+        error._zaka_logged = True
+    except AttributeError:
+        pass
+    return True
+
 def error_handler(func: Callable) -> Callable:
     """
-    错误处理装饰器
+    错误处理装饰器，同时以函数限定名记录调用耗时与成败
+    每个失败只在最先捕获它的一层记录日志，外层包装后的异常不再重复记录
     :param func: 被装饰的函数
     :return: 装饰后的函数
     """
     @wraps(func)
     def wrapper(*args, **kwargs) -> Any:
+        started = time.perf_counter()
+        success = False
         try:
-            return func(*args, **kwargs)
+            result = func(*args, **kwargs)
+            success = True
+            return result
+        except CircuitOpenError:
+            raise
         except PaperCrawlError as e:
-            logger.error(f"论文爬取错误: {str(e)}")
+            log_once(e, f"论文爬取错误: {str(e)}")
             raise
         except SummaryGenerationError as e:
-            logger.error(f"摘要生成错误: {str(e)}")
+            log_once(e, f"摘要生成错误: {str(e)}")
             raise
         except ContentFormatError as e:
-            logger.error(f"内容格式化错误: {str(e)}")
+            log_once(e, f"内容格式化错误: {str(e)}")
+            raise
+        except PaperSelectionError as e:
+            log_once(e, f"论文筛选错误: {str(e)}")
+            raise
+        except ZakaError as e:
+            log_once(e, f"错误: {str(e)}")
             raise
         except Exception as e:
-            logger.error(f"未知错误: {str(e)}")
-            raise ZakaError(f"未知错误: {str(e)}")
+            log_once(e, f"未知错误: {str(e)}")
+            raise ZakaError(f"未知错误: {str(e)}") from e
+        finally:
+            metrics.record_call(func.__qualname__, time.perf_counter() - started, success)
     return wrapper 
\ No newline at end of file
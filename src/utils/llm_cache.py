@@ -0,0 +1,143 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+from .logger import Logger
+
+logger = Logger()
+
+
+class LLMCache:
+    """
+    基于SQLite的LLM响应缓存
+    以请求内容（模型、提示词、温度、max_tokens等）的哈希为键，
+    支持TTL过期、按总大小的LRU淘汰、命中统计以及绕过读取。
+    """
+
+    def __init__(self, path: str, ttl_seconds: float = 30 * 86400,
+                 max_bytes: int = 256 * 1024 * 1024, bypass: bool = False):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.bypass = bypass
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_accessed ON llm_cache (accessed_at)")
+        self._conn.commit()
+        self.evict()
+
+    @staticmethod
+    def make_key(request: Dict[str, Any]) -> str:
+        """
+        计算请求的缓存键
+        :param request: chat.completions.create 的参数
+        :return: 十六进制哈希
+        """
+        payload = json.dumps(request, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        读取缓存
+        :param key: 缓存键
+        :return: 缓存的响应文本，未命中、已过期或绕过时返回 None
+        """
+        if self.bypass:
+            return None
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or now - row[1] > self.ttl_seconds:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def set(self, key: str, value: str):
+        """
+        写入缓存，超出容量时按最近访问时间淘汰
+        :param key: 缓存键
+        :param value: 响应文本
+        """
+        if value is None:
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, size, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, value, len(value.encode('utf-8')), now, now)
+            )
+            self._conn.commit()
+            self.writes += 1
+        if self.writes % 100 == 0:
+            self.evict()
+
+    def evict(self) -> int:
+        """
+        删除过期条目，并按LRU淘汰到容量以内
+        :return: 删除的条目数
+        """
+        with self._lock:
+            removed = self._conn.execute(
+                "DELETE FROM llm_cache WHERE created_at < ?", (time.time() - self.ttl_seconds,)
+            ).rowcount
+            total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache").fetchone()[0]
+            while total > self.max_bytes:
+                rows = self._conn.execute(
+                    "SELECT key, size FROM llm_cache ORDER BY accessed_at LIMIT 100"
+                ).fetchall()
+                if not rows:
+                    break
+                for key, size in rows:
+                    self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                    removed += 1
+                    total -= size
+                    if total <= self.max_bytes:
+                        break
+            self._conn.commit()
+        if removed:
+            logger.info(f"LLM缓存淘汰 {removed} 条记录")
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        获取缓存统计
+        :return: 命中、未命中、写入次数及当前条目数
+        """
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'writes': self.writes,
+            'entries': entries,
+            'hit_rate': self.hits / lookups if lookups else 0.0
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -1,42 +1,141 @@
+import atexit
+import json
 import logging
 import os
+import queue
+import threading
 from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional, Set
+from .config import Config
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+_setup_lock = threading.Lock()
+_queue: Optional[queue.Queue] = None
+_listener: Optional[QueueListener] = None
+_configured: Set[str] = set()
+
+
+class DailyFileHandler(logging.FileHandler):
+    """按日期切换文件的处理器，日志写入 <目录>/<YYYY-MM-DD><后缀>"""
+
+    def __init__(self, log_dir: str, suffix: str = '.log'):
+        self.log_dir = log_dir
+        self.suffix = suffix
+        self.current_date = datetime.now().strftime('%Y-%m-%d')
+        os.makedirs(log_dir, exist_ok=True)
+        super().__init__(self._path(self.current_date), encoding='utf-8', delay=True)
+
+    def _path(self, date: str) -> str:
+        return os.path.join(self.log_dir, f"{date}{self.suffix}")
+
+    def emit(self, record: logging.LogRecord):
+        date = datetime.fromtimestamp(record.created).strftime('%Y-%m-%d')
+        if date != self.current_date:
+            self.acquire()
+            try:
+                if self.stream:
+                    self.stream.close()
+                    self.stream = None
+                self.current_date = date
+                self.baseFilename = os.path.abspath(self._path(date))
+            finally:
+                self.release()
+        super().emit(record)
+
+
+class JsonFormatter(logging.Formatter):
+    """输出单行JSON，便于日志采集"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'time': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'thread': record.threadName,
+            'message': record.getMessage()
+        }
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+def _start_listener(config: Config) -> queue.Queue:
+    global _queue, _listener
+    formatter = logging.Formatter(LOG_FORMAT)
+    log_dir = config.get('logging', 'dir')
+
+    console_handler = logging.StreamHandler()
+    console_handler.setFormatter(formatter)
+    file_handler = DailyFileHandler(log_dir)
+    file_handler.setFormatter(formatter)
+    handlers = [console_handler, file_handler]
+    if config.get('logging', 'json'):
+        json_handler = DailyFileHandler(log_dir, suffix='.jsonl')
+        json_handler.setFormatter(JsonFormatter())
+        handlers.append(json_handler)
+
+    _queue = queue.Queue(-1)
+    _listener = QueueListener(_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+    return _queue
+
+
+def setup_logging(name: str = "zaka_media_push") -> logging.Logger:
+    """
+    为指定日志器挂载进程内唯一的队列处理器，重复调用不会重复添加
+    文件写入在后台监听线程中完成，不阻塞调用方
+    :param name: 日志器名称
+    :return: 日志器
+    """
+    logger = logging.getLogger(name)
+    with _setup_lock:
+        if name in _configured:
+            return logger
+        config = Config()
+        log_queue = _queue or _start_listener(config)
+        logger.setLevel(getattr(logging, config.get('logging', 'level').upper(), logging.INFO))
+        logger.addHandler(QueueHandler(log_queue))
+        logger.propagate = False
+        _configured.add(name)
+    return logger
+
+
+def shutdown_logging():
+    """
+    停止后台监听线程并刷新所有待写日志
+    """
+    global _listener
+    with _setup_lock:
+        if _listener is not None:
+            _listener.stop()
+            for handler in _listener.handlers:
+                handler.close()
+            _listener = None
+
 
 class Logger:
     def __init__(self, name="zaka_media_push"):
-        self.logger = logging.getLogger(name)
-        self.logger.setLevel(logging.INFO)
-        
-        # 创建日志目录
-        log_dir = "logs"
-        os.makedirs(log_dir, exist_ok=True)
-        
-        # 创建文件处理器
-        log_file = os.path.join(log_dir, f"{datetime.now().strftime('%Y-%m-%d')}.log")
-        file_handler = logging.FileHandler(log_file, encoding='utf-8')
-        file_handler.setLevel(logging.INFO)
-        
-        # 创建控制台处理器
-        console_handler = logging.StreamHandler()
-        console_handler.setLevel(logging.INFO)
-        
-        # 设置日志格式
-        formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-        file_handler.setFormatter(formatter)
-        console_handler.setFormatter(formatter)
-        
-        # 添加处理器
-        self.logger.addHandler(file_handler)
-        self.logger.addHandler(console_handler)
-    
+        self.name = name
+        self._logger: Optional[logging.Logger] = None
+
+    @property
+    def logger(self) -> logging.Logger:
+        # 首次写日志时才挂载处理器，模块级创建 Logger 不会创建目录或打开文件
+        if self._logger is None:
+            self._logger = setup_logging(self.name)
+        return self._logger
+
     def info(self, message):
         self.logger.info(message)
-    
+
     def error(self, message):
         self.logger.error(message)
-    
+
     def warning(self, message):
         self.logger.warning(message)
-    
+
     def debug(self, message):
-        self.logger.debug(message) 
\ No newline at end of file
+        self.logger.debug(message)
@@ -0,0 +1,93 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Tuple
+from .paper_index import split_arxiv_id
+
+# SQLite 单条语句的参数上限较保守，批量查询时按此大小分块
+_QUERY_CHUNK = 500
+
+
+class MetadataCache:
+    """
+    arXiv论文元数据本地缓存
+    以不含版本的arXiv ID为键保存最新版本的序列化记录；
+    查询带版本的ID时只有版本一致才算命中。
+    """
+
+    def __init__(self, path: str, ttl_seconds: float = 7 * 86400):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS paper_metadata ("
+            " base_id TEXT PRIMARY KEY,"
+            " version INTEGER NOT NULL,"
+            " data TEXT NOT NULL,"
+            " fetched_at REAL NOT NULL"
+            ") WITHOUT ROWID"
+        )
+        self._conn.commit()
+
+    def get_many(self, arxiv_ids: Iterable[str]) -> Dict[str, str]:
+        """
+        批量读取缓存
+        :param arxiv_ids: arXiv ID，可带版本号
+        :return: 命中的ID到序列化记录的映射
+        """
+        requested: List[Tuple[str, str, bool]] = []
+        for arxiv_id in arxiv_ids:
+            base_id, _ = split_arxiv_id(arxiv_id)
+            requested.append((arxiv_id, base_id, base_id != arxiv_id))
+
+        rows: Dict[str, Tuple[int, str]] = {}
+        expires_before = time.time() - self.ttl_seconds
+        base_ids = list(dict.fromkeys(base_id for _, base_id, _ in requested))
+        with self._lock:
+            for start in range(0, len(base_ids), _QUERY_CHUNK):
+                chunk = base_ids[start:start + _QUERY_CHUNK]
+                placeholders = ','.join('?' * len(chunk))
+                for base_id, version, data in self._conn.execute(
+                    f"SELECT base_id, version, data FROM paper_metadata "
+                    f"WHERE base_id IN ({placeholders}) AND fetched_at >= ?", chunk + [expires_before]
+                ):
+                    rows[base_id] = (version, data)
+
+        hits: Dict[str, str] = {}
+        for arxiv_id, base_id, versioned in requested:
+            if base_id not in rows:
+                continue
+            version, data = rows[base_id]
+            if not versioned or split_arxiv_id(arxiv_id)[1] == version:
+                hits[arxiv_id] = data
+        return hits
+
+    def put_many(self, records: Iterable[Tuple[str, str]]):
+        """
+        批量写入缓存，已有更新版本的记录不会被旧版本覆盖
+        :param records: (带版本的arXiv ID, 序列化记录)
+        """
+        now = time.time()
+        rows = [split_arxiv_id(arxiv_id) + (data, now) for arxiv_id, data in records]
+        if not rows:
+            return
+        with self._lock:
+            self._conn.executemany(
+                "INSERT INTO paper_metadata (base_id, version, data, fetched_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(base_id) DO UPDATE SET "
+                " version = excluded.version, data = excluded.data, fetched_at = excluded.fetched_at "
+                "WHERE excluded.version >= paper_metadata.version",
+                rows
+            )
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,206 @@
+import json
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Tuple
+from .run_manifest import atomic_write
+
+# 每个计时项最多保留的样本数，超出后按蓄水池抽样替换，用于估算分位数
+_MAX_SAMPLES = 10000
+
+_METRIC_NAME_INVALID = re.compile(r'[^a-zA-Z0-9_]')
+
+
+def _percentile(sorted_samples: List[float], q: float) -> float:
+    if not sorted_samples:
+        return 0.0
+    index = min(len(sorted_samples) - 1, int(round(q * (len(sorted_samples) - 1))))
+    return sorted_samples[index]
+
+
+class TimingStat:
+    """单个被测调用的耗时统计"""
+
+    def __init__(self):
+        self.count = 0
+        self.success = 0
+        self.failure = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.samples: List[float] = []
+
+    def add(self, seconds: float, success: bool):
+        self.count += 1
+        if success:
+            self.success += 1
+        else:
+            self.failure += 1
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+        if len(self.samples) < _MAX_SAMPLES:
+            self.samples.append(seconds)
+        else:
+            slot = random.randrange(self.count)
+            if slot < _MAX_SAMPLES:
+                self.samples[slot] = seconds
+
+    def snapshot(self) -> Dict[str, Any]:
+        samples = sorted(self.samples)
+        return {
+            'count': self.count,
+            'success': self.success,
+            'failure': self.failure,
+            'total_seconds': self.total_seconds,
+            'avg_seconds': self.total_seconds / self.count if self.count else 0.0,
+            'max_seconds': self.max_seconds,
+            'p50_seconds': _percentile(samples, 0.5),
+            'p90_seconds': _percentile(samples, 0.9),
+            'p99_seconds': _percentile(samples, 0.99)
+        }
+
+
+class MetricsRegistry:
+    """
+    进程内指标注册表
+    记录各方法的耗时与成败，以及令牌用量等计数器，
+    可导出为JSON报告和Prometheus文本文件。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._timings: Dict[str, TimingStat] = {}
+        self._counters: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float] = {}
+        self.started_at = time.time()
+
+    def reset(self):
+        """
+        清空所有指标，开始新一轮统计
+        """
+        with self._lock:
+            self._timings.clear()
+            self._counters.clear()
+            self.started_at = time.time()
+
+    def record_call(self, name: str, seconds: float, success: bool):
+        """
+        记录一次调用
+        :param name: 调用名称
+        :param seconds: 耗时（秒）
+        :param success: 是否成功
+        """
+        with self._lock:
+            stat = self._timings.get(name)
+            if stat is None:
+                stat = self._timings[name] = TimingStat()
+            stat.add(seconds, success)
+
+    @contextmanager
+    def timer(self, name: str) -> Iterator[None]:
+        """
+        计时上下文，异常时记为失败
+        :param name: 调用名称
+        """
+        started = time.perf_counter()
+        success = False
+        try:
+            yield
+            success = True
+        finally:
+            self.record_call(name, time.perf_counter() - started, success)
+
+    def add(self, name: str, value: float = 1, **labels: Any):
+        """
+        累加计数器
+        :param name: 计数器名称
+        :param value: 增量
+        :param labels: 标签
+        """
+        key = (name, tuple(sorted((k, str(v)) for k, v in labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def record_usage(self, model: str, usage: Any):
+        """
+        记录OpenAI响应中的令牌用量
+        :param model: 模型名称
+        :param usage: 响应的 usage 字段
+        """
+        if usage is None:
+            return
+        self.add('llm_prompt_tokens', getattr(usage, 'prompt_tokens', 0) or 0, model=model)
+        self.add('llm_completion_tokens', getattr(usage, 'completion_tokens', 0) or 0, model=model)
+        self.add('llm_requests', 1, model=model)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        获取当前指标快照
+        :return: 可JSON序列化的字典
+        """
+        with self._lock:
+            timings = {name: stat.snapshot() for name, stat in sorted(self._timings.items())}
+            counters = [
+                {'name': name, 'labels': dict(labels), 'value': value}
+                for (name, labels), value in sorted(self._counters.items())
+            ]
+        return {
+            'started_at': self.started_at,
+            'finished_at': time.time(),
+            'timings': timings,
+            'counters': counters
+        }
+
+    def write_json(self, path: str) -> str:
+        """
+        导出JSON报告
+        :param path: 文件路径
+        :return: 文件路径
+        """
+        atomic_write(path, json.dumps(self.snapshot(), ensure_ascii=False, indent=2))
+        return path
+
+    def to_prometheus(self, prefix: str = 'zaka') -> str:
+        """
+        生成Prometheus文本格式
+        :param prefix: 指标名前缀
+        :return: 文本内容
+        """
+        snapshot = self.snapshot()
+        lines = [
+            f"# HELP {prefix}_call_duration_seconds Duration of instrumented calls.",
+            f"# TYPE {prefix}_call_duration_seconds summary"
+        ]
+        for name, stat in snapshot['timings'].items():
+            label = f'func="{name}"'
+            for q, key in (('0.5', 'p50_seconds'), ('0.9', 'p90_seconds'), ('0.99', 'p99_seconds')):
+                lines.append(f'{prefix}_call_duration_seconds{{{label},quantile="{q}"}} {stat[key]}')
+            lines.append(f"{prefix}_call_duration_seconds_sum{{{label}}} {stat['total_seconds']}")
+            lines.append(f"{prefix}_call_duration_seconds_count{{{label}}} {stat['count']}")
+        lines.append(f"# TYPE {prefix}_calls_total counter")
+        for name, stat in snapshot['timings'].items():
+            lines.append(f'{prefix}_calls_total{{func="{name}",status="success"}} {stat["success"]}')
+            lines.append(f'{prefix}_calls_total{{func="{name}",status="failure"}} {stat["failure"]}')
+
+        typed = set()
+        for counter in snapshot['counters']:
+            metric = f"{prefix}_{_METRIC_NAME_INVALID.sub('_', counter['name'])}_total"
+            if metric not in typed:
+                lines.append(f"# TYPE {metric} counter")
+                typed.add(metric)
+            labels = ','.join(f'{k}="{v}"' for k, v in counter['labels'].items())
+            lines.append(f"{metric}{{{labels}}} {counter['value']}" if labels else f"{metric} {counter['value']}")
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path: str) -> str:
+        """
+        导出Prometheus文本文件（供 node_exporter textfile collector 读取）
+        :param path: 文件路径
+        :return: 文件路径
+        """
+        atomic_write(path, self.to_prometheus())
+        return path
+
+
+# 进程内共享的指标注册表
+metrics = MetricsRegistry()
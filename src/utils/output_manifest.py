@@ -0,0 +1,137 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+
+class OutputManifest:
+    """
+    输出文件清单
+    以不含版本的arXiv ID和平台为键，记录每个输出文件的路径、内容哈希，
+    以及生成它所用的模板哈希和渲染上下文哈希；同时保存每篇论文的渲染上下文和所属日期，
+    模板变化时可以只用已保存的上下文重新渲染受影响的文件，按日索引也无需扫描输出目录。
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS papers ("
+            " paper_id TEXT PRIMARY KEY,"
+            " day TEXT NOT NULL,"
+            " title TEXT NOT NULL,"
+            " context TEXT NOT NULL,"
+            " updated_at REAL NOT NULL"
+            ") WITHOUT ROWID"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS papers_day ON papers (day)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS outputs ("
+            " paper_id TEXT NOT NULL,"
+            " platform TEXT NOT NULL,"
+            " path TEXT NOT NULL,"
+            " content_hash TEXT NOT NULL,"
+            " template_hash TEXT NOT NULL,"
+            " context_hash TEXT NOT NULL,"
+            " updated_at REAL NOT NULL,"
+            " PRIMARY KEY (paper_id, platform)"
+            ") WITHOUT ROWID"
+        )
+        self._conn.commit()
+
+    def get(self, paper_id: str, platform: str) -> Optional[Dict[str, str]]:
+        """
+        读取输出文件记录
+        :param paper_id: 不含版本的arXiv ID
+        :param platform: 平台名称
+        :return: 包含 path、content_hash、template_hash、context_hash 的字典，没有记录时返回 None
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT path, content_hash, template_hash, context_hash FROM outputs "
+                "WHERE paper_id = ? AND platform = ?", (paper_id, platform)
+            ).fetchone()
+        if row is None:
+            return None
+        return dict(zip(('path', 'content_hash', 'template_hash', 'context_hash'), row))
+
+    def put_output(self, paper_id: str, platform: str, path: str, content_hash: str,
+                   template_hash: str, context_hash: str):
+        """
+        记录输出文件
+        :param paper_id: 不含版本的arXiv ID
+        :param platform: 平台名称
+        :param path: 文件路径
+        :param content_hash: 文件内容哈希
+        :param template_hash: 模板哈希
+        :param context_hash: 渲染上下文哈希
+        """
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO outputs "
+                "(paper_id, platform, path, content_hash, template_hash, context_hash, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (paper_id, platform, path, content_hash, template_hash, context_hash, time.time())
+            )
+            self._conn.commit()
+
+    def put_paper(self, paper_id: str, day: str, title: str, context: str) -> Optional[str]:
+        """
+        保存论文的渲染上下文
+        :param paper_id: 不含版本的arXiv ID
+        :param day: 所属日期（YYYY-MM-DD）
+        :param title: 论文标题
+        :param context: JSON序列化的渲染上下文
+        :return: 论文原先所属的日期，新论文返回 None
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT day FROM papers WHERE paper_id = ?", (paper_id,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO papers (paper_id, day, title, context, updated_at) VALUES (?, ?, ?, ?, ?)",
+                (paper_id, day, title, context, time.time())
+            )
+            self._conn.commit()
+        return row[0] if row else None
+
+    def day_papers(self, day: str) -> List[Tuple[str, str, Dict[str, str]]]:
+        """
+        获取某一天的论文及其输出文件
+        :param day: 日期（YYYY-MM-DD）
+        :return: (arXiv ID, 标题, 平台到文件路径的映射) 列表，按arXiv ID排序
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT p.paper_id, p.title, o.platform, o.path FROM papers p "
+                "LEFT JOIN outputs o ON o.paper_id = p.paper_id "
+                "WHERE p.day = ? ORDER BY p.paper_id, o.platform", (day,)
+            ).fetchall()
+        papers: Dict[str, Tuple[str, str, Dict[str, str]]] = {}
+        for paper_id, title, platform, path in rows:
+            entry = papers.setdefault(paper_id, (paper_id, title, {}))
+            if platform is not None:
+                entry[2][platform] = path
+        return list(papers.values())
+
+    def stale_outputs(self, platform: str, template_hash: str) -> List[Tuple[str, str, str]]:
+        """
+        获取用旧模板生成的输出文件
+        :param platform: 平台名称
+        :param template_hash: 当前模板哈希
+        :return: (arXiv ID, 所属日期, JSON序列化的渲染上下文) 列表
+        """
+        with self._lock:
+            return self._conn.execute(
+                "SELECT p.paper_id, p.day, p.context FROM outputs o JOIN papers p ON p.paper_id = o.paper_id "
+                "WHERE o.platform = ? AND o.template_hash != ?", (platform, template_hash)
+            ).fetchall()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
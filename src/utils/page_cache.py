@@ -0,0 +1,69 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Optional
+
+
+class PageCache:
+    """
+    HTTP响应页面的短期磁盘缓存
+    以URL的哈希为键保存压缩后的响应体，超过有效期的页面视为未命中，
+    打开时清理过期页面。用于arXiv Atom结果页：重叠的查询和有效期内的重复运行不再重复请求。
+    """
+
+    def __init__(self, path: str, ttl_seconds: float = 3600):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS pages ("
+            " key TEXT PRIMARY KEY,"
+            " body BLOB NOT NULL,"
+            " fetched_at REAL NOT NULL"
+            ") WITHOUT ROWID"
+        )
+        self._conn.execute("DELETE FROM pages WHERE fetched_at < ?", (time.time() - ttl_seconds,))
+        self._conn.commit()
+
+    @staticmethod
+    def _key(url: str) -> str:
+        return hashlib.sha256(url.encode('utf-8')).hexdigest()
+
+    def get(self, url: str) -> Optional[bytes]:
+        """
+        读取缓存的页面
+        :param url: 请求URL
+        :return: 响应体，未命中或已过期时返回 None
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body FROM pages WHERE key = ? AND fetched_at >= ?",
+                (self._key(url), time.time() - self.ttl_seconds)
+            ).fetchone()
+        return zlib.decompress(row[0]) if row else None
+
+    def put(self, url: str, body: bytes):
+        """
+        写入页面
+        :param url: 请求URL
+        :param body: 响应体
+        """
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pages (key, body, fetched_at) VALUES (?, ?, ?)",
+                (self._key(url), zlib.compress(body), time.time())
+            )
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,133 @@
+import os
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from ..models import Paper
+
+_VERSION_PATTERN = re.compile(r'^(?P<id>.+?)(?:v(?P<version>\d+))?$')
+
+# SQLite 单条语句的参数上限较保守，批量查询时按此大小分块
+_QUERY_CHUNK = 500
+
+
+def split_arxiv_id(arxiv_id: str) -> Tuple[str, int]:
+    """
+    拆分arXiv ID与版本号
+    :param arxiv_id: 形如 2401.01234v2 的ID
+    :return: (不含版本的ID, 版本号)，未带版本时版本号为1
+    """
+    match = _VERSION_PATTERN.match(arxiv_id.strip())
+    version = match.group('version')
+    return match.group('id'), int(version) if version else 1
+
+
+class PaperIndex:
+    """
+    已处理论文索引
+    记录每篇论文已处理的最新版本以及上次成功运行的水位线，
+    使每日任务只处理新论文或有新版本的论文。
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS processed_papers ("
+            " arxiv_id TEXT PRIMARY KEY,"
+            " version INTEGER NOT NULL,"
+            " processed_at REAL NOT NULL"
+            ") WITHOUT ROWID"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS watermarks ("
+            " name TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL"
+            ") WITHOUT ROWID"
+        )
+        self._conn.commit()
+
+    def processed_versions(self, arxiv_ids: Iterable[str]) -> Dict[str, int]:
+        """
+        批量查询已处理的版本号
+        :param arxiv_ids: 不含版本的arXiv ID
+        :return: ID到已处理版本号的映射，未处理的ID不出现
+        """
+        ids = list(dict.fromkeys(arxiv_ids))
+        versions: Dict[str, int] = {}
+        with self._lock:
+            for start in range(0, len(ids), _QUERY_CHUNK):
+                chunk = ids[start:start + _QUERY_CHUNK]
+                placeholders = ','.join('?' * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT arxiv_id, version FROM processed_papers WHERE arxiv_id IN ({placeholders})", chunk
+                ).fetchall()
+                versions.update(rows)
+        return versions
+
+    def filter_new(self, papers: List['Paper']) -> List['Paper']:
+        """
+        过滤出未处理过或有新版本的论文
+        :param papers: 论文列表
+        :return: 需要处理的论文
+        """
+        keys = [split_arxiv_id(paper.arxiv_id) for paper in papers]
+        processed = self.processed_versions(arxiv_id for arxiv_id, _ in keys)
+        return [
+            paper for paper, (arxiv_id, version) in zip(papers, keys)
+            if processed.get(arxiv_id, 0) < version
+        ]
+
+    def mark_processed(self, papers: Iterable['Paper']):
+        """
+        记录论文已处理
+        :param papers: 论文列表
+        """
+        now = time.time()
+        rows = [split_arxiv_id(paper.arxiv_id) + (now,) for paper in papers]
+        if not rows:
+            return
+        with self._lock:
+            self._conn.executemany(
+                "INSERT INTO processed_papers (arxiv_id, version, processed_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(arxiv_id) DO UPDATE SET "
+                " version = MAX(version, excluded.version), processed_at = excluded.processed_at",
+                rows
+            )
+            self._conn.commit()
+
+    def get_watermark(self, name: str = 'daily') -> Optional[datetime]:
+        """
+        获取上次成功运行的水位线
+        :param name: 水位线名称
+        :return: 水位线时间，从未成功运行时返回 None
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM watermarks WHERE name = ?", (name,)).fetchone()
+        return datetime.fromisoformat(row[0]) if row else None
+
+    def set_watermark(self, value: datetime, name: str = 'daily'):
+        """
+        更新水位线
+        :param value: 水位线时间
+        :param name: 水位线名称
+        """
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO watermarks (name, value) VALUES (?, ?)", (name, value.isoformat())
+            )
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,325 @@
+import asyncio
+import random
+import re
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Mapping, Optional
+from .config import Config
+
+# 令牌桶最多积累多少秒的额度，避免空闲后瞬间突发触发服务端限流
+_BURST_SECONDS = 10.0
+
+# 并发已满时的轮询间隔（秒）
+_CONCURRENCY_POLL = 0.05
+
+_DURATION_PART = re.compile(r'(\d+(?:\.\d+)?)(ms|s|m|h)')
+_UNIT_SECONDS = {'ms': 0.001, 's': 1.0, 'm': 60.0, 'h': 3600.0}
+
+
+def parse_duration(value: Optional[str]) -> Optional[float]:
+    """
+    解析 x-ratelimit-reset-* 头中的时长，如 "12ms"、"1.5s"、"6m0s"
+    :param value: 头部取值
+    :return: 秒数，无法解析时返回 None
+    """
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _DURATION_PART.findall(value)
+    if not parts:
+        return None
+    return sum(float(number) * _UNIT_SECONDS[unit] for number, unit in parts)
+
+
+def parse_retry_after(headers: Optional[Mapping[str, str]]) -> Optional[float]:
+    """
+    解析 retry-after-ms / retry-after 头
+    :param headers: 响应头
+    :return: 需要等待的秒数，没有该头时返回 None
+    """
+    if not headers:
+        return None
+    value = headers.get('retry-after-ms')
+    if value:
+        try:
+            return float(value) / 1000
+        except ValueError:
+            pass
+    value = headers.get('retry-after')
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """
+    带完全抖动的指数退避
+    :param attempt: 第几次重试，从0开始
+    :param base: 基础等待时间（秒）
+    :param cap: 最长等待时间（秒）
+    :return: 等待时间（秒）
+    """
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+def estimate_text_tokens(text: str) -> int:
+    """
+    粗略估算文本的令牌数：ASCII字符约4个一个令牌，中文等其他字符约每字一个令牌
+    :param text: 文本
+    :return: 令牌数
+    """
+    ascii_chars = sum(1 for ch in text if ord(ch) < 128)
+    return ascii_chars // 4 + (len(text) - ascii_chars)
+
+
+def estimate_request_tokens(request: Dict[str, Any]) -> int:
+    """
+    估算一次 chat completion 请求占用的令牌数（提示词 + max_tokens）
+    :param request: 请求参数
+    :return: 令牌数
+    """
+    prompt_tokens = sum(estimate_text_tokens(message.get('content') or '') for message in request.get('messages', []))
+    return prompt_tokens + (request.get('max_tokens') or 0)
+
+
+class AdaptiveRateLimiter:
+    """
+    客户端自适应限流器
+    同时按每分钟请求数（RPM）和每分钟令牌数（TPM）做令牌桶限流，
+    并按AIMD调整在途请求上限：成功时加性增加，被限流或服务端过载时乘性减少。
+    响应头中的 x-ratelimit-* 会用于校准额度，Retry-After 会暂停所有请求。
+
+    reserve/release 不阻塞，同步和异步调用方共用同一个实例：
+        limiter.acquire(tokens)          # 线程中
+        await limiter.aacquire(tokens)   # 事件循环中
+        ...
+        limiter.release(tokens, used_tokens=..., headers=...)
+    """
+
+    def __init__(self, rpm: float, tpm: float, max_concurrency: int, min_concurrency: int = 1,
+                 headroom: float = 0.9, increase: float = 1.0, decrease: float = 0.5):
+        """
+        :param rpm: 每分钟请求数上限
+        :param tpm: 每分钟令牌数上限
+        :param max_concurrency: 在途请求上限的最大值
+        :param min_concurrency: 在途请求上限的最小值
+        :param headroom: 根据响应头校准额度时保留的比例，留出余量避免贴线触发限流；
+                         校准后的额度不会超过 rpm / tpm 这两个配置上限
+        :param increase: 每个成功窗口的加性增量
+        :param decrease: 被限流时的乘性因子
+        """
+        self._lock = threading.Lock()
+        self.max_concurrency = max(1, max_concurrency)
+        self.min_concurrency = max(1, min(min_concurrency, self.max_concurrency))
+        self.headroom = headroom
+        self.increase = increase
+        self.decrease = decrease
+
+        self._set_limits(rpm, tpm)
+        self._rpm_cap = self.rpm
+        self._tpm_cap = self.tpm
+        self._requests = self._request_capacity
+        self._tokens = self._token_capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._in_flight = 0
+        self.concurrency = float(self.max_concurrency)
+
+    def _set_limits(self, rpm: float, tpm: float):
+        self.rpm = max(1.0, rpm)
+        self.tpm = max(1.0, tpm)
+        self._request_rate = self.rpm / 60
+        self._token_rate = self.tpm / 60
+        self._request_capacity = max(1.0, self._request_rate * _BURST_SECONDS)
+        self._token_capacity = max(1.0, self._token_rate * _BURST_SECONDS)
+
+    def _refill(self, now: float):
+        elapsed = now - self._updated
+        if elapsed > 0:
+            self._requests = min(self._request_capacity, self._requests + elapsed * self._request_rate)
+            self._tokens = min(self._token_capacity, self._tokens + elapsed * self._token_rate)
+            self._updated = now
+
+    def reserve(self, tokens: int) -> float:
+        """
+        尝试预占一次请求的额度
+        :param tokens: 预估令牌数
+        :return: 0 表示预占成功；否则为建议的等待秒数，等待后需重新调用
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            if self._paused_until > now:
+                return self._paused_until - now
+            if self._in_flight >= int(self.concurrency):
+                return _CONCURRENCY_POLL
+
+            # 单次请求超过桶容量时按满桶处理，否则永远无法发出
+            needed = min(tokens, self._token_capacity)
+            wait = max(
+                (1 - self._requests) / self._request_rate,
+                (needed - self._tokens) / self._token_rate,
+                0.0
+            )
+            if wait > 0:
+                return wait
+            self._requests -= 1
+            self._tokens -= needed
+            self._in_flight += 1
+            return 0.0
+
+    def acquire(self, tokens: int):
+        """
+        阻塞直到预占成功
+        :param tokens: 预估令牌数
+        """
+        while True:
+            wait = self.reserve(tokens)
+            if wait <= 0:
+                return
+            time.sleep(wait)
+
+    async def aacquire(self, tokens: int):
+        """
+        异步等待直到预占成功
+        :param tokens: 预估令牌数
+        """
+        while True:
+            wait = self.reserve(tokens)
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+
+    def release(self, tokens: int, used_tokens: Optional[int] = None,
+                headers: Optional[Mapping[str, str]] = None, throttled: bool = False,
+                retry_after: Optional[float] = None, succeeded: bool = True):
+        """
+        请求结束后归还额度并调整并发上限
+        :param tokens: 预占时的令牌数
+        :param used_tokens: 实际消耗的令牌数，提供时按差额退还或补扣
+        :param headers: 响应头，用于校准额度
+        :param throttled: 是否被限流或服务端过载
+        :param retry_after: 服务端要求的等待秒数
+        :param succeeded: 请求是否成功完成；只有成功的请求才提高并发上限，
+                          参数错误、鉴权失败等永久错误只归还额度，不改变并发上限
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._in_flight = max(0, self._in_flight - 1)
+            if used_tokens is not None:
+                self._tokens = min(self._token_capacity,
+                                   self._tokens + min(tokens, self._token_capacity) - used_tokens)
+            if headers:
+                self._apply_headers(headers, now)
+            if throttled:
+                self.concurrency = max(float(self.min_concurrency), self.concurrency * self.decrease)
+                if retry_after:
+                    self._paused_until = max(self._paused_until, now + retry_after)
+            elif succeeded:
+                self.concurrency = min(float(self.max_concurrency),
+                                       self.concurrency + self.increase / max(self.concurrency, 1.0))
+
+    def _apply_headers(self, headers: Mapping[str, str], now: float):
+        limits = {}
+        for kind in ('requests', 'tokens'):
+            limit = headers.get(f'x-ratelimit-limit-{kind}')
+            remaining = headers.get(f'x-ratelimit-remaining-{kind}')
+            reset = parse_duration(headers.get(f'x-ratelimit-reset-{kind}'))
+            try:
+                limits[kind] = float(limit) * self.headroom if limit else None
+                remaining = float(remaining) if remaining is not None else None
+            except ValueError:
+                continue
+            if remaining is None:
+                continue
+            # 本地额度不超过服务端剩余额度；额度耗尽时暂停到重置时间
+            if kind == 'requests':
+                self._requests = min(self._requests, remaining)
+            else:
+                self._tokens = min(self._tokens, remaining)
+            if remaining <= 0 and reset:
+                self._paused_until = max(self._paused_until, now + reset)
+
+        # 服务端额度只用于收紧，运维配置的更低上限不会被响应头放宽
+        rpm = min(self._rpm_cap, limits['requests']) if limits.get('requests') else self.rpm
+        tpm = min(self._tpm_cap, limits['tokens']) if limits.get('tokens') else self.tpm
+        if rpm != self.rpm or tpm != self.tpm:
+            self._set_limits(rpm, tpm)
+
+    def stats(self) -> Dict[str, float]:
+        """
+        获取限流器状态
+        :return: 当前RPM/TPM额度、并发上限和在途请求数
+        """
+        with self._lock:
+            return {
+                'rpm': self.rpm,
+                'tpm': self.tpm,
+                'concurrency': self.concurrency,
+                'in_flight': self._in_flight
+            }
+
+
+_LIMITERS: Dict[str, AdaptiveRateLimiter] = {}
+_LIMITERS_LOCK = threading.Lock()
+
+
+def shared_limiter(name: str) -> AdaptiveRateLimiter:
+    """
+    获取进程内共享的限流器，首次获取时按配置项 <name>.rpm_limit / tpm_limit / max_concurrency 创建
+    同一账号的额度由进程内所有调用方（摘要生成、全文摘要、批处理回退等）共同遵守
+    :param name: 配置节名称，如 openai
+    :return: 限流器
+    """
+    with _LIMITERS_LOCK:
+        if name not in _LIMITERS:
+            config = Config()
+            _LIMITERS[name] = AdaptiveRateLimiter(
+                rpm=config.get(name, 'rpm_limit'),
+                tpm=config.get(name, 'tpm_limit'),
+                max_concurrency=config.get(name, 'max_concurrency')
+            )
+        return _LIMITERS[name]
+
+
+class IntervalLimiter:
+    """
+    最小请求间隔限流器
+    所有共享同一实例的调用方（跨线程）相邻两次请求至少间隔 interval 秒，
+    用于遵守arXiv API“每3秒不超过一次请求”的要求。
+    """
+
+    def __init__(self, interval: float):
+        """
+        :param interval: 相邻两次请求的最小间隔（秒）
+        """
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._next = 0.0
+
+    def wait(self) -> float:
+        """
+        阻塞到轮到本次请求为止
+        :return: 实际等待的秒数
+        """
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+        return delay
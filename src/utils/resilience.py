@@ -0,0 +1,285 @@
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Type, TypeVar
+from .config import Config
+from .error_handler import CircuitOpenError
+from .logger import Logger
+from .metrics import metrics
+from .rate_limiter import backoff_delay
+
+logger = Logger()
+
+T = TypeVar('T')
+
+# 可重试的HTTP状态码：超时、冲突、过早请求和限流，以及所有5xx
+TRANSIENT_STATUS = {408, 409, 425, 429}
+
+# 按类名识别的瞬时网络错误，无需导入 requests / openai / urllib3 即可分类
+_TRANSIENT_ERROR_NAMES = {
+    'APIConnectionError', 'APITimeoutError', 'ConnectTimeout', 'ReadTimeout', 'Timeout',
+    'ChunkedEncodingError', 'ProtocolError', 'IncompleteRead', 'RemoteDisconnected'
+}
+
+# 服务端明确表示重试无意义的错误码，如额度用尽时同样返回429的 insufficient_quota
+_PERMANENT_CODES = {'insufficient_quota'}
+
+
+def error_status(error: BaseException) -> Optional[int]:
+    """
+    提取异常对应的HTTP状态码
+    :param error: 异常
+    :return: 状态码，没有时返回 None
+    """
+    status = getattr(error, 'status_code', None)
+    if status is None:
+        status = getattr(getattr(error, 'response', None), 'status_code', None)
+    return status if isinstance(status, int) else None
+
+
+def find_cause(error: Optional[BaseException], error_type: Type[BaseException]) -> Optional[BaseException]:
+    """
+    沿 __cause__ / __context__ 链查找指定类型的异常，用于识别被逐层包装过的错误
+    :param error: 异常
+    :param error_type: 要查找的异常类型
+    :return: 找到的异常，没有时返回 None
+    """
+    seen = set()
+    while error is not None and id(error) not in seen:
+        if isinstance(error, error_type):
+            return error
+        seen.add(id(error))
+        error = error.__cause__ or error.__context__
+    return None
+
+
+def is_transient(error: BaseException) -> bool:
+    """
+    判断异常是否为瞬时错误（重试可能成功）
+    网络中断、超时、限流和服务端错误为瞬时错误；参数错误、鉴权失败、额度用尽等为永久错误
+    :param error: 异常
+    :return: 是否可重试
+    """
+    if isinstance(error, CircuitOpenError):
+        return False
+    # 异常类可以用 transient 属性声明自身是否可重试
+    declared = getattr(error, 'transient', None)
+    if isinstance(declared, bool):
+        return declared
+    if getattr(error, 'code', None) in _PERMANENT_CODES:
+        return False
+    status = error_status(error)
+    if status is not None:
+        return status in TRANSIENT_STATUS or status >= 500
+    if isinstance(error, (ConnectionError, TimeoutError)):
+        return True
+    return any(cls.__name__ in _TRANSIENT_ERROR_NAMES for cls in type(error).__mro__)
+
+
+class RetryPolicy:
+    """
+    重试策略：只重试瞬时错误，按带抖动的指数退避等待，
+    重试次数和总耗时预算（deadline）任一用尽即放弃
+    """
+
+    def __init__(self, max_retries: int = 3, backoff_base: float = 1.0, backoff_max: float = 60.0,
+                 deadline: Optional[float] = None, classify: Callable[[BaseException], bool] = is_transient):
+        """
+        :param max_retries: 最多重试次数
+        :param backoff_base: 退避基础时间（秒）
+        :param backoff_max: 单次退避最长时间（秒）
+        :param deadline: 从第一次尝试开始的总耗时预算（秒），为 None 时不限制
+        :param classify: 判断异常是否可重试的函数
+        """
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.deadline = deadline
+        self.classify = classify
+
+    def next_delay(self, error: BaseException, attempt: int, started: float,
+                   retry_after: Optional[float] = None) -> Optional[float]:
+        """
+        计算重试前的等待时间
+        :param error: 本次失败的异常
+        :param attempt: 第几次重试，从0开始
+        :param started: 第一次尝试开始的时间（time.monotonic）
+        :param retry_after: 服务端要求的最短等待时间（秒）
+        :return: 等待秒数，不应重试时返回 None
+        """
+        if attempt >= self.max_retries or not self.classify(error):
+            return None
+        delay = max(retry_after or 0.0, backoff_delay(attempt, self.backoff_base, self.backoff_max))
+        if self.deadline is not None and time.monotonic() - started + delay > self.deadline:
+            return None
+        return delay
+
+
+class CircuitBreaker:
+    """
+    熔断器
+    连续 failure_threshold 次瞬时错误后断开，断开期间所有调用立即抛出 CircuitOpenError；
+    reset_seconds 秒后进入半开状态，只放行一次试探调用，成功则闭合，失败则重新断开。
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_seconds: float = 60.0):
+        """
+        :param name: 依赖名称
+        :param failure_threshold: 断开前允许的连续失败次数
+        :param reset_seconds: 断开后多久允许试探（秒）
+        """
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_seconds = reset_seconds
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_seconds:
+                return self.HALF_OPEN
+            return self._state
+
+    def retry_in(self) -> float:
+        """
+        距离允许试探还有多少秒
+        :return: 秒数，未断开时为0
+        """
+        with self._lock:
+            if self._state != self.OPEN:
+                return 0.0
+            return max(0.0, self.reset_seconds - (time.monotonic() - self._opened_at))
+
+    def check(self):
+        """
+        调用依赖前检查熔断状态
+        :raises CircuitOpenError: 熔断器断开，或半开状态下已有试探调用在进行
+        """
+        with self._lock:
+            if self._state == self.CLOSED:
+                return
+            remaining = self.reset_seconds - (time.monotonic() - self._opened_at)
+            if remaining <= 0 and not self._probing:
+                self._probing = True
+                logger.info(f"{self.name} 熔断器半开，放行一次试探请求")
+                return
+        metrics.add('circuit_rejections', dependency=self.name)
+        raise CircuitOpenError(self.name, max(0.0, remaining))
+
+    def record_success(self):
+        with self._lock:
+            if self._state != self.CLOSED:
+                logger.info(f"{self.name} 已恢复，熔断器闭合")
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probing = False
+
+    def release(self):
+        """
+        结束试探调用但不改变熔断状态，半开状态下的下一次调用可以重新试探
+        """
+        with self._lock:
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._state == self.CLOSED and self._failures < self.failure_threshold:
+                return
+            if self._state == self.CLOSED:
+                logger.error(f"{self.name} 连续失败 {self._failures} 次，熔断 {self.reset_seconds:.0f} 秒")
+                metrics.add('circuit_opened', dependency=self.name)
+            self._state = self.OPEN
+            self._opened_at = time.monotonic()
+            self._probing = False
+
+
+class Dependency:
+    """
+    外部依赖（OpenAI、arXiv、PDF下载等）的重试策略与熔断器
+        dependency('arxiv').call(session.get, url, timeout=30)
+    自行管理重试循环的调用方（如需要与限流器配合的OpenAI请求）可直接使用 breaker 和 policy。
+    """
+
+    def __init__(self, name: str, policy: RetryPolicy, breaker: CircuitBreaker):
+        self.name = name
+        self.policy = policy
+        self.breaker = breaker
+
+    def record(self, error: BaseException):
+        """
+        记录一次失败：只有瞬时错误计入熔断，永久错误说明依赖本身可用，按成功处理；
+        限流（429）说明依赖可用只是请求过快，由限流器处理，不影响熔断状态，只结束可能正在进行的试探
+        :param error: 异常
+        """
+        if error_status(error) == 429:
+            self.breaker.release()
+            return
+        if self.policy.classify(error):
+            self.breaker.record_failure()
+        elif not isinstance(error, CircuitOpenError):
+            self.breaker.record_success()
+
+    def call(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """
+        按重试策略调用函数，熔断器断开时立即失败
+        :param func: 被调用的函数
+        :return: 函数返回值
+        :raises CircuitOpenError: 熔断器断开
+        """
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            self.breaker.check()
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                self.record(e)
+                delay = self.policy.next_delay(e, attempt, started)
+                if delay is None:
+                    raise
+                metrics.add('dependency_retries', dependency=self.name)
+                logger.warning(f"{self.name} 请求失败（{type(e).__name__}: {str(e)}），"
+                               f"{delay:.1f}秒后第{attempt + 1}次重试")
+                time.sleep(delay)
+                attempt += 1
+                continue
+            self.breaker.record_success()
+            return result
+
+
+_DEPENDENCIES: Dict[str, Dependency] = {}
+_DEPENDENCIES_LOCK = threading.Lock()
+
+
+def dependency(name: str) -> Dependency:
+    """
+    获取进程内共享的依赖实例，首次获取时按配置项 resilience.<name> 创建
+    :param name: 依赖名称，如 openai、arxiv、pdf
+    :return: 依赖
+    """
+    with _DEPENDENCIES_LOCK:
+        if name not in _DEPENDENCIES:
+            settings = Config().get('resilience', name) or {}
+            _DEPENDENCIES[name] = Dependency(
+                name,
+                RetryPolicy(
+                    max_retries=settings.get('max_retries', 3),
+                    backoff_base=settings.get('backoff_base', 1.0),
+                    backoff_max=settings.get('backoff_max', 60.0),
+                    deadline=settings.get('deadline_seconds') or None
+                ),
+                CircuitBreaker(
+                    name,
+                    failure_threshold=settings.get('breaker_failures', 5),
+                    reset_seconds=settings.get('breaker_reset_seconds', 60.0)
+                )
+            )
+        return _DEPENDENCIES[name]
@@ -0,0 +1,197 @@
+import json
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import IO, TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, Optional
+from .logger import Logger
+
+if TYPE_CHECKING:
+    from ..models import Paper
+
+logger = Logger()
+
+
+@contextmanager
+def atomic_open(path: str) -> Iterator[IO[str]]:
+    """
+    原子地写入文本文件：先写同目录下的临时文件并落盘，退出上下文时再替换目标文件
+    进程在任何时刻退出，目标文件要么是旧内容，要么是完整的新内容；
+    临时文件名唯一，并发写入同一文件时互不干扰，最后完成替换的一方生效；
+    上下文中抛出异常时删除临时文件，目标文件保持不变
+    :param path: 文件路径
+    :return: 临时文件对象
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix='.tmp', dir=directory or '.')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def atomic_write(path: str, content: str):
+    """
+    原子地写入文本文件，见 atomic_open
+    :param path: 文件路径
+    :param content: 文件内容
+    """
+    with atomic_open(path) as f:
+        f.write(content)
+
+
+class RunManifest:
+    """
+    单次每日任务的进度清单
+    记录本次运行爬取到的每篇论文及其已完成阶段的结果，每次更新都原子地写入磁盘。
+    进程中途退出或部分论文失败时清单保留，下次运行同一任务会从每篇论文第一个未完成的阶段继续；
+    全部论文完成后清单被归档为 <job>.last.json。
+    因外部依赖熔断而未处理的论文被暂存（park），留到下次运行且不计入失败次数。
+    """
+
+    def __init__(self, path: str, job: str, run_started: Optional[datetime] = None):
+        """
+        :param path: 清单文件路径
+        :param job: 任务名称
+        :param run_started: 运行开始时间
+        """
+        self.path = path
+        self.job = job
+        self.run_started = run_started or datetime.now(timezone.utc)
+        self.resumed = False
+        self._papers: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def open(cls, directory: str, job: str) -> 'RunManifest':
+        """
+        打开任务未完成的清单，没有时新建
+        :param directory: 清单目录
+        :param job: 任务名称
+        :return: 清单
+        """
+        path = os.path.join(directory, f"{job}.json")
+        manifest = cls(path, job)
+        if not os.path.exists(path):
+            return manifest
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            manifest.run_started = datetime.fromisoformat(data['run_started'])
+            manifest._papers = data['papers']
+            manifest.resumed = True
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"运行清单读取失败，将重新开始: {path}, 错误: {str(e)}")
+        return manifest
+
+    def _save(self):
+        atomic_write(self.path, json.dumps({
+            'job': self.job,
+            'run_started': self.run_started.isoformat(),
+            'papers': self._papers
+        }, ensure_ascii=False))
+
+    def add_paper(self, paper: 'Paper') -> bool:
+        """
+        记录爬取到的论文
+        :param paper: 论文信息
+        :return: 是否为新论文，清单中已有时返回 False
+        """
+        with self._lock:
+            if paper.arxiv_id in self._papers:
+                return False
+            self._papers[paper.arxiv_id] = {'paper': paper.to_dict(), 'stages': {}, 'done': False}
+            self._save()
+            return True
+
+    def pending_papers(self) -> List['Paper']:
+        """
+        获取尚未完成的论文
+        :return: 按爬取顺序排列的论文
+        """
+        from ..models import Paper
+        with self._lock:
+            return [Paper.from_dict(entry['paper']) for entry in self._papers.values() if not entry['done']]
+
+    def result(self, paper_id: str, stage: str) -> Any:
+        """
+        获取论文某个阶段的结果
+        :param paper_id: arXiv ID
+        :param stage: 阶段名称
+        :return: 阶段结果，未完成时返回 None
+        """
+        with self._lock:
+            entry = self._papers.get(paper_id)
+            return entry['stages'].get(stage) if entry else None
+
+    def record(self, paper: 'Paper', stage: str, result: Any):
+        """
+        记录论文完成的阶段及其结果
+        :param paper: 论文信息
+        :param stage: 阶段名称
+        :param result: 阶段结果，需可序列化为JSON
+        """
+        with self._lock:
+            entry = self._papers.setdefault(paper.arxiv_id, {'paper': paper.to_dict(), 'stages': {}, 'done': False})
+            entry['stages'][stage] = result
+            self._save()
+
+    def mark_done(self, papers: Iterable['Paper']):
+        """
+        标记论文已完成全部阶段
+        :param papers: 论文列表
+        """
+        with self._lock:
+            for paper in papers:
+                if paper.arxiv_id in self._papers:
+                    self._papers[paper.arxiv_id]['done'] = True
+            self._save()
+
+    def park(self, papers: Iterable['Paper']):
+        """
+        暂存论文：本次运行不再处理，下次运行继续，且不计入失败次数
+        :param papers: 论文列表
+        """
+        with self._lock:
+            for paper in papers:
+                if paper.arxiv_id in self._papers:
+                    self._papers[paper.arxiv_id]['parked'] = True
+            self._save()
+    
+    def finish(self, max_attempts: int = 3):
+        """
+        运行结束：已完成的论文从清单中移除，失败和暂存的论文留给下次运行继续，
+        连续 max_attempts 次运行都失败的论文不再保留；没有未完成的论文时归档清单
+        :param max_attempts: 每篇论文最多参与的运行次数
+        """
+        with self._lock:
+            if not os.path.exists(self.path):
+                return
+            pending = {}
+            for paper_id, entry in self._papers.items():
+                if entry['done']:
+                    continue
+                if entry.pop('parked', False):
+                    pending[paper_id] = entry
+                    continue
+                entry['attempts'] = entry.get('attempts', 0) + 1
+                if entry['attempts'] >= max_attempts:
+                    logger.warning(f"论文 {paper_id} 连续 {entry['attempts']} 次运行未完成，不再从清单恢复")
+                    continue
+                pending[paper_id] = entry
+            if pending:
+                self._papers = pending
+                self._save()
+            else:
+                os.replace(self.path, os.path.join(os.path.dirname(self.path), f"{self.job}.last.json"))
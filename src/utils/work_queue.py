@@ -0,0 +1,221 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Optional
+
+from .paper_index import split_arxiv_id
+
+if TYPE_CHECKING:
+    from ..models import Paper
+
+# 任务状态
+PENDING = 'pending'
+LEASED = 'leased'
+DONE = 'done'
+FAILED = 'failed'
+
+
+class WorkQueue:
+    """
+    基于SQLite的持久化论文任务队列
+    多个进程（或共享文件系统上的多台主机）通过同一个数据库文件协作：
+    认领任务时在一个写事务中把任务标记为租用并写入租期，处理期间靠心跳续租，
+    完成后确认；租期过期的任务会被其他工作进程重新认领。
+    同一篇论文（不含版本号的ID）在队列中只有一条记录，有新版本时才会重新入队。
+    """
+
+    def __init__(self, path: str, max_attempts: int = 3, journal_mode: str = 'wal'):
+        """
+        :param path: 数据库文件路径
+        :param max_attempts: 每篇论文最多被认领的次数，超过后标记为失败
+        :param journal_mode: SQLite日志模式；WAL依赖共享内存，跨主机共享文件系统时应使用 delete
+        """
+        self.path = path
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # 事务由 BEGIN IMMEDIATE 显式控制
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30, isolation_level=None)
+        self._conn.execute(f"PRAGMA journal_mode={journal_mode}")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS papers ("
+            " arxiv_id TEXT PRIMARY KEY,"
+            " version INTEGER NOT NULL,"
+            " payload TEXT NOT NULL,"
+            " state TEXT NOT NULL,"
+            " attempts INTEGER NOT NULL DEFAULT 0,"
+            " worker TEXT,"
+            " lease_until REAL,"
+            " enqueued_at REAL NOT NULL,"
+            " updated_at REAL NOT NULL,"
+            " result TEXT,"
+            " error TEXT"
+            ") WITHOUT ROWID"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS papers_state ON papers (state, enqueued_at)")
+
+    def _transaction(self):
+        return _ImmediateTransaction(self._conn)
+
+    def enqueue(self, papers: Iterable['Paper']) -> int:
+        """
+        论文入队，已在队列中的论文只有出现新版本且未被租用时才重新入队
+        :param papers: 论文列表
+        :return: 新入队（或重新入队）的论文数
+        """
+        now = time.time()
+        rows = [split_arxiv_id(paper.arxiv_id) + (paper.to_json(), now, now) for paper in papers]
+        if not rows:
+            return 0
+        with self._lock, self._transaction():
+            before = self._conn.total_changes
+            self._conn.executemany(
+                "INSERT INTO papers (arxiv_id, version, payload, state, enqueued_at, updated_at) "
+                f"VALUES (?, ?, ?, '{PENDING}', ?, ?) "
+                "ON CONFLICT(arxiv_id) DO UPDATE SET "
+                f" version = excluded.version, payload = excluded.payload, state = '{PENDING}',"
+                " attempts = 0, worker = NULL, lease_until = NULL, error = NULL,"
+                " enqueued_at = excluded.enqueued_at, updated_at = excluded.updated_at "
+                f"WHERE excluded.version > papers.version AND papers.state != '{LEASED}'",
+                rows
+            )
+            return self._conn.total_changes - before
+
+    def claim(self, worker: str, lease_seconds: float) -> Optional['Paper']:
+        """
+        认领一篇待处理的论文，租期过期的论文同样可被认领
+        :param worker: 工作进程标识
+        :param lease_seconds: 租期（秒）
+        :return: 论文，队列中没有可认领的论文时返回 None
+        """
+        from ..models import Paper
+
+        now = time.time()
+        with self._lock, self._transaction():
+            # 租期过期且认领次数已用尽的论文不再重试
+            self._conn.execute(
+                f"UPDATE papers SET state = '{FAILED}', worker = NULL, lease_until = NULL, updated_at = ?,"
+                " error = COALESCE(error, '租期过期次数超过上限') "
+                f"WHERE state = '{LEASED}' AND lease_until < ? AND attempts >= ?",
+                (now, now, self.max_attempts)
+            )
+            row = self._conn.execute(
+                f"SELECT arxiv_id, payload FROM papers "
+                f"WHERE (state = '{PENDING}' AND (lease_until IS NULL OR lease_until <= ?)) "
+                f"OR (state = '{LEASED}' AND lease_until < ?) ORDER BY enqueued_at LIMIT 1",
+                (now, now)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                f"UPDATE papers SET state = '{LEASED}', worker = ?, lease_until = ?, attempts = attempts + 1,"
+                " updated_at = ? WHERE arxiv_id = ?",
+                (worker, now + lease_seconds, now, row[0])
+            )
+        return Paper.from_json(row[1])
+
+    def heartbeat(self, paper: 'Paper', worker: str, lease_seconds: float) -> bool:
+        """
+        续租
+        :param paper: 论文信息
+        :param worker: 工作进程标识
+        :param lease_seconds: 从现在起的租期（秒）
+        :return: 是否仍持有该论文，租约已被他人接管时返回 False
+        """
+        now = time.time()
+        with self._lock, self._transaction():
+            cursor = self._conn.execute(
+                "UPDATE papers SET lease_until = ?, updated_at = ? "
+                f"WHERE arxiv_id = ? AND worker = ? AND state = '{LEASED}'",
+                (now + lease_seconds, now, split_arxiv_id(paper.arxiv_id)[0], worker)
+            )
+            return cursor.rowcount == 1
+
+    def ack(self, paper: 'Paper', worker: str, result: Any = None) -> bool:
+        """
+        确认论文处理完成
+        :param paper: 论文信息
+        :param worker: 工作进程标识
+        :param result: 处理结果，需可序列化为JSON
+        :return: 是否确认成功，租约已失效时返回 False
+        """
+        with self._lock, self._transaction():
+            cursor = self._conn.execute(
+                f"UPDATE papers SET state = '{DONE}', worker = NULL, lease_until = NULL, updated_at = ?,"
+                f" result = ?, error = NULL WHERE arxiv_id = ? AND worker = ? AND state = '{LEASED}'",
+                (time.time(), json.dumps(result, ensure_ascii=False), split_arxiv_id(paper.arxiv_id)[0], worker)
+            )
+            return cursor.rowcount == 1
+
+    def fail(self, paper: 'Paper', worker: str, error: str) -> bool:
+        """
+        报告论文处理失败，认领次数未用尽时重新排队，否则标记为失败
+        :param paper: 论文信息
+        :param worker: 工作进程标识
+        :param error: 错误信息
+        :return: 是否重新排队
+        """
+        with self._lock, self._transaction():
+            self._conn.execute(
+                f"UPDATE papers SET state = CASE WHEN attempts >= ? THEN '{FAILED}' ELSE '{PENDING}' END,"
+                " worker = NULL, lease_until = NULL, updated_at = ?, error = ? "
+                f"WHERE arxiv_id = ? AND worker = ? AND state = '{LEASED}'",
+                (self.max_attempts, time.time(), error, split_arxiv_id(paper.arxiv_id)[0], worker)
+            )
+            row = self._conn.execute(
+                "SELECT state FROM papers WHERE arxiv_id = ?", (split_arxiv_id(paper.arxiv_id)[0],)
+            ).fetchone()
+        return row is not None and row[0] == PENDING
+
+    def park(self, paper: 'Paper', worker: str, delay_seconds: float) -> bool:
+        """
+        暂存论文：放回队列且不计入认领次数，delay_seconds 秒内不会被再次认领（如依赖熔断期间）
+        :param paper: 论文信息
+        :param worker: 工作进程标识
+        :param delay_seconds: 多少秒后才能再次认领
+        :return: 是否暂存成功，租约已失效时返回 False
+        """
+        now = time.time()
+        with self._lock, self._transaction():
+            # 待处理状态下 lease_until 表示最早可认领的时间
+            cursor = self._conn.execute(
+                f"UPDATE papers SET state = '{PENDING}', worker = NULL, lease_until = ?,"
+                " attempts = MAX(attempts - 1, 0), updated_at = ? "
+                f"WHERE arxiv_id = ? AND worker = ? AND state = '{LEASED}'",
+                (now + delay_seconds, now, split_arxiv_id(paper.arxiv_id)[0], worker)
+            )
+            return cursor.rowcount == 1
+
+    def stats(self) -> Dict[str, int]:
+        """
+        各状态的论文数
+        :return: 状态到数量的映射
+        """
+        with self._lock:
+            rows = self._conn.execute("SELECT state, COUNT(*) FROM papers GROUP BY state").fetchall()
+        counts = {PENDING: 0, LEASED: 0, DONE: 0, FAILED: 0}
+        counts.update(rows)
+        return counts
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class _ImmediateTransaction:
+    """以 BEGIN IMMEDIATE 开始的写事务，先拿到写锁，避免多个进程同时认领同一篇论文"""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self._conn = conn
+
+    def __enter__(self):
+        self._conn.execute("BEGIN IMMEDIATE")
+        return self._conn
+
+    def __exit__(self, exc_type, exc, tb):
+        self._conn.execute("ROLLBACK" if exc_type else "COMMIT")
@@ -0,0 +1,133 @@
+import os
+import socket
+import threading
+from typing import Dict, Optional
+from .utils import CircuitOpenError, Logger, WorkQueue, find_cause, metrics
+from .utils.config import Config
+from .models import Paper
+
+logger = Logger()
+config = Config()
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class QueueWorker:
+    """
+    工作队列的消费者
+    若干线程各自循环认领论文、调用 process_paper 并确认完成；
+    一个心跳线程定期为所有处理中的论文续租，进程崩溃后租约过期，论文由其他工作进程接手。
+    多个工作进程可同时消费同一个队列文件，吞吐随进程数近似线性增长。
+    """
+
+    def __init__(self, app, queue: WorkQueue, worker_id: Optional[str] = None, threads: Optional[int] = None,
+                 lease_seconds: Optional[float] = None, heartbeat_seconds: Optional[float] = None,
+                 poll_seconds: Optional[float] = None):
+        """
+        :param app: ZakaMediaPush 实例
+        :param queue: 工作队列
+        :param worker_id: 工作进程标识，默认为 主机名-进程号
+        :param threads: 处理线程数
+        :param lease_seconds: 租期（秒）
+        :param heartbeat_seconds: 心跳间隔（秒），应明显小于租期
+        :param poll_seconds: 队列为空时的轮询间隔（秒）
+        """
+        self.app = app
+        self.queue = queue
+        self.worker_id = worker_id or default_worker_id()
+        self.threads = threads or config.get('queue', 'worker_threads')
+        self.lease_seconds = lease_seconds or config.get('queue', 'lease_seconds')
+        self.heartbeat_seconds = heartbeat_seconds or config.get('queue', 'heartbeat_seconds')
+        self.poll_seconds = poll_seconds or config.get('queue', 'poll_seconds')
+
+        self._stop = threading.Event()
+        self._finished = threading.Event()
+        self._held: Dict[str, Paper] = {}
+        self._held_lock = threading.Lock()
+        self.processed = 0
+        self.failed = 0
+
+    def stop(self):
+        """
+        停止认领新论文，处理中的论文完成后退出
+        """
+        self._stop.set()
+
+    def _heartbeat_loop(self):
+        # 停止认领后仍为处理中的论文续租，直到所有处理线程退出
+        while not self._finished.wait(self.heartbeat_seconds):
+            with self._held_lock:
+                held = list(self._held.values())
+            for paper in held:
+                try:
+                    if not self.queue.heartbeat(paper, self.worker_id, self.lease_seconds):
+                        logger.warning(f"论文租约已失效: {paper.arxiv_id}")
+                except Exception as e:
+                    logger.error(f"续租失败: {paper.arxiv_id}, 错误: {str(e)}")
+
+    def _process(self, paper: Paper):
+        try:
+            result = self.app.process_paper(paper)
+        except Exception as e:
+            circuit = find_cause(e, CircuitOpenError)
+            if circuit is not None:
+                # 依赖熔断时论文原样放回队列，熔断结束前不再认领，也不计入失败次数
+                self.queue.park(paper, self.worker_id, circuit.retry_in)
+                metrics.add('queue_parked')
+                logger.warning(f"{circuit.dependency} 熔断中，论文暂存回队列: {paper.title}")
+                return
+            requeued = self.queue.fail(paper, self.worker_id, str(e))
+            with self._held_lock:
+                self.failed += 1
+            metrics.add('queue_failures')
+            logger.error(f"处理论文失败: {paper.title}，{'已重新排队' if requeued else '不再重试'}")
+            return
+        if self.app.index:
+            self.app.index.mark_processed([paper])
+        if self.queue.ack(paper, self.worker_id, result):
+            with self._held_lock:
+                self.processed += 1
+            metrics.add('queue_acks')
+        else:
+            logger.warning(f"确认失败，论文租约已被其他工作进程接管: {paper.arxiv_id}")
+
+    def _work_loop(self, exit_when_empty: bool):
+        while not self._stop.is_set():
+            paper = self.queue.claim(self.worker_id, self.lease_seconds)
+            if paper is None:
+                if exit_when_empty:
+                    return
+                self._stop.wait(self.poll_seconds)
+                continue
+            with self._held_lock:
+                self._held[paper.arxiv_id] = paper
+            try:
+                self._process(paper)
+            finally:
+                with self._held_lock:
+                    self._held.pop(paper.arxiv_id, None)
+
+    def run(self, exit_when_empty: bool = False):
+        """
+        在当前线程中运行，直到调用 stop()，或 exit_when_empty 为 True 且队列已空
+        :param exit_when_empty: 队列中没有可认领的论文时退出
+        """
+        logger.info(f"工作进程 {self.worker_id} 启动，{self.threads} 个处理线程")
+        heartbeat = threading.Thread(target=self._heartbeat_loop, name="queue-heartbeat", daemon=True)
+        heartbeat.start()
+        workers = [
+            threading.Thread(target=self._work_loop, args=(exit_when_empty,), name=f"queue-worker-{index}")
+            for index in range(self.threads)
+        ]
+        for thread in workers:
+            thread.start()
+        try:
+            for thread in workers:
+                thread.join()
+        finally:
+            self._finished.set()
+            heartbeat.join()
+        logger.info(f"工作进程 {self.worker_id} 退出: 完成 {self.processed} 篇，失败 {self.failed} 篇，"
+                    f"队列状态: {self.queue.stats()}")
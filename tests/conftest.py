@@ -0,0 +1,30 @@
+import os
+import sys
+import tempfile
+from datetime import datetime, timezone
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# 日志在首次写入时才创建日志目录；构造应用组件或写文件日志的测试否则会在仓库中创建 logs/，
+# 因此在导入 src 之前把 LOG_DIR 指向临时目录
+os.environ.setdefault('LOG_DIR', tempfile.mkdtemp(prefix='zaka-test-logs-'))
+
+
+@pytest.fixture
+def make_paper():
+    """构造测试用的论文记录"""
+    from src.models import Paper
+
+    def factory(arxiv_id: str = '2401.00001v1', title: str = 'A Paper', **fields) -> Paper:
+        values = dict(
+            arxiv_id=arxiv_id, entry_id=f'http://arxiv.org/abs/{arxiv_id}', title=title, authors=['Alice'],
+            summary='Abstract.', pdf_url=f'http://arxiv.org/pdf/{arxiv_id}',
+            published=datetime(2024, 1, 2, tzinfo=timezone.utc), updated=None,
+            primary_category='cs.CL', categories=['cs.CL']
+        )
+        values.update(fields)
+        return Paper(**values)
+
+    return factory
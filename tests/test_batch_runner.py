@@ -0,0 +1,78 @@
+import json
+from types import SimpleNamespace
+
+from src.batch_runner import BatchRunner, make_custom_id
+from src.summary_generator import SECTIONS, SummaryGenerator
+
+
+class FakeCache:
+    def __init__(self):
+        self.data = {}
+
+    @staticmethod
+    def make_key(request):
+        return json.dumps(request, sort_keys=True)
+
+    def set(self, key, value):
+        self.data[key] = value
+
+
+class FakeGenerator:
+    model = 'test-model'
+    summary_mode = 'sections'
+    parse_combined_response = staticmethod(SummaryGenerator.parse_combined_response)
+    build_paper_content = staticmethod(lambda paper: paper.title)
+
+    def __init__(self, max_section_chars=None):
+        self.cache = FakeCache()
+        self.max_section_chars = max_section_chars
+        self.sync_calls = []
+
+    def generate_section(self, section, content):
+        self.sync_calls.append(section)
+        return f'sync {section}'
+
+
+def output_line(custom_id, text, finish_reason='stop'):
+    body = {'choices': [{'message': {'content': text}, 'finish_reason': finish_reason}]}
+    return json.dumps({'custom_id': custom_id, 'response': {'status_code': 200, 'body': body}})
+
+
+def make_runner(generator, lines):
+    runner = BatchRunner(generator, work_dir='unused', poll_interval=0, timeout=0)
+    content = SimpleNamespace(text='\n'.join(lines))
+    runner._client = SimpleNamespace(files=SimpleNamespace(content=lambda file_id: content))
+    return runner
+
+
+def test_collect_skips_truncated_outputs():
+    generator = FakeGenerator()
+    requests = {'a::summary': {'n': 1}, 'a::highlights': {'n': 2}}
+    runner = make_runner(generator, [
+        output_line('a::summary', 'complete'),
+        output_line('a::highlights', 'cut off', finish_reason='length')
+    ])
+    batch = SimpleNamespace(output_file_id='out', error_file_id=None)
+
+    outputs = runner.collect(batch, requests)
+
+    assert outputs == {'a::summary': 'complete'}
+    assert list(generator.cache.data.values()) == ['complete']
+
+
+def test_assemble_clips_and_falls_back():
+    generator = FakeGenerator(max_section_chars=10)
+    paper = SimpleNamespace(arxiv_id='2401.00001v1', title='T')
+    outputs = {make_custom_id(paper.arxiv_id, 'summary'): 'x' * 50}
+    runner = make_runner(generator, [])
+
+    result = runner.assemble(paper, outputs)
+
+    assert result['summary'] == 'x' * 10
+    assert generator.sync_calls == [s for s in SECTIONS if s != 'summary']
+
+
+def test_explicit_zero_poll_interval_and_timeout_are_kept():
+    runner = BatchRunner(FakeGenerator(), work_dir='', poll_interval=0, timeout=0)
+
+    assert (runner.work_dir, runner.poll_interval, runner.timeout) == ('', 0, 0)
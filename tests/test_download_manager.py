@@ -0,0 +1,32 @@
+import os
+from datetime import datetime, timezone
+
+from src.download_manager import DownloadManager
+from src.models import Paper
+
+
+def make_paper(arxiv_id: str, title: str) -> Paper:
+    return Paper(
+        arxiv_id=arxiv_id, entry_id=f'http://arxiv.org/abs/{arxiv_id}', title=title, authors=['A'],
+        summary='', pdf_url=f'http://arxiv.org/pdf/{arxiv_id}',
+        published=datetime(2024, 1, 2, tzinfo=timezone.utc), updated=None,
+        primary_category='cs.CL', categories=['cs.CL']
+    )
+
+
+def test_target_path_keyed_by_versioned_id(tmp_path):
+    manager = DownloadManager(str(tmp_path))
+    title = 'A Very Long Shared Title Prefix For Two Different Papers: '
+    first = manager.target_path(make_paper('2401.00001v1', title + 'one'))
+    second = manager.target_path(make_paper('2401.00002v1', title + 'two'))
+    revised = manager.target_path(make_paper('2401.00001v2', title + 'one'))
+
+    assert len({first, second, revised}) == 3
+    assert os.path.basename(first).startswith('2401.00001v1_')
+
+
+def test_target_path_old_style_id(tmp_path):
+    manager = DownloadManager(str(tmp_path))
+    path = manager.target_path(make_paper('hep-th/9901001v1', 'Strings'))
+    assert os.path.dirname(path) == str(tmp_path)
+    assert os.path.basename(path) == 'hep-th_9901001v1_Strings.pdf'
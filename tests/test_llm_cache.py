@@ -0,0 +1,107 @@
+import pytest
+
+from src.utils import llm_cache
+from src.utils.llm_cache import LLMCache
+
+REQUEST = {
+    'model': 'gpt-4o-mini',
+    'messages': [{'role': 'user', 'content': '总结这篇论文'}],
+    'temperature': 0.7,
+    'max_tokens': 500
+}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_700_000_000.0
+
+    def time(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(llm_cache, 'time', fake)
+    return fake
+
+
+@pytest.fixture
+def cache_path(tmp_path):
+    return str(tmp_path / 'cache' / 'llm.sqlite3')
+
+
+def test_key_is_stable_and_order_independent():
+    reordered = dict(reversed(list(REQUEST.items())))
+    assert LLMCache.make_key(REQUEST) == LLMCache.make_key(reordered)
+    assert LLMCache.make_key(REQUEST) == LLMCache.make_key(dict(REQUEST))
+
+
+@pytest.mark.parametrize('field, value', [
+    ('model', 'gpt-4o'),
+    ('temperature', 0.0),
+    ('max_tokens', 800),
+    ('messages', [{'role': 'user', 'content': '总结这篇论文的方法'}]),
+])
+def test_key_changes_with_request_parameters(field, value):
+    assert LLMCache.make_key(REQUEST) != LLMCache.make_key(dict(REQUEST, **{field: value}))
+
+
+def test_get_returns_value_across_reopen(cache_path):
+    key = LLMCache.make_key(REQUEST)
+    cache = LLMCache(cache_path)
+    assert cache.get(key) is None
+    cache.set(key, '摘要')
+    cache.close()
+
+    cache = LLMCache(cache_path)
+    assert cache.get(key) == '摘要'
+    assert cache.stats() == {'hits': 1, 'misses': 0, 'writes': 0, 'entries': 1, 'hit_rate': 1.0}
+
+
+def test_entries_expire_after_ttl(cache_path, clock):
+    cache = LLMCache(cache_path, ttl_seconds=60)
+    cache.set('key', '摘要')
+
+    clock.now += 60
+    assert cache.get('key') == '摘要'
+    clock.now += 1
+    assert cache.get('key') is None
+    assert cache.evict() == 1
+    assert cache.stats()['entries'] == 0
+
+
+def test_eviction_removes_least_recently_used(cache_path, clock):
+    cache = LLMCache(cache_path, max_bytes=30)
+    for key in ('a', 'b', 'c'):
+        cache.set(key, 'x' * 10)
+        clock.now += 1
+    # 读取会刷新访问时间，最久未访问的是 b
+    assert cache.get('a') is not None
+    clock.now += 1
+    cache.set('d', 'x' * 10)
+
+    assert cache.evict() == 1
+    assert cache.get('b') is None
+    assert all(cache.get(key) is not None for key in ('a', 'c', 'd'))
+
+
+def test_eviction_runs_on_open(cache_path):
+    cache = LLMCache(cache_path)
+    cache.set('a', 'x' * 100)
+    cache.close()
+
+    cache = LLMCache(cache_path, max_bytes=50)
+    assert cache.stats()['entries'] == 0
+
+
+def test_bypass_skips_reads_but_still_writes(cache_path):
+    key = LLMCache.make_key(REQUEST)
+    cache = LLMCache(cache_path, bypass=True)
+    cache.set(key, '旧摘要')
+    assert cache.get(key) is None
+    cache.set(key, '新摘要')
+    assert cache.stats()['hits'] == 0
+    cache.close()
+
+    assert LLMCache(cache_path).get(key) == '新摘要'
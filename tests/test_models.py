@@ -0,0 +1,45 @@
+import copy
+import pickle
+from datetime import datetime, timezone
+
+import pytest
+
+from src.models import Paper
+
+
+def make_paper() -> Paper:
+    return Paper(
+        arxiv_id='2401.01234v2',
+        entry_id='http://arxiv.org/abs/2401.01234v2',
+        title='A Paper',
+        authors=['Alice', 'Bob'],
+        summary='Abstract.',
+        pdf_url='http://arxiv.org/pdf/2401.01234v2',
+        published=datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone.utc),
+        updated=None,
+        primary_category='cs.CL',
+        categories=['cs.CL', 'cs.LG'],
+        comment='10 pages'
+    )
+
+
+def assert_same(copied: Paper, paper: Paper):
+    for field in Paper.__slots__:
+        assert getattr(copied, field) == getattr(paper, field)
+
+
+def test_pickle_round_trip():
+    paper = make_paper()
+    assert_same(pickle.loads(pickle.dumps(paper)), paper)
+
+
+def test_copy_and_deepcopy():
+    paper = make_paper()
+    assert_same(copy.copy(paper), paper)
+    assert_same(copy.deepcopy(paper), paper)
+
+
+def test_still_immutable():
+    paper = pickle.loads(pickle.dumps(make_paper()))
+    with pytest.raises(AttributeError):
+        paper.title = 'changed'
@@ -0,0 +1,79 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from src.utils import PaperIndex
+from src.utils.paper_index import split_arxiv_id
+
+
+@pytest.fixture
+def index_path(tmp_path):
+    return str(tmp_path / 'index' / 'papers.db')
+
+
+def ids(papers):
+    return [paper.arxiv_id for paper in papers]
+
+
+@pytest.mark.parametrize('arxiv_id, expected', [
+    ('2401.01234v2', ('2401.01234', 2)),
+    ('2401.01234', ('2401.01234', 1)),
+    ('hep-th/9901001v3', ('hep-th/9901001', 3)),
+    (' 2401.01234v10 ', ('2401.01234', 10)),
+])
+def test_split_arxiv_id(arxiv_id, expected):
+    assert split_arxiv_id(arxiv_id) == expected
+
+
+def test_processed_papers_are_skipped_in_later_runs(index_path, make_paper):
+    first, second = make_paper('2401.00001v1'), make_paper('2401.00002v1')
+    index = PaperIndex(index_path)
+    assert ids(index.filter_new([first, second])) == ids([first, second])
+    index.mark_processed([first])
+    index.close()
+
+    # 下一次运行重新打开同一个索引
+    index = PaperIndex(index_path)
+    assert ids(index.filter_new([first, second])) == [second.arxiv_id]
+    index.close()
+
+
+def test_new_version_is_processed_again(index_path, make_paper):
+    index = PaperIndex(index_path)
+    index.mark_processed([make_paper('2401.00001v2')])
+
+    assert index.filter_new([make_paper('2401.00001v1'), make_paper('2401.00001v2')]) == []
+    assert ids(index.filter_new([make_paper('2401.00001v3')])) == ['2401.00001v3']
+    # 未带版本号的ID视为第1版
+    assert index.filter_new([make_paper('2401.00001')]) == []
+    assert index.processed_versions(['2401.00001', '2401.00009']) == {'2401.00001': 2}
+
+
+def test_mark_processed_keeps_highest_version(index_path, make_paper):
+    index = PaperIndex(index_path)
+    index.mark_processed([make_paper('2401.00001v3')])
+    index.mark_processed([make_paper('2401.00001v1')])
+
+    assert index.processed_versions(['2401.00001']) == {'2401.00001': 3}
+
+
+def test_processed_versions_queries_in_chunks(index_path, make_paper):
+    papers = [make_paper(f'2401.{number:05d}v1') for number in range(1200)]
+    index = PaperIndex(index_path)
+    index.mark_processed(papers[::2])
+
+    assert ids(index.filter_new(papers)) == ids(papers[1::2])
+
+
+def test_watermarks_are_stored_per_name(index_path):
+    index = PaperIndex(index_path)
+    assert index.get_watermark() is None
+
+    daily = datetime(2024, 1, 2, 8, tzinfo=timezone.utc)
+    index.set_watermark(daily)
+    index.set_watermark(datetime(2024, 1, 1, tzinfo=timezone.utc), name='cs.AI')
+    index.close()
+
+    index = PaperIndex(index_path)
+    assert index.get_watermark() == daily
+    assert index.get_watermark('cs.AI') == datetime(2024, 1, 1, tzinfo=timezone.utc)
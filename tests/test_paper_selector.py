@@ -0,0 +1,38 @@
+import pytest
+
+from src.paper_selector import PaperSelector
+
+
+@pytest.fixture
+def history_path(tmp_path):
+    return str(tmp_path / 'selector' / 'history')
+
+
+def test_explicit_zero_settings_are_kept(history_path):
+    selector = PaperSelector(profiles={}, duplicate_threshold=0.0, min_score=0.0, history_path=history_path)
+
+    assert selector.duplicate_threshold == 0.0
+    assert selector.min_score == 0.0
+
+
+def test_versions_of_same_paper_are_selected_once(history_path, make_paper):
+    selector = PaperSelector(profiles={}, history_path=history_path)
+    papers = [make_paper('2401.00001v1', 'Sparse attention for long documents'),
+              make_paper('2401.00001v2', 'Sparse attention for long documents')]
+
+    assert [paper.arxiv_id for paper in selector.select(papers, top_n=5)] == ['2401.00001v1']
+
+
+def test_near_duplicates_are_dropped_within_batch_and_across_runs(history_path, make_paper):
+    title = 'Retrieval augmented generation for open domain question answering'
+    first = make_paper('2401.00001v1', title)
+    copy = make_paper('2401.00002v1', title)
+    other = make_paper('2401.00003v1', 'Diffusion models for protein structure design', summary='Proteins.')
+
+    selector = PaperSelector(profiles={}, history_path=history_path)
+    assert [paper.arxiv_id for paper in selector.select([first, copy], top_n=5)] == [first.arxiv_id]
+
+    # 下一次运行重新打开向量历史；已选过的论文不会被自己的历史记录过滤
+    selector = PaperSelector(profiles={}, history_path=history_path)
+    selected = selector.select([copy, other, first], top_n=5)
+    assert [paper.arxiv_id for paper in selected] == [other.arxiv_id, first.arxiv_id]
@@ -0,0 +1,49 @@
+from src.utils.rate_limiter import AdaptiveRateLimiter, shared_limiter
+
+
+def make_limiter() -> AdaptiveRateLimiter:
+    limiter = AdaptiveRateLimiter(rpm=6000, tpm=1_000_000, max_concurrency=8)
+    limiter.concurrency = 4.0
+    return limiter
+
+
+def test_success_increases_concurrency():
+    limiter = make_limiter()
+    limiter.acquire(10)
+    limiter.release(10)
+    assert limiter.concurrency > 4.0
+
+
+def test_throttled_failure_decreases_concurrency():
+    limiter = make_limiter()
+    limiter.acquire(10)
+    limiter.release(10, throttled=True, succeeded=False)
+    assert limiter.concurrency == 2.0
+
+
+def test_permanent_failure_keeps_concurrency():
+    limiter = make_limiter()
+    limiter.acquire(10)
+    limiter.release(10, used_tokens=0, throttled=False, succeeded=False)
+    assert limiter.concurrency == 4.0
+    assert limiter._in_flight == 0
+
+
+def test_headers_do_not_raise_configured_limits():
+    limiter = AdaptiveRateLimiter(rpm=60, tpm=10_000, max_concurrency=4, headroom=0.9)
+    limiter.acquire(10)
+    limiter.release(10, headers={'x-ratelimit-limit-requests': '10000', 'x-ratelimit-limit-tokens': '2000000'})
+    assert limiter.rpm == 60
+    assert limiter.tpm == 10_000
+
+
+def test_headers_tighten_limits():
+    limiter = AdaptiveRateLimiter(rpm=600, tpm=100_000, max_concurrency=4, headroom=0.9)
+    limiter.acquire(10)
+    limiter.release(10, headers={'x-ratelimit-limit-requests': '100', 'x-ratelimit-limit-tokens': '50000'})
+    assert limiter.rpm == 90
+    assert limiter.tpm == 45_000
+
+
+def test_shared_limiter_is_process_wide():
+    assert shared_limiter('openai') is shared_limiter('openai')
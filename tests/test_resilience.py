@@ -0,0 +1,156 @@
+import pytest
+
+from src.utils import resilience
+from src.utils.error_handler import CircuitOpenError
+from src.utils.resilience import CircuitBreaker, Dependency, RetryPolicy
+
+
+class FakeClock:
+    """替代 time 模块，sleep 只推进时间"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float):
+        self.now += seconds
+
+
+class StatusError(Exception):
+    def __init__(self, status_code: int):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(resilience, 'time', fake)
+    return fake
+
+
+@pytest.fixture
+def dep(clock):
+    breaker = CircuitBreaker('test', failure_threshold=2, reset_seconds=10)
+    return Dependency('test', RetryPolicy(max_retries=0), breaker)
+
+
+def trip(dep: Dependency):
+    for _ in range(dep.breaker.failure_threshold):
+        dep.record(StatusError(503))
+    assert dep.breaker.state == CircuitBreaker.OPEN
+
+
+def test_opens_after_consecutive_transient_failures(dep):
+    dep.record(StatusError(503))
+    assert dep.breaker.state == CircuitBreaker.CLOSED
+    dep.breaker.check()
+
+    dep.record(StatusError(503))
+    assert dep.breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError):
+        dep.breaker.check()
+
+
+def test_success_resets_failure_count(dep):
+    dep.record(StatusError(503))
+    dep.breaker.record_success()
+    dep.record(StatusError(503))
+    assert dep.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_half_open_allows_single_probe(dep, clock):
+    trip(dep)
+    clock.sleep(10)
+    assert dep.breaker.state == CircuitBreaker.HALF_OPEN
+
+    dep.breaker.check()
+    with pytest.raises(CircuitOpenError):
+        dep.breaker.check()
+
+
+def test_successful_probe_closes(dep, clock):
+    trip(dep)
+    clock.sleep(10)
+    dep.breaker.check()
+    dep.breaker.record_success()
+
+    assert dep.breaker.state == CircuitBreaker.CLOSED
+    dep.breaker.check()
+
+
+def test_failed_probe_reopens(dep, clock):
+    trip(dep)
+    clock.sleep(10)
+    dep.breaker.check()
+    dep.record(StatusError(503))
+
+    assert dep.breaker.state == CircuitBreaker.OPEN
+    assert dep.breaker.retry_in() == pytest.approx(10)
+    with pytest.raises(CircuitOpenError):
+        dep.breaker.check()
+
+
+def test_permanent_error_probe_closes(dep, clock):
+    trip(dep)
+    clock.sleep(10)
+    dep.breaker.check()
+    dep.record(StatusError(400))
+
+    assert dep.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_rate_limited_probe_releases_probe(dep, clock):
+    trip(dep)
+    clock.sleep(10)
+    dep.breaker.check()
+    dep.record(StatusError(429))
+
+    # 429 不改变熔断状态，但必须结束试探，否则熔断器永远停在半开
+    assert dep.breaker.state == CircuitBreaker.HALF_OPEN
+    dep.breaker.check()
+    dep.breaker.record_success()
+    assert dep.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_rate_limit_does_not_trip_closed_breaker(dep):
+    for _ in range(5):
+        dep.record(StatusError(429))
+    assert dep.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_call_retries_transient_then_succeeds(clock):
+    dep = Dependency('test', RetryPolicy(max_retries=2, backoff_base=1), CircuitBreaker('test', 5, 10))
+    outcomes = [StatusError(503), 'ok']
+
+    def flaky():
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    assert dep.call(flaky) == 'ok'
+    assert dep.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_call_does_not_retry_permanent_error(clock):
+    dep = Dependency('test', RetryPolicy(max_retries=3), CircuitBreaker('test', 5, 10))
+    calls = []
+
+    def broken():
+        calls.append(1)
+        raise StatusError(401)
+
+    with pytest.raises(StatusError):
+        dep.call(broken)
+    assert len(calls) == 1
+
+
+def test_retry_policy_respects_deadline(clock):
+    policy = RetryPolicy(max_retries=10, backoff_base=4, backoff_max=4, deadline=5)
+    started = clock.monotonic()
+    assert policy.next_delay(StatusError(503), 0, started, retry_after=4) == 4
+    clock.sleep(3)
+    assert policy.next_delay(StatusError(503), 1, started, retry_after=4) is None
@@ -0,0 +1,120 @@
+import os
+
+import pytest
+
+from src.main import ZakaMediaPush
+from src.pipeline import PipelineItem
+from src.utils import RunManifest, atomic_open, atomic_write
+
+
+@pytest.fixture
+def manifest_dir(tmp_path):
+    return str(tmp_path / 'manifests')
+
+
+def counting_stage(calls, name, result):
+    def stage(item):
+        calls.append((name, item.paper.arxiv_id))
+        return result
+    return stage
+
+
+def test_open_resumes_unfinished_manifest(manifest_dir, make_paper):
+    first, second = make_paper('2401.00001v1'), make_paper('2401.00002v1')
+    manifest = RunManifest.open(manifest_dir, 'daily')
+    assert not manifest.resumed
+    assert manifest.add_paper(first)
+    assert manifest.add_paper(second)
+    assert not manifest.add_paper(first)
+    manifest.record(first, 'summarize', {'title': '标题'})
+    manifest.mark_done([second])
+
+    resumed = RunManifest.open(manifest_dir, 'daily')
+    assert resumed.resumed
+    assert resumed.run_started == manifest.run_started
+    assert [paper.arxiv_id for paper in resumed.pending_papers()] == [first.arxiv_id]
+    assert resumed.result(first.arxiv_id, 'summarize') == {'title': '标题'}
+    assert resumed.result(first.arxiv_id, 'download') is None
+
+
+def test_resume_skips_finished_stages(manifest_dir, tmp_path, make_paper):
+    paper = make_paper()
+    pdf_path = tmp_path / 'paper.pdf'
+    app = ZakaMediaPush()
+
+    # 第一次运行：摘要完成后下载失败，进程退出
+    calls = []
+    manifest = RunManifest.open(manifest_dir, 'daily')
+    manifest.add_paper(paper)
+    item = PipelineItem(paper)
+    app._run_checkpointed(manifest, 'summarize', counting_stage(calls, 'summarize', {'title': '标题'}), item)
+    app._run_checkpointed(manifest, 'download', counting_stage(calls, 'download', None), item)
+    assert calls == [('summarize', paper.arxiv_id), ('download', paper.arxiv_id)]
+
+    # 第二次运行：从清单恢复，只重新执行未完成的阶段
+    calls = []
+    manifest = RunManifest.open(manifest_dir, 'daily')
+    item = PipelineItem(manifest.pending_papers()[0])
+    summary = app._run_checkpointed(manifest, 'summarize', counting_stage(calls, 'summarize', {'title': '新'}), item)
+    pdf_path.write_bytes(b'%PDF')
+    app._run_checkpointed(manifest, 'download', counting_stage(calls, 'download', str(pdf_path)), item)
+    assert summary == {'title': '标题'}
+    assert calls == [('download', paper.arxiv_id)]
+    assert manifest.result(paper.arxiv_id, 'download') == str(pdf_path)
+
+
+def test_stage_with_missing_output_file_is_rerun(manifest_dir, tmp_path, make_paper):
+    paper = make_paper()
+    manifest = RunManifest.open(manifest_dir, 'daily')
+    manifest.record(paper, 'download', str(tmp_path / 'deleted.pdf'))
+
+    calls = []
+    pdf_path = tmp_path / 'paper.pdf'
+    pdf_path.write_bytes(b'%PDF')
+    ZakaMediaPush()._run_checkpointed(manifest, 'download', counting_stage(calls, 'download', str(pdf_path)),
+                                      PipelineItem(paper))
+    assert calls == [('download', paper.arxiv_id)]
+
+
+def test_finish_keeps_failed_and_parked_papers(manifest_dir, make_paper):
+    done, failed, parked = make_paper('2401.00001v1'), make_paper('2401.00002v1'), make_paper('2401.00003v1')
+    manifest = RunManifest.open(manifest_dir, 'daily')
+    for paper in (done, failed, parked):
+        manifest.add_paper(paper)
+    manifest.mark_done([done])
+    manifest.park([parked])
+    manifest.finish(max_attempts=2)
+
+    manifest = RunManifest.open(manifest_dir, 'daily')
+    assert [paper.arxiv_id for paper in manifest.pending_papers()] == [failed.arxiv_id, parked.arxiv_id]
+
+    # 暂存不计入失败次数，失败的论文达到上限后不再保留
+    manifest.finish(max_attempts=2)
+    manifest = RunManifest.open(manifest_dir, 'daily')
+    assert [paper.arxiv_id for paper in manifest.pending_papers()] == [parked.arxiv_id]
+
+
+def test_finish_archives_completed_manifest(manifest_dir, make_paper):
+    paper = make_paper()
+    manifest = RunManifest.open(manifest_dir, 'daily')
+    manifest.add_paper(paper)
+    manifest.mark_done([paper])
+    manifest.finish()
+
+    assert not os.path.exists(os.path.join(manifest_dir, 'daily.json'))
+    assert os.path.exists(os.path.join(manifest_dir, 'daily.last.json'))
+    assert not RunManifest.open(manifest_dir, 'daily').resumed
+
+
+def test_atomic_open_keeps_target_on_failure(tmp_path):
+    path = str(tmp_path / 'out' / 'papers.jsonl')
+    atomic_write(path, 'old\n')
+
+    with pytest.raises(RuntimeError):
+        with atomic_open(path) as f:
+            f.write('partial\n')
+            raise RuntimeError('interrupted')
+
+    with open(path, encoding='utf-8') as f:
+        assert f.read() == 'old\n'
+    assert os.listdir(tmp_path / 'out') == ['papers.jsonl']
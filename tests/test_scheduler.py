@@ -0,0 +1,122 @@
+import json
+import os
+import threading
+from datetime import datetime
+
+import pytest
+
+from src.scheduler import JobScheduler, ScheduledJob
+
+NOW = datetime(2024, 1, 3, 12, 0)
+
+
+@pytest.fixture
+def state_path(tmp_path):
+    return str(tmp_path / 'state' / 'schedule.json')
+
+
+def write_state(path, **runs):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({name: value.isoformat() for name, value in runs.items()}, f)
+
+
+def test_missed_slot_is_caught_up_immediately(state_path):
+    write_state(state_path, daily=datetime(2024, 1, 2, 10, 0))
+    scheduler = JobScheduler([ScheduledJob('daily', '10:00', lambda: None)], state_path=state_path)
+
+    assert scheduler._plan(NOW) == [(NOW, 'daily', datetime(2024, 1, 3, 10, 0))]
+
+
+def test_several_missed_slots_are_merged_into_one_run(state_path):
+    write_state(state_path, daily=datetime(2023, 12, 25, 10, 0))
+    scheduler = JobScheduler([ScheduledJob('daily', '10:00', lambda: None)], state_path=state_path)
+
+    assert len(scheduler._plan(NOW)) == 1
+    assert scheduler._plan(NOW)[0][2] == datetime(2024, 1, 3, 10, 0)
+
+
+def test_no_catch_up_when_last_slot_already_ran(state_path):
+    write_state(state_path, daily=datetime(2024, 1, 3, 10, 0))
+    scheduler = JobScheduler([ScheduledJob('daily', '10:00', lambda: None)], state_path=state_path)
+
+    assert scheduler._plan(NOW) == [(datetime(2024, 1, 4, 10, 0), 'daily', datetime(2024, 1, 4, 10, 0))]
+
+
+def test_catch_up_disabled_waits_for_next_slot(state_path):
+    scheduler = JobScheduler([ScheduledJob('daily', '10:00', lambda: None)], state_path=state_path, catch_up=False)
+
+    assert scheduler._plan(NOW)[0][0] == datetime(2024, 1, 4, 10, 0)
+
+
+def test_successful_run_is_recorded_and_failed_run_is_not(state_path):
+    def fail():
+        raise RuntimeError('boom')
+
+    jobs = [ScheduledJob('daily', '10:00', lambda: None), ScheduledJob('nightly', '22:00', fail)]
+    scheduler = JobScheduler(jobs, state_path=state_path)
+    scheduler._execute(scheduler.jobs['daily'], datetime(2024, 1, 3, 10, 0))
+    scheduler._execute(scheduler.jobs['nightly'], datetime(2024, 1, 2, 22, 0))
+
+    restarted = JobScheduler(jobs, state_path=state_path)
+    assert restarted.last_run('daily') == datetime(2024, 1, 3, 10, 0)
+    assert restarted.last_run('nightly') is None
+
+
+def test_slot_finished_by_another_scheduler_is_skipped(state_path):
+    calls = []
+    slot = datetime(2024, 1, 3, 10, 0)
+    first = JobScheduler([ScheduledJob('daily', '10:00', lambda: calls.append('first'))], state_path=state_path)
+    second = JobScheduler([ScheduledJob('daily', '10:00', lambda: calls.append('second'))], state_path=state_path)
+    # 两个调度器启动时都看到错过的执行
+    assert first._plan(NOW)[0][0] == second._plan(NOW)[0][0] == NOW
+
+    first._execute(first.jobs['daily'], slot)
+    second._execute(second.jobs['daily'], slot)
+
+    assert calls == ['first']
+    assert second.last_run('daily') == slot
+
+
+def test_slot_running_in_another_scheduler_is_skipped(state_path):
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def slow():
+        calls.append('first')
+        started.set()
+        release.wait(5)
+
+    slot = datetime(2024, 1, 3, 10, 0)
+    first = JobScheduler([ScheduledJob('daily', '10:00', slow)], state_path=state_path)
+    second = JobScheduler([ScheduledJob('daily', '10:00', lambda: calls.append('second'))], state_path=state_path)
+    thread = threading.Thread(target=first._execute, args=(first.jobs['daily'], slot))
+    thread.start()
+    assert started.wait(5)
+
+    second._execute(second.jobs['daily'], slot)
+    release.set()
+    thread.join()
+
+    assert calls == ['first']
+    assert JobScheduler(list(first.jobs.values()), state_path=state_path).last_run('daily') == slot
+
+
+def test_schedulers_keep_each_others_jobs_in_state_file(state_path):
+    first = JobScheduler([ScheduledJob('nlp', '09:00', lambda: None)], state_path=state_path)
+    second = JobScheduler([ScheduledJob('cv', '21:00', lambda: None)], state_path=state_path)
+    first._execute(first.jobs['nlp'], datetime(2024, 1, 3, 9, 0))
+    second._execute(second.jobs['cv'], datetime(2024, 1, 2, 21, 0))
+
+    with open(state_path, encoding='utf-8') as f:
+        assert set(json.load(f)) == {'nlp', 'cv'}
+
+
+def test_run_on_start_runs_even_when_last_slot_already_ran(state_path):
+    write_state(state_path, daily=datetime(2024, 1, 3, 10, 0))
+    scheduler = JobScheduler([ScheduledJob('daily', '10:00', lambda: None)], state_path=state_path,
+                             run_on_start=True)
+
+    assert scheduler._plan(NOW) == [(NOW, 'daily', NOW)]
+    scheduler._execute(scheduler.jobs['daily'], NOW)
+    assert scheduler.last_run('daily') == NOW
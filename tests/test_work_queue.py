@@ -0,0 +1,133 @@
+import threading
+
+import pytest
+
+from src.utils import work_queue
+from src.utils.work_queue import DONE, FAILED, LEASED, PENDING, WorkQueue
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_700_000_000.0
+
+    def time(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(work_queue, 'time', fake)
+    return fake
+
+
+@pytest.fixture
+def queue(tmp_path):
+    q = WorkQueue(str(tmp_path / 'queue.sqlite3'), max_attempts=2)
+    yield q
+    q.close()
+
+
+def test_claim_and_ack(queue, make_paper):
+    paper = make_paper('2401.00001v1')
+    assert queue.enqueue([paper]) == 1
+
+    claimed = queue.claim('w1', lease_seconds=60)
+    assert claimed == paper
+    assert queue.claim('w2', lease_seconds=60) is None
+    assert queue.ack(claimed, 'w1', {'ok': True})
+    assert queue.stats()[DONE] == 1
+
+
+def test_enqueue_only_requeues_new_versions(queue, make_paper):
+    queue.enqueue([make_paper('2401.00001v1')])
+    queue.ack(queue.claim('w1', 60), 'w1')
+
+    assert queue.enqueue([make_paper('2401.00001v1')]) == 0
+    assert queue.enqueue([make_paper('2401.00001v2')]) == 1
+    assert queue.claim('w1', 60).arxiv_id == '2401.00001v2'
+
+
+def test_expired_lease_is_reclaimed(queue, clock, make_paper):
+    queue.enqueue([make_paper()])
+    first = queue.claim('w1', lease_seconds=30)
+
+    clock.now += 10
+    assert queue.claim('w2', lease_seconds=30) is None
+    assert queue.heartbeat(first, 'w1', lease_seconds=30)
+
+    clock.now += 31
+    second = queue.claim('w2', lease_seconds=30)
+    assert second == first
+    # 原持有者的租约已被接管，续租和确认都会失败
+    assert not queue.heartbeat(first, 'w1', lease_seconds=30)
+    assert not queue.ack(first, 'w1')
+    assert queue.ack(second, 'w2')
+
+
+def test_lease_expiry_beyond_max_attempts_fails(queue, clock, make_paper):
+    queue.enqueue([make_paper()])
+    queue.claim('w1', lease_seconds=10)
+    clock.now += 11
+    queue.claim('w2', lease_seconds=10)
+    clock.now += 11
+
+    assert queue.claim('w3', lease_seconds=10) is None
+    assert queue.stats()[FAILED] == 1
+
+
+def test_fail_requeues_until_attempts_exhausted(queue, make_paper):
+    queue.enqueue([make_paper()])
+    assert queue.fail(queue.claim('w1', 60), 'w1', 'boom')
+    assert not queue.fail(queue.claim('w1', 60), 'w1', 'boom')
+    assert queue.stats()[FAILED] == 1
+
+
+def test_park_delays_claim_without_using_an_attempt(queue, clock, make_paper):
+    queue.enqueue([make_paper()])
+    paper = queue.claim('w1', 60)
+    assert queue.park(paper, 'w1', delay_seconds=30)
+    assert queue.stats()[PENDING] == 1
+
+    clock.now += 10
+    assert queue.claim('w2', 60) is None
+    clock.now += 21
+    # 暂存不计入认领次数：max_attempts=2 时仍可再失败一次后重新排队
+    assert queue.fail(queue.claim('w2', 60), 'w2', 'boom')
+
+
+def test_concurrent_workers_never_share_a_paper(tmp_path, make_paper):
+    path = str(tmp_path / 'queue.sqlite3')
+    setup = WorkQueue(path)
+    setup.enqueue([make_paper(f'2401.{i:05d}v1') for i in range(40)])
+    setup.close()
+
+    claimed = {}
+    errors = []
+
+    def worker(name: str):
+        q = WorkQueue(path)
+        try:
+            while True:
+                paper = q.claim(name, lease_seconds=60)
+                if paper is None:
+                    return
+                claimed.setdefault(paper.arxiv_id, []).append(name)
+                q.ack(paper, name)
+        except Exception as e:
+            errors.append(e)
+        finally:
+            q.close()
+
+    threads = [threading.Thread(target=worker, args=(f'w{i}',)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    assert len(claimed) == 40
+    assert all(len(workers) == 1 for workers in claimed.values())
+    check = WorkQueue(path)
+    assert check.stats()[DONE] == 40 and check.stats()[LEASED] == 0
+    check.close()